@@ -0,0 +1,143 @@
+"""
+Async facade for the QuizKnaller database layer
+Runs the blocking SQLite operations from database.py off the event loop
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+import database as db
+import metrics
+
+READ_WORKERS = 2  # threads serving read-only queries
+
+# All writes go through a single thread so they hit SQLite in submission order
+# and never contend with each other for the write lock.
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="quizknaller-db-writer")
+_readers = ThreadPoolExecutor(max_workers=READ_WORKERS, thread_name_prefix="quizknaller-db-reader")
+
+# Fire-and-forget writes that have not finished yet
+_pending: set[asyncio.Future] = set()
+
+# Callbacks that push buffered writes to the writer thread (see write_behind)
+_write_barriers: list[Callable[[], Any]] = []
+
+
+def add_write_barrier(callback: Callable[[], Any]):
+    """Register a callback that runs before any write is queued.
+
+    Buffering layers use this to hand over their pending operations first,
+    so all writes reach SQLite in the order they were issued.
+    """
+    _write_barriers.append(callback)
+
+
+def _run_write_barriers():
+    for callback in _write_barriers:
+        callback()
+
+
+def _call(func: Callable, args: tuple, kwargs: dict) -> Callable:
+    if metrics.enabled:
+        return functools.partial(metrics.timed_call, func, *args, **kwargs)
+    return functools.partial(func, *args, **kwargs)
+
+
+def run_write_nowait(func: Callable, *args, **kwargs) -> asyncio.Future:
+    """Queue a database function on the writer thread, bypassing write barriers."""
+    loop = asyncio.get_running_loop()
+    return loop.run_in_executor(_writer, _call(func, args, kwargs))
+
+
+async def run_write(func: Callable, *args, **kwargs) -> Any:
+    """Run a database function on the writer thread and await its result."""
+    _run_write_barriers()
+    return await run_write_nowait(func, *args, **kwargs)
+
+
+async def run_read(func: Callable, *args, **kwargs) -> Any:
+    """Run a read-only database function on a reader thread and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_readers, _call(func, args, kwargs))
+
+
+def _log_failure(name: str, future: asyncio.Future):
+    _pending.discard(future)
+    if future.cancelled():
+        return
+    exc = future.exception()
+    if exc is not None:
+        print(f"Error in background database write {name}: {exc}")
+
+
+def submit(func: Callable, *args, **kwargs) -> asyncio.Future:
+    """Queue a database write without waiting for it (fire-and-forget).
+
+    Writes are executed in order on the writer thread; errors are logged.
+    """
+    _run_write_barriers()
+    future = run_write_nowait(func, *args, **kwargs)
+    _pending.add(future)
+    future.add_done_callback(functools.partial(_log_failure, func.__name__))
+    return future
+
+
+async def drain():
+    """Wait until all queued fire-and-forget writes have finished."""
+    while _pending:
+        await asyncio.gather(*list(_pending), return_exceptions=True)
+
+
+def shutdown():
+    """Stop the executor threads after finishing queued work."""
+    _writer.shutdown(wait=True)
+    _readers.shutdown(wait=True)
+
+
+def _write_op(func: Callable) -> Callable:
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_write(func, *args, **kwargs)
+    return wrapper
+
+
+def _read_op(func: Callable) -> Callable:
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_read(func, *args, **kwargs)
+    return wrapper
+
+
+# Game operations
+create_game = _write_op(db.create_game)
+get_game = _read_op(db.get_game)
+update_game = _write_op(db.update_game)
+delete_game = _write_op(db.delete_game)
+
+# Player operations
+add_player = _write_op(db.add_player)
+get_players = _read_op(db.get_players)
+get_player_by_session = _read_op(db.get_player_by_session)
+update_player_session = _write_op(db.update_player_session)
+update_player_score = _write_op(db.update_player_score)
+update_player_team = _write_op(db.update_player_team)
+reset_game_progress = _write_op(db.reset_game_progress)
+set_player_connected = _write_op(db.set_player_connected)
+
+# Game snapshot and ownership operations
+save_game_snapshot = _write_op(db.save_game_snapshot)
+get_game_snapshot = _read_op(db.get_game_snapshot)
+delete_game_snapshot = _write_op(db.delete_game_snapshot)
+claim_game_owner = _write_op(db.claim_game_owner)
+get_game_owner = _read_op(db.get_game_owner)
+release_game_owner = _write_op(db.release_game_owner)
+
+# Question response operations
+record_answer = _write_op(db.record_answer)
+get_game_statistics = _read_op(db.get_game_statistics)
+
+# Cleanup operations
+delete_stale_games = _write_op(db.delete_stale_games)
+delete_stale_leftovers = _write_op(db.delete_stale_leftovers)
@@ -0,0 +1,74 @@
+"""
+Fan-out benchmark: per-player emits vs. one room emit
+Measures how long it takes to deliver a shared question payload to N players.
+
+Usage: python benchmarks/fanout.py [players ...]
+"""
+
+import asyncio
+import sys
+import time
+
+import socketio
+
+ROUNDS = 20
+
+
+async def setup_server(player_count: int):
+    """Create a Socket.IO server with fake connected players in one room."""
+    sio = socketio.AsyncServer(async_mode="asgi")
+    sent = {"packets": 0}
+
+    async def send_eio_packet(eio_sid, eio_pkt):
+        # Stand-in for the transport: count the packet instead of writing it
+        sent["packets"] += 1
+
+    sio._send_eio_packet = send_eio_packet
+
+    player_sids = []
+    for i in range(player_count):
+        sid = await sio.manager.connect(f"eio-{i}", "/")
+        await sio.enter_room(sid, "GAME:players")
+        player_sids.append(sid)
+    return sio, player_sids, sent
+
+
+def question_payload() -> dict:
+    return {
+        "answers": ["Rudolph", "Dasher", "Comet", "Blitzen"],
+        "time_limit": 20,
+    }
+
+
+async def per_player(sio, player_sids):
+    for player_sid in player_sids:
+        await sio.emit("show_answers", question_payload(), to=player_sid)
+
+
+async def room(sio, player_sids):
+    await sio.emit("show_answers", question_payload(), room="GAME:players")
+
+
+async def bench(player_count: int):
+    print(f"{player_count} players")
+    for name, strategy in (("per-player emit", per_player), ("room emit", room)):
+        sio, player_sids, sent = await setup_server(player_count)
+        timings = []
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            await strategy(sio, player_sids)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        print(f"  {name:16} median {timings[len(timings) // 2] * 1000:8.2f} ms"
+              f"  max {timings[-1] * 1000:8.2f} ms"
+              f"  packets/round {sent['packets'] // ROUNDS}")
+
+
+async def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [50, 300, 1000]
+    for count in counts:
+        await bench(count)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,266 @@
+"""
+Load test: M concurrent games of N players against a running server
+Drives hosts and players over Socket.IO with realistic think times and reports
+join, question fan-out and results latency percentiles plus server CPU/RSS.
+
+Usage: python benchmarks/loadtest.py [--url URL] [--games M] [--players N]
+                                     [--questions Q] [--server-pid PID | --spawn]
+
+Requires the async Socket.IO client dependencies (pip install aiohttp).
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+import socketio
+
+EVENT_TIMEOUT = 60.0  # seconds to wait for a server event before giving up
+SAMPLE_INTERVAL = 0.5  # seconds between server CPU/RSS samples
+
+
+class Metrics:
+    """Latency samples in seconds, by name."""
+
+    def __init__(self):
+        self.samples: dict[str, list[float]] = {}
+        self.errors = 0
+
+    def add(self, name: str, value: float):
+        self.samples.setdefault(name, []).append(value)
+
+    def report(self) -> str:
+        lines = [f"{'metric':<22}{'count':>7}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}"]
+        for name, values in self.samples.items():
+            values = sorted(values)
+            lines.append(
+                f"{name:<22}{len(values):>7}"
+                + "".join(f"{percentile(values, p) * 1000:>8.1f}ms" for p in (50, 90, 99))
+                + f"{values[-1] * 1000:>8.1f}ms"
+            )
+        return "\n".join(lines)
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class ProcessSampler:
+    """Samples CPU usage and resident memory of a process from /proc (Linux)."""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.ticks = os.sysconf("SC_CLK_TCK")
+        self.cpu_percent: list[float] = []
+        self.rss_kb: list[int] = []
+
+    def _cpu_seconds(self) -> float:
+        with open(f"/proc/{self.pid}/stat") as f:
+            # Fields after the command name; utime and stime are fields 14 and 15
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / self.ticks
+
+    def _rss(self) -> int:
+        with open(f"/proc/{self.pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+        return 0
+
+    async def run(self):
+        last_cpu, last_time = self._cpu_seconds(), time.monotonic()
+        while True:
+            await asyncio.sleep(SAMPLE_INTERVAL)
+            cpu, now = self._cpu_seconds(), time.monotonic()
+            self.cpu_percent.append(100 * (cpu - last_cpu) / (now - last_time))
+            self.rss_kb.append(self._rss())
+            last_cpu, last_time = cpu, now
+
+    def report(self) -> str:
+        if not self.cpu_percent:
+            return "server: no samples"
+        return (
+            f"server pid {self.pid}: CPU avg {sum(self.cpu_percent) / len(self.cpu_percent):.1f}% "
+            f"peak {max(self.cpu_percent):.1f}%, RSS peak {max(self.rss_kb) / 1024:.1f} MiB "
+            f"last {self.rss_kb[-1] / 1024:.1f} MiB"
+        )
+
+
+class SimClient:
+    """Socket.IO client that records when each event arrived."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self._waiters: dict[str, list[asyncio.Future]] = {}
+        self.sio.on("*", self._on_event)
+
+    async def _on_event(self, event, data=None):
+        received = time.perf_counter()
+        for future in self._waiters.pop(event, []):
+            if not future.done():
+                future.set_result((received, data))
+
+    def expect(self, event: str) -> asyncio.Future:
+        """Future for the next arrival of an event: (perf_counter time, data)."""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(event, []).append(future)
+        return future
+
+    async def connect(self, url: str, query: str, transports: list[str]):
+        await self.sio.connect(f"{url}?{query}", transports=transports)
+
+    async def emit(self, event: str, data: dict):
+        await self.sio.emit(event, data)
+
+    async def disconnect(self):
+        await self.sio.disconnect()
+
+
+async def wait_for(future: asyncio.Future):
+    return await asyncio.wait_for(future, EVENT_TIMEOUT)
+
+
+def think_time(args) -> Optional[float]:
+    """Seconds a player needs to answer, or None if the player does not answer."""
+    if random.random() < args.skip_rate:
+        return None
+    return random.lognormvariate(args.think_mu, args.think_sigma)
+
+
+async def play_question(args, metrics: Metrics, code: str, host: SimClient, players: list[SimClient],
+                        host_answers: asyncio.Future, player_answers: list[asyncio.Future]):
+    """Answer one question and measure fan-out and results latency."""
+    host_results = host.expect("show_results")
+    player_results = [p.expect("your_result") for p in players]
+
+    host_time, question = await wait_for(host_answers)
+    time_limit = question["time_limit"]
+    for future in player_answers:
+        received, _ = await wait_for(future)
+        metrics.add("question_fanout", received - host_time)
+
+    async def answer(player: SimClient) -> Optional[float]:
+        delay = think_time(args)
+        if delay is None or delay >= time_limit:
+            return None
+        await asyncio.sleep(delay)
+        await player.emit("submit_answer", {"code": code, "answer": random.randrange(4)})
+        return time.perf_counter()
+
+    answered = await asyncio.gather(*(answer(p) for p in players))
+    results_time, _ = await wait_for(host_results)
+    # Only rounds closed by the last answer (not by the timer) measure the results pipeline
+    if all(t is not None for t in answered):
+        last_answer = max(answered)
+        metrics.add("results_host", results_time - last_answer)
+        for future in player_results:
+            received, _ = await wait_for(future)
+            metrics.add("results_player", received - last_answer)
+    else:
+        await asyncio.gather(*(wait_for(f) for f in player_results))
+
+
+async def run_game(args, metrics: Metrics, game_index: int):
+    transports = [args.transport] if args.transport != "auto" else ["polling", "websocket"]
+    host = SimClient(f"host-{game_index}")
+    players = [SimClient(f"player-{game_index}-{i}") for i in range(args.players)]
+    try:
+        await host.connect(args.url, f"shard=load{game_index}", transports)
+        created = host.expect("game_created")
+        await host.emit("create_game", {"quiz_id": args.quiz_id})
+        _, game = await wait_for(created)
+        code = game["code"]
+
+        async def join(i: int, player: SimClient):
+            await asyncio.sleep(random.uniform(0, args.ramp))
+            await player.connect(args.url, f"code={code}", transports)
+            joined = player.expect("joined_game")
+            started = time.perf_counter()
+            await player.emit("join_game", {"code": code, "name": f"Spieler {i}"})
+            received, _ = await wait_for(joined)
+            metrics.add("join", received - started)
+
+        await asyncio.gather(*(join(i, p) for i, p in enumerate(players)))
+
+        questions = min(args.questions, game["question_count"])
+        for q in range(questions):
+            host_answers = host.expect("show_answers")
+            player_answers = [p.expect("show_answers") for p in players]
+            if q == 0:
+                await host.emit("start_game", {"code": code})
+            else:
+                await asyncio.sleep(args.results_pause)
+                await host.emit("next_question_request", {"code": code})
+            await play_question(args, metrics, code, host, players, host_answers, player_answers)
+
+        await host.emit("end_game_request", {"code": code})
+    except (asyncio.TimeoutError, socketio.exceptions.ConnectionError) as e:
+        metrics.errors += 1
+        print(f"Game {game_index} failed: {e!r}")
+    finally:
+        await asyncio.gather(*(c.disconnect() for c in [host, *players]), return_exceptions=True)
+
+
+def spawn_server(port: int) -> subprocess.Popen:
+    root = Path(__file__).resolve().parent.parent
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:socket_app", "--port", str(port), "--log-level", "warning"],
+        cwd=root,
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Load test a QuizKnaller server")
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--games", type=int, default=5, help="concurrent games")
+    parser.add_argument("--players", type=int, default=50, help="players per game")
+    parser.add_argument("--questions", type=int, default=3, help="questions to play per game")
+    parser.add_argument("--quiz-id", type=int, default=0)
+    parser.add_argument("--transport", choices=["websocket", "polling", "auto"], default="websocket")
+    parser.add_argument("--ramp", type=float, default=2.0, help="seconds over which players join")
+    parser.add_argument("--think-mu", type=float, default=1.2, help="log-normal think time mu (median e^mu s)")
+    parser.add_argument("--think-sigma", type=float, default=0.5, help="log-normal think time sigma")
+    parser.add_argument("--skip-rate", type=float, default=0.0, help="probability a player does not answer")
+    parser.add_argument("--results-pause", type=float, default=1.0, help="seconds the host looks at results")
+    parser.add_argument("--server-pid", type=int, help="sample CPU/RSS of this process")
+    parser.add_argument("--spawn", action="store_true", help="start a server on the --url port first")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        server = spawn_server(int(args.url.rsplit(":", 1)[1].split("/")[0]))
+        args.server_pid = server.pid
+        await asyncio.sleep(3)
+
+    sampler = ProcessSampler(args.server_pid) if args.server_pid else None
+    sampler_task = asyncio.create_task(sampler.run()) if sampler else None
+
+    metrics = Metrics()
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(run_game(args, metrics, g) for g in range(args.games)))
+    finally:
+        if sampler_task:
+            sampler_task.cancel()
+        if server:
+            server.terminate()
+            server.wait()
+
+    print(f"{args.games} games x {args.players} players, {args.questions} questions, "
+          f"{time.perf_counter() - started:.1f}s, {metrics.errors} failed games")
+    print(metrics.report())
+    if sampler:
+        print(sampler.report())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,77 @@
+"""
+show_results benchmark for large rooms
+Times scoring, ranking and result delivery for one question.
+
+Usage: python benchmarks/results.py [players ...]
+"""
+
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import database as db
+
+# Keep benchmark data out of the real database
+db.DB_PATH = Path(tempfile.mkdtemp()) / "bench.db"
+
+import main  # noqa: E402
+from game_state import GameState  # noqa: E402
+
+ROUNDS = 5
+
+
+async def setup_game(player_count: int) -> str:
+    """Create an in-memory game in question state where everybody has answered."""
+    async def send_eio_packet(eio_sid, eio_pkt):
+        # Stand-in for the transport: drop the packet instead of writing it
+        pass
+
+    main.sio._send_eio_packet = send_eio_packet
+    main.sio.eio.send = send_eio_packet
+    quiz = main.load_quizzes()[0]
+    game_code = main.generate_game_code()
+    # A duplicate eio sid is not connected (connect returns None), so each round needs its own
+    host_sid = await main.sio.manager.connect(f"eio-{game_code}-host", "/")
+    game = GameState(host_sid=host_sid, quiz=quiz)
+    game.advance_question()
+    game.open_question(0.0)
+    for i in range(player_count):
+        sid = await main.sio.manager.connect(f"eio-{game_code}-{i}", "/")
+        game.add_player(sid, f"Player {i}")
+        game.set_score(sid, random.randrange(0, 5000, 10))
+        game.record_answer(sid, random.randrange(4), random.uniform(0.5, 19.5))
+
+    # The joins are sent to the host before the question, not as part of its results
+    game.roster.flush()
+    main.games[game_code] = game
+    return game_code
+
+
+async def bench(player_count: int):
+    timings = []
+    for _ in range(ROUNDS):
+        game_code = await setup_game(player_count)
+        start = time.perf_counter()
+        await main.show_results(game_code)
+        timings.append(time.perf_counter() - start)
+        del main.games[game_code]
+    timings.sort()
+    print(f"{player_count:6} players  median {timings[len(timings) // 2] * 1000:8.2f} ms"
+          f"  max {timings[-1] * 1000:8.2f} ms")
+
+
+async def run():
+    counts = [int(arg) for arg in sys.argv[1:]] or [100, 1000, 3000]
+    for count in counts:
+        await bench(count)
+    await main.write_behind.close()
+    await main.adb.drain()
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,109 @@
+"""
+Golden check and benchmark for the scoring engine
+Compares scoring.score_answers (both backends) against the original per-player
+formula from show_results on random questions, then times the backends.
+The golden comparison also runs with the test suite (tests/test_scoring.py).
+
+Usage: python benchmarks/scoring_golden.py [answers ...]
+"""
+
+import random
+import sys
+import time
+from array import array
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import scoring  # noqa: E402
+
+CASES = 2000
+ROUNDS = 20
+
+
+def legacy_scores(answers: dict, streaks: dict, correct_index: int, time_limit: float):
+    """The per-player loop show_results used before the scoring engine."""
+    results = {}
+    answer_counts = [0, 0, 0, 0]
+    for player_sid, (answer, answer_time) in answers.items():
+        is_correct = answer == correct_index
+        if answer is not None and answer < 4:
+            answer_counts[answer] += 1
+        if is_correct:
+            time_bonus = max(0, 1 - (answer_time / time_limit))
+            score = int(500 + (500 * time_bonus))
+            streaks[player_sid] += 1
+            if streaks[player_sid] > 1:
+                score += min(streaks[player_sid] * 50, 200)
+            results[player_sid] = (True, score, streaks[player_sid])
+        else:
+            streaks[player_sid] = 0
+            results[player_sid] = (False, 0, 0)
+    return results, answer_counts
+
+
+def random_question(count: int):
+    time_limit = random.choice([10, 15, 20, 30, 7.5])
+    answers = {
+        f"sid-{i}": (random.randrange(4), random.uniform(0, time_limit * 1.2))
+        for i in range(count)
+    }
+    # Round some times to exact fractions of the limit to hit boundaries
+    for sid in random.sample(list(answers), count // 10):
+        answers[sid] = (answers[sid][0], random.choice([0.0, time_limit / 2, time_limit, time_limit * 2]))
+    streaks = {sid: random.choice([0, 0, 1, 2, 3, 5, 9]) for sid in answers}
+    return answers, streaks, random.randrange(4), time_limit
+
+
+def check_case(answers: dict, streaks: dict, correct_index: int, time_limit: float):
+    sids = list(answers)
+    answer_column = array("b", [answers[sid][0] for sid in sids])
+    time_column = array("d", [answers[sid][1] for sid in sids])
+    streak_column = array("i", [streaks[sid] for sid in sids])
+    expected, expected_counts = legacy_scores(answers, dict(streaks), correct_index, time_limit)
+    backends = [False, True] if scoring.np is not None else [False]
+    for vectorize in backends:
+        scores = scoring.score_answers(answer_column, time_column, streak_column,
+                                       correct_index, time_limit, vectorize=vectorize)
+        got = {sid: (scores.correct[i], scores.points[i], scores.streaks[i]) for i, sid in enumerate(sids)}
+        assert got == expected, f"scores differ (vectorize={vectorize})"
+        assert scores.answer_counts == expected_counts, f"answer counts differ (vectorize={vectorize})"
+
+
+def bench(count: int):
+    answers, streaks, correct_index, time_limit = random_question(count)
+    columns = (
+        array("b", [a for a, _ in answers.values()]),
+        array("d", [t for _, t in answers.values()]),
+        array("i", streaks.values()),
+    )
+    line = f"{count:6} answers"
+    for label, run in [
+        ("legacy", lambda: legacy_scores(answers, dict(streaks), correct_index, time_limit)),
+        ("python", lambda: scoring.score_answers(*columns, correct_index, time_limit, vectorize=False)),
+        ("numpy", lambda: scoring.score_answers(*columns, correct_index, time_limit, vectorize=True)),
+    ]:
+        if label == "numpy" and scoring.np is None:
+            continue
+        timings = []
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        line += f"  {label} {timings[len(timings) // 2] * 1000:7.3f} ms"
+    print(line)
+
+
+def main():
+    random.seed(1)
+    for _ in range(CASES):
+        check_case(*random_question(random.randrange(1, 300)))
+    print(f"{CASES} random questions: scores identical to the original formula"
+          + ("" if scoring.np is not None else " (numpy not installed, Python backend only)"))
+    for count in [int(arg) for arg in sys.argv[1:]] or [50, 500, 5000]:
+        bench(count)
+
+
+if __name__ == "__main__":
+    main()
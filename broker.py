@@ -0,0 +1,164 @@
+"""
+Message broker for QuizKnaller worker processes
+Publish/subscribe between workers over Redis or, for local testing, a shared SQLite file
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, AsyncIterator, Optional
+
+from socketio.async_pubsub_manager import AsyncPubSubManager
+
+try:
+    from redis import asyncio as aioredis
+except ImportError:  # Redis is only needed for redis:// URLs
+    aioredis = None
+
+SQLITE_POLL_INTERVAL = 0.02  # seconds between polls of the SQLite broker table
+SQLITE_RETENTION = 30  # seconds messages are kept in the SQLite broker table
+
+
+class Broker(ABC):
+    """Publish/subscribe channel between worker processes."""
+
+    @abstractmethod
+    async def publish(self, channel: str, message: dict):
+        ...
+
+    @abstractmethod
+    def listen(self, channel: str) -> AsyncIterator[dict]:
+        """Yield messages published to a channel after the call."""
+
+    async def close(self):
+        pass
+
+
+class SQLiteBroker(Broker):
+    """Broker backed by a table in a SQLite file shared by all workers.
+
+    Subscribers poll for new rows, so this is meant as a stand-in broker for
+    several processes on one machine, not as a replacement for Redis.
+    """
+
+    def __init__(self, path: Path, poll_interval: float = SQLITE_POLL_INTERVAL,
+                 retention: float = SQLITE_RETENTION):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS broker_messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                channel TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_broker_messages_channel
+            ON broker_messages(channel, id)
+        """)
+        self._last_purge = 0.0
+
+    def _execute(self, query: str, params: tuple = ()) -> list:
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
+
+    def _insert(self, channel: str, payload: str):
+        now = time.time()
+        self._execute(
+            "INSERT INTO broker_messages (channel, payload, created_at) VALUES (?, ?, ?)",
+            (channel, payload, now),
+        )
+        if now - self._last_purge > self.retention:
+            self._last_purge = now
+            self._execute("DELETE FROM broker_messages WHERE created_at < ?", (now - self.retention,))
+
+    async def publish(self, channel: str, message: dict):
+        await asyncio.to_thread(self._insert, channel, json.dumps(message))
+
+    async def listen(self, channel: str) -> AsyncIterator[dict]:
+        rows = await asyncio.to_thread(self._execute, "SELECT MAX(id) FROM broker_messages")
+        last_id = rows[0][0] or 0
+        while True:
+            rows = await asyncio.to_thread(
+                self._execute,
+                "SELECT id, payload FROM broker_messages WHERE channel = ? AND id > ? ORDER BY id",
+                (channel, last_id),
+            )
+            for message_id, payload in rows:
+                last_id = message_id
+                yield json.loads(payload)
+            if not rows:
+                await asyncio.sleep(self.poll_interval)
+
+    async def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RedisBroker(Broker):
+    """Broker using Redis (or a compatible server such as Valkey) pub/sub."""
+
+    def __init__(self, url: str):
+        if aioredis is None:
+            raise RuntimeError("The redis package is required for a redis:// message queue")
+        self.redis = aioredis.Redis.from_url(url)
+
+    async def publish(self, channel: str, message: dict):
+        await self.redis.publish(channel, json.dumps(message))
+
+    async def listen(self, channel: str) -> AsyncIterator[dict]:
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(channel)
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    yield json.loads(message["data"])
+        finally:
+            await pubsub.aclose()
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+def create_broker(url: str, default_dir: Path) -> Optional[Broker]:
+    """Create a broker from a message queue URL ("" disables it).
+
+    Supported: redis://..., rediss://..., sqlite (file in default_dir) and
+    sqlite:///path/to/file.db.
+    """
+    if not url:
+        return None
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBroker(url)
+    if url == "sqlite":
+        return SQLiteBroker(default_dir / "quizknaller-broker.db")
+    if url.startswith("sqlite:///"):
+        return SQLiteBroker(Path(url.removeprefix("sqlite:///")))
+    raise ValueError(f"Unsupported message queue URL: {url}")
+
+
+class BrokerManager(AsyncPubSubManager):
+    """Socket.IO client manager that shares emits and rooms through a Broker."""
+
+    name = "quizknaller-broker"
+
+    def __init__(self, broker: Broker, channel: str = "quizknaller:socketio", **kwargs: Any):
+        super().__init__(channel=channel, **kwargs)
+        self.broker = broker
+
+    async def _publish(self, data):
+        await self.broker.publish(self.channel, data)
+
+    async def _listen(self):
+        async for message in self.broker.listen(self.channel):
+            yield message
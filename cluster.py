@@ -0,0 +1,124 @@
+"""
+Multi-worker mode for QuizKnaller
+Game ownership leases, event forwarding between workers and the Socket.IO message queue
+"""
+
+import asyncio
+import os
+import socket
+import zlib
+from typing import Any, Callable, Optional
+
+import socketio
+
+import database as db
+from broker import BrokerManager, create_broker
+from game_store import MemoryGameStore, create_game_store
+
+# Configuration (environment)
+GAME_STORE_URL = os.environ.get("QUIZKNALLER_GAME_STORE", "memory")  # memory, sqlite or redis://...
+MESSAGE_QUEUE_URL = os.environ.get("QUIZKNALLER_MESSAGE_QUEUE", "")  # empty (single worker), sqlite or redis://...
+WORKER_ID = os.environ.get("QUIZKNALLER_WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+LEASE_TTL = 15.0  # seconds a worker owns a game without renewing
+LEASE_RENEW_INTERVAL = 5.0  # seconds between lease renewals (and snapshots) of owned games
+SHARD_INDEX = int(os.environ.get("QUIZKNALLER_SHARD_INDEX", "0"))  # this worker's shard (see shard_router.py)
+SHARD_COUNT = int(os.environ.get("QUIZKNALLER_SHARD_COUNT", "1"))  # number of sharded workers
+
+store = create_game_store(GAME_STORE_URL)
+broker = create_broker(MESSAGE_QUEUE_URL, db.DB_PATH.parent)
+
+# Several workers share games only if they share a message queue
+enabled = broker is not None
+if enabled and isinstance(store, MemoryGameStore):
+    raise RuntimeError("QUIZKNALLER_MESSAGE_QUEUE requires a shared QUIZKNALLER_GAME_STORE (sqlite or redis://...)")
+
+_tasks: set[asyncio.Task] = set()
+
+
+def client_manager() -> Optional[socketio.AsyncManager]:
+    """Socket.IO client manager sharing emits and rooms between workers (None for a single worker)."""
+    return BrokerManager(broker) if enabled else None
+
+
+def shard_for(key: str, count: int = SHARD_COUNT) -> int:
+    """The shard (worker index) serving a game code or routing key."""
+    return zlib.crc32(key.encode("utf-8")) % count
+
+
+def owns_code(game_code: str) -> bool:
+    """Check whether a game code belongs to this worker's shard."""
+    return SHARD_COUNT <= 1 or shard_for(game_code) == SHARD_INDEX
+
+
+def worker_channel(worker_id: str) -> str:
+    return f"quizknaller:worker:{worker_id}"
+
+
+def _log_failure(task: asyncio.Task):
+    _tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Error in cluster task: {task.exception()!r}")
+
+
+def spawn(coro) -> asyncio.Task:
+    """Run a coroutine in the background; errors are logged."""
+    task = asyncio.create_task(coro)
+    _tasks.add(task)
+    task.add_done_callback(_log_failure)
+    return task
+
+
+async def claim(game_code: str) -> bool:
+    """Take or renew ownership of a game for this worker."""
+    return await store.claim(game_code, WORKER_ID, LEASE_TTL) == WORKER_ID
+
+
+async def forward(owner: str, event: str, sid: str, data: Any):
+    """Send a Socket.IO event received here to the worker owning its game."""
+    await broker.publish(worker_channel(owner), {"event": event, "sid": sid, "data": data})
+
+
+def save_game(game_code: str, game):
+    """Snapshot a game to the shared store in the background."""
+    spawn(store.save(game_code, game.to_dict()))
+
+
+async def _serve(dispatch: Callable[[str, str, Any], Any]):
+    async for message in broker.listen(worker_channel(WORKER_ID)):
+        spawn(dispatch(message["event"], message["sid"], message["data"]))
+
+
+async def _renew_leases(games: dict, on_lost: Callable[[str], Any]):
+    while True:
+        await asyncio.sleep(LEASE_RENEW_INTERVAL)
+        for game_code, game in list(games.items()):
+            try:
+                if await claim(game_code):
+                    await store.save(game_code, game.to_dict())
+                else:
+                    # Another worker took over after our lease expired
+                    print(f"Lost ownership of game {game_code} to another worker")
+                    on_lost(game_code)
+            except Exception as e:
+                print(f"Error renewing lease of game {game_code}: {e}")
+
+
+def start(games: dict, dispatch: Callable[[str, str, Any], Any], on_lost: Callable[[str], Any]):
+    """Start receiving forwarded events and keeping leases of the given games."""
+    print(f"Multi-worker mode: worker {WORKER_ID}, store {GAME_STORE_URL}, queue {MESSAGE_QUEUE_URL}")
+    spawn(_serve(dispatch))
+    spawn(_renew_leases(games, on_lost))
+
+
+async def stop(games: dict):
+    """Snapshot and release all games owned by this worker so others can take over."""
+    for task in list(_tasks):
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    for game_code, game in list(games.items()):
+        try:
+            await store.save(game_code, game.to_dict())
+            await store.release(game_code, WORKER_ID)
+        except Exception as e:
+            print(f"Error handing over game {game_code}: {e}")
+    await store.close()
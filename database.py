@@ -3,14 +3,34 @@ Database module for QuizKnaller persistence
 Handles SQLite operations for games, players, and quizzes
 """
 
+import hashlib
+import marshal
 import sqlite3
 import json
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 
+from lru import LRUCache
+
 DB_PATH = Path(__file__).parent / "quizknaller.db"
 
+# Connection pool configuration
+POOL_SIZE = 4  # maximum number of long-lived connections
+POOL_CHECKOUT_TIMEOUT = 30.0  # seconds to wait for a free connection
+POOL_HEALTH_CHECK_IDLE = 30.0  # idle seconds after which a connection is pinged before reuse
+
+QUIZ_CACHE_SIZE = 64  # marshalled quizzes kept in memory, by content hash
+
+
+def name_key(name: str) -> str:
+    """Case-insensitive lookup key for a player name."""
+    return name.casefold()
+
 
 def init_db():
     """Initialize the database with required tables."""
@@ -24,6 +44,7 @@ def init_db():
             host_sid TEXT,
             quiz_name TEXT NOT NULL,
             quiz_data TEXT NOT NULL,
+            quiz_hash TEXT,
             current_question_index INTEGER DEFAULT -1,
             state TEXT DEFAULT 'lobby',
             team_mode BOOLEAN DEFAULT 0,
@@ -34,6 +55,15 @@ def init_db():
         )
     """)
     
+    # Quiz contents, stored once and referenced by games.quiz_hash
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS quizzes (
+            quiz_hash TEXT PRIMARY KEY,
+            data TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
     # Players table
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS players (
@@ -41,6 +71,7 @@ def init_db():
             game_code TEXT NOT NULL,
             session_id TEXT NOT NULL,
             name TEXT NOT NULL,
+            name_key TEXT,
             score INTEGER DEFAULT 0,
             team TEXT,
             connected BOOLEAN DEFAULT 1,
@@ -83,13 +114,81 @@ def init_db():
         ON question_responses(game_code)
     """)
     
+    _migrate_player_name_keys(cursor)
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_players_game_name_key 
+        ON players(game_code, name_key)
+    """)
+    
+    _migrate_quiz_store(cursor)
+    
+    # Game state snapshots and worker ownership (multi-worker mode)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS game_snapshots (
+            game_code TEXT PRIMARY KEY,
+            data TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS game_owners (
+            game_code TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        )
+    """)
+    
     conn.commit()
     conn.close()
 
 
-def get_connection():
-    """Get a database connection with row factory and better concurrency settings."""
-    conn = sqlite3.connect(DB_PATH, timeout=30.0)
+def _migrate_player_name_keys(cursor: sqlite3.Cursor):
+    """Add and backfill players.name_key for databases created before it existed."""
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(players)")]
+    if "name_key" not in columns:
+        cursor.execute("ALTER TABLE players ADD COLUMN name_key TEXT")
+    
+    rows = cursor.execute("SELECT id, name FROM players WHERE name_key IS NULL").fetchall()
+    if not rows:
+        return
+    cursor.executemany(
+        "UPDATE players SET name_key = ? WHERE id = ?",
+        [(name_key(name), player_id) for player_id, name in rows]
+    )
+    # Names that only differ in case cannot coexist under the unique index
+    cursor.execute("""
+        DELETE FROM players WHERE id NOT IN (
+            SELECT MIN(id) FROM players GROUP BY game_code, name_key
+        )
+    """)
+
+
+def _migrate_quiz_store(cursor: sqlite3.Cursor):
+    """Move inline games.quiz_data into the quizzes table for databases created before it existed."""
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(games)")]
+    if "quiz_hash" not in columns:
+        cursor.execute("ALTER TABLE games ADD COLUMN quiz_hash TEXT")
+    
+    rows = cursor.execute("SELECT game_code, quiz_data FROM games WHERE quiz_hash IS NULL").fetchall()
+    for game_code, quiz_data in rows:
+        digest, data = encode_quiz(json.loads(quiz_data))
+        cursor.execute("INSERT OR IGNORE INTO quizzes (quiz_hash, data) VALUES (?, ?)", (digest, data))
+        # quiz_data is NOT NULL in existing tables, so it is emptied instead of dropped
+        cursor.execute(
+            "UPDATE games SET quiz_hash = ?, quiz_data = '' WHERE game_code = ?",
+            (digest, game_code)
+        )
+
+
+def get_connection(db_path: Optional[Path] = None):
+    """Get a database connection with row factory and better concurrency settings.
+
+    This opens a fresh, unpooled connection that the caller must close.
+    The operations in this module use the shared pool via connection(),
+    which opens its connections with this function.
+    """
+    conn = sqlite3.connect(db_path or DB_PATH, timeout=30.0, check_same_thread=False)
     conn.row_factory = sqlite3.Row
     # Enable WAL mode for better concurrent access
     conn.execute("PRAGMA journal_mode=WAL")
@@ -97,31 +196,257 @@ def get_connection():
     return conn
 
 
+class ConnectionPool:
+    """Bounded pool of long-lived SQLite connections.
+
+    Connections are opened lazily (up to ``size``), configured once and then
+    reused. Checkout blocks for at most ``checkout_timeout`` seconds and raises
+    ``sqlite3.OperationalError`` when the pool stays exhausted, so callers can
+    handle it like any other SQLite error.
+    """
+
+    def __init__(self, db_path: Path, size: int = POOL_SIZE,
+                 checkout_timeout: float = POOL_CHECKOUT_TIMEOUT,
+                 health_check_idle: float = POOL_HEALTH_CHECK_IDLE):
+        self.db_path = db_path
+        self.size = size
+        self.checkout_timeout = checkout_timeout
+        self.health_check_idle = health_check_idle
+        # LIFO keeps the hot connections hot and lets idle ones age out
+        self._idle: "queue.LifoQueue[tuple[sqlite3.Connection, float]]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._checkouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._timeouts = 0
+        self._discarded = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        return get_connection(self.db_path)
+
+    @staticmethod
+    def _is_healthy(conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn: sqlite3.Connection):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._created -= 1
+            self._discarded += 1
+
+    def acquire(self) -> sqlite3.Connection:
+        """Check out a connection, opening a new one if the pool is not full."""
+        start = time.perf_counter()
+        while True:
+            try:
+                conn, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_create = self._created < self.size
+                    if can_create:
+                        self._created += 1
+                if can_create:
+                    try:
+                        conn = self._connect()
+                    except Exception:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                    break
+                remaining = self.checkout_timeout - (time.perf_counter() - start)
+                try:
+                    conn, last_used = self._idle.get(timeout=max(remaining, 0))
+                except queue.Empty:
+                    with self._lock:
+                        self._timeouts += 1
+                    raise sqlite3.OperationalError("database connection pool exhausted")
+
+            # Ping connections that sat idle for a while before handing them out
+            if time.monotonic() - last_used > self.health_check_idle and not self._is_healthy(conn):
+                self._discard(conn)
+                continue
+            break
+
+        waited = time.perf_counter() - start
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return conn
+
+    def release(self, conn: sqlite3.Connection, healthy: bool = True):
+        """Return a connection to the pool, discarding it if it is broken."""
+        with self._lock:
+            self._in_use -= 1
+        if healthy and conn.in_transaction:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                healthy = False
+        if not healthy:
+            self._discard(conn)
+            return
+        self._idle.put((conn, time.monotonic()))
+
+    @contextmanager
+    def connection(self):
+        """Context manager that checks a connection out and returns it afterwards."""
+        conn = self.acquire()
+        healthy = True
+        try:
+            yield conn
+        except sqlite3.Error as e:
+            # Integrity and lock errors leave the connection usable
+            healthy = isinstance(e, (sqlite3.IntegrityError, sqlite3.OperationalError))
+            if healthy:
+                try:
+                    conn.rollback()
+                except sqlite3.Error:
+                    healthy = False
+            raise
+        finally:
+            self.release(conn, healthy)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool metrics (sizes, checkout counts and wait times)."""
+        with self._lock:
+            checkouts = self._checkouts
+            return {
+                "size": self.size,
+                "open": self._created,
+                "in_use": self._in_use,
+                "idle": self._created - self._in_use,
+                "checkouts": checkouts,
+                "timeouts": self._timeouts,
+                "discarded": self._discarded,
+                "wait_avg_ms": (self._wait_total / checkouts * 1000) if checkouts else 0.0,
+                "wait_max_ms": self._wait_max * 1000,
+            }
+
+    def close(self):
+        """Close all idle connections."""
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Get the shared connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_PATH)
+    return _pool
+
+
+def close_pool():
+    """Close the shared connection pool (e.g. on shutdown or after changing DB_PATH)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def connection():
+    """Check out a pooled connection: ``with connection() as conn: ...``."""
+    return get_pool().connection()
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Get metrics for the shared connection pool."""
+    return get_pool().stats()
+
+
+# Quiz storage
+# Quizzes are cached marshalled: every load gets its own copy (cheaper than a JSON
+# decode), so games loaded from the same hash never share a mutable dict
+quiz_cache = LRUCache(QUIZ_CACHE_SIZE)
+_quiz_cache_lock = threading.Lock()
+
+
+def encode_quiz(quiz: dict) -> tuple[str, str]:
+    """Canonical JSON of a quiz and its content hash (equal quizzes share a hash)."""
+    data = json.dumps(quiz, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest(), data
+
+
+def _store_quiz(cursor: sqlite3.Cursor, quiz: dict) -> str:
+    """Insert a quiz unless the same content is stored already; returns its hash."""
+    digest, data = encode_quiz(quiz)
+    cursor.execute("INSERT OR IGNORE INTO quizzes (quiz_hash, data) VALUES (?, ?)", (digest, data))
+    cached = marshal.dumps(quiz)
+    with _quiz_cache_lock:
+        quiz_cache.put(digest, cached)
+    return digest
+
+
+def _load_quiz(cursor: sqlite3.Cursor, digest: str) -> Optional[dict]:
+    """A new copy of the quiz with this hash, from the cache or else from the quizzes table."""
+    with _quiz_cache_lock:
+        cached = quiz_cache.get(digest)
+    if cached is not None:
+        return marshal.loads(cached)
+    cursor.execute("SELECT data FROM quizzes WHERE quiz_hash = ?", (digest,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    quiz = json.loads(row["data"])
+    cached = marshal.dumps(quiz)
+    with _quiz_cache_lock:
+        quiz_cache.put(digest, cached)
+    return quiz
+
+
+def get_quiz_cache_stats() -> Dict[str, Any]:
+    """Get metrics for the parsed quiz cache."""
+    with _quiz_cache_lock:
+        return quiz_cache.stats()
+
+
 # Game operations
 def create_game(game_code: str, host_sid: str, quiz_name: str, quiz_data: dict, 
                 team_mode: bool = False, teams: Optional[List[str]] = None, 
                 top_n_players: int = 3) -> bool:
     """Create a new game in the database."""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
+        with connection() as conn:
+            cursor = conn.cursor()
+            quiz_hash = _store_quiz(cursor, quiz_data)
         
-        cursor.execute("""
-            INSERT INTO games 
-            (game_code, host_sid, quiz_name, quiz_data, team_mode, teams, top_n_players)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
-            game_code,
-            host_sid,
-            quiz_name,
-            json.dumps(quiz_data),
-            team_mode,
-            json.dumps(teams) if teams else None,
-            top_n_players
-        ))
+            cursor.execute("""
+                INSERT INTO games 
+                (game_code, host_sid, quiz_name, quiz_data, quiz_hash, team_mode, teams, top_n_players)
+                VALUES (?, ?, ?, '', ?, ?, ?, ?)
+            """, (
+                game_code,
+                host_sid,
+                quiz_name,
+                quiz_hash,
+                team_mode,
+                json.dumps(teams) if teams else None,
+                top_n_players
+            ))
         
-        conn.commit()
-        conn.close()
+            conn.commit()
         return True
     except Exception as e:
         print(f"Error creating game: {e}")
@@ -130,19 +455,20 @@ def create_game(game_code: str, host_sid: str, quiz_name: str, quiz_data: dict,
 
 def get_game(game_code: str) -> Optional[Dict[str, Any]]:
     """Retrieve a game from the database."""
-    conn = get_connection()
-    cursor = conn.cursor()
+    with connection() as conn:
+        cursor = conn.cursor()
     
-    cursor.execute("SELECT * FROM games WHERE game_code = ?", (game_code,))
-    row = cursor.fetchone()
-    conn.close()
+        cursor.execute("SELECT * FROM games WHERE game_code = ?", (game_code,))
+        row = cursor.fetchone()
+        if row:
+            quiz = _load_quiz(cursor, row["quiz_hash"]) if row["quiz_hash"] else json.loads(row["quiz_data"])
     
     if row:
         return {
             "game_code": row["game_code"],
             "host_sid": row["host_sid"],
             "quiz_name": row["quiz_name"],
-            "quiz": json.loads(row["quiz_data"]),
+            "quiz": quiz,
             "current_question": row["current_question_index"],
             "state": row["state"],
             "team_mode": bool(row["team_mode"]),
@@ -157,35 +483,34 @@ def get_game(game_code: str) -> Optional[Dict[str, Any]]:
 def update_game(game_code: str, **updates) -> bool:
     """Update game fields."""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
+        with connection() as conn:
+            cursor = conn.cursor()
         
-        # Build UPDATE query dynamically
-        set_clauses = []
-        values = []
+            # Build UPDATE query dynamically
+            set_clauses = []
+            values = []
         
-        for key, value in updates.items():
-            if key == "quiz":
-                set_clauses.append("quiz_data = ?")
-                values.append(json.dumps(value))
-            elif key == "current_question":
-                set_clauses.append("current_question_index = ?")
-                values.append(value)
-            elif key == "teams":
-                set_clauses.append("teams = ?")
-                values.append(json.dumps(value) if value else None)
-            else:
-                set_clauses.append(f"{key} = ?")
-                values.append(value)
+            for key, value in updates.items():
+                if key == "quiz":
+                    set_clauses.append("quiz_hash = ?, quiz_data = ''")
+                    values.append(_store_quiz(cursor, value))
+                elif key == "current_question":
+                    set_clauses.append("current_question_index = ?")
+                    values.append(value)
+                elif key == "teams":
+                    set_clauses.append("teams = ?")
+                    values.append(json.dumps(value) if value else None)
+                else:
+                    set_clauses.append(f"{key} = ?")
+                    values.append(value)
         
-        set_clauses.append("updated_at = CURRENT_TIMESTAMP")
-        values.append(game_code)
+            set_clauses.append("updated_at = CURRENT_TIMESTAMP")
+            values.append(game_code)
         
-        query = f"UPDATE games SET {', '.join(set_clauses)} WHERE game_code = ?"
-        cursor.execute(query, values)
+            query = f"UPDATE games SET {', '.join(set_clauses)} WHERE game_code = ?"
+            cursor.execute(query, values)
         
-        conn.commit()
-        conn.close()
+            conn.commit()
         return True
     except Exception as e:
         print(f"Error updating game: {e}")
@@ -195,11 +520,10 @@ def update_game(game_code: str, **updates) -> bool:
 def delete_game(game_code: str) -> bool:
     """Delete a game and all associated data."""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM games WHERE game_code = ?", (game_code,))
-        conn.commit()
-        conn.close()
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM games WHERE game_code = ?", (game_code,))
+            conn.commit()
         return True
     except Exception as e:
         print(f"Error deleting game: {e}")
@@ -209,47 +533,34 @@ def delete_game(game_code: str) -> bool:
 # Player operations
 def add_player(game_code: str, session_id: str, name: str, team: Optional[str] = None) -> bool:
     """Add a player to the database."""
-    import time
     max_retries = 5
     retry_delay = 0.1
     
     for attempt in range(max_retries):
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-            
-            # First check if player already exists (for reconnection)
-            cursor.execute("""
-                SELECT id FROM players WHERE game_code = ? AND LOWER(name) = LOWER(?)
-            """, (game_code, name))
-            existing = cursor.fetchone()
+            with connection() as conn:
+                cursor = conn.cursor()
             
-            if existing:
-                # Update existing player's session_id instead of inserting
-                cursor.execute("""
-                    UPDATE players SET session_id = ?, connected = 1, updated_at = CURRENT_TIMESTAMP
-                    WHERE game_code = ? AND LOWER(name) = LOWER(?)
-                """, (session_id, game_code, name))
-            else:
+                # Existing player (reconnection): update the session_id instead of inserting
                 cursor.execute("""
-                    INSERT INTO players (game_code, session_id, name, team)
-                    VALUES (?, ?, ?, ?)
-                """, (game_code, session_id, name, team))
+                    INSERT INTO players (game_code, session_id, name, name_key, team)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(game_code, name_key) DO UPDATE SET
+                        session_id = excluded.session_id, connected = 1, updated_at = CURRENT_TIMESTAMP
+                """, (game_code, session_id, name, name_key(name), team))
             
-            conn.commit()
-            conn.close()
+                conn.commit()
             return True
         except sqlite3.IntegrityError:
             # Player name already exists - try update instead
             try:
-                conn2 = get_connection()
-                cursor2 = conn2.cursor()
-                cursor2.execute("""
-                    UPDATE players SET session_id = ?, connected = 1, updated_at = CURRENT_TIMESTAMP
-                    WHERE game_code = ? AND LOWER(name) = LOWER(?)
-                """, (session_id, game_code, name))
-                conn2.commit()
-                conn2.close()
+                with connection() as conn2:
+                    cursor2 = conn2.cursor()
+                    cursor2.execute("""
+                        UPDATE players SET session_id = ?, connected = 1, updated_at = CURRENT_TIMESTAMP
+                        WHERE game_code = ? AND name_key = ?
+                    """, (session_id, game_code, name_key(name)))
+                    conn2.commit()
                 return True
             except Exception:
                 pass
@@ -269,17 +580,16 @@ def add_player(game_code: str, session_id: str, name: str, team: Optional[str] =
 
 def get_players(game_code: str) -> List[Dict[str, Any]]:
     """Get all players for a game."""
-    conn = get_connection()
-    cursor = conn.cursor()
+    with connection() as conn:
+        cursor = conn.cursor()
     
-    cursor.execute("""
-        SELECT * FROM players 
-        WHERE game_code = ? 
-        ORDER BY score DESC, created_at ASC
-    """, (game_code,))
+        cursor.execute("""
+            SELECT * FROM players 
+            WHERE game_code = ? 
+            ORDER BY score DESC, created_at ASC
+        """, (game_code,))
     
-    rows = cursor.fetchall()
-    conn.close()
+        rows = cursor.fetchall()
     
     return [{
         "name": row["name"],
@@ -292,12 +602,11 @@ def get_players(game_code: str) -> List[Dict[str, Any]]:
 
 def get_player_by_session(session_id: str) -> Optional[Dict[str, Any]]:
     """Get player by session ID."""
-    conn = get_connection()
-    cursor = conn.cursor()
+    with connection() as conn:
+        cursor = conn.cursor()
     
-    cursor.execute("SELECT * FROM players WHERE session_id = ?", (session_id,))
-    row = cursor.fetchone()
-    conn.close()
+        cursor.execute("SELECT * FROM players WHERE session_id = ?", (session_id,))
+        row = cursor.fetchone()
     
     if row:
         return {
@@ -313,17 +622,16 @@ def get_player_by_session(session_id: str) -> Optional[Dict[str, Any]]:
 def update_player_session(game_code: str, name: str, new_session_id: str) -> bool:
     """Update player's session ID (for reconnection)."""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
+        with connection() as conn:
+            cursor = conn.cursor()
         
-        cursor.execute("""
-            UPDATE players 
-            SET session_id = ?, connected = 1, updated_at = CURRENT_TIMESTAMP
-            WHERE game_code = ? AND name = ?
-        """, (new_session_id, game_code, name))
+            cursor.execute("""
+                UPDATE players 
+                SET session_id = ?, connected = 1, updated_at = CURRENT_TIMESTAMP
+                WHERE game_code = ? AND name_key = ?
+            """, (new_session_id, game_code, name_key(name)))
         
-        conn.commit()
-        conn.close()
+            conn.commit()
         return True
     except Exception as e:
         print(f"Error updating player session: {e}")
@@ -333,17 +641,16 @@ def update_player_session(game_code: str, name: str, new_session_id: str) -> boo
 def update_player_score(game_code: str, name: str, score: int) -> bool:
     """Update player's score."""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
+        with connection() as conn:
+            cursor = conn.cursor()
         
-        cursor.execute("""
-            UPDATE players 
-            SET score = ?, updated_at = CURRENT_TIMESTAMP
-            WHERE game_code = ? AND name = ?
-        """, (score, game_code, name))
+            cursor.execute("""
+                UPDATE players 
+                SET score = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE game_code = ? AND name = ?
+            """, (score, game_code, name))
         
-        conn.commit()
-        conn.close()
+            conn.commit()
         return True
     except Exception as e:
         print(f"Error updating player score: {e}")
@@ -353,17 +660,16 @@ def update_player_score(game_code: str, name: str, score: int) -> bool:
 def update_player_team(game_code: str, name: str, team: str) -> bool:
     """Update player's team."""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
+        with connection() as conn:
+            cursor = conn.cursor()
         
-        cursor.execute("""
-            UPDATE players 
-            SET team = ?, updated_at = CURRENT_TIMESTAMP
-            WHERE game_code = ? AND name = ?
-        """, (team, game_code, name))
+            cursor.execute("""
+                UPDATE players 
+                SET team = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE game_code = ? AND name = ?
+            """, (team, game_code, name))
         
-        conn.commit()
-        conn.close()
+            conn.commit()
         return True
     except Exception as e:
         print(f"Error updating player team: {e}")
@@ -373,26 +679,25 @@ def update_player_team(game_code: str, name: str, team: str) -> bool:
 def reset_game_progress(game_code: str, reset_teams: bool = False) -> bool:
     """Reset player scores and answer history for a game."""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
+        with connection() as conn:
+            cursor = conn.cursor()
 
-        if reset_teams:
-            cursor.execute("""
-                UPDATE players
-                SET score = 0, team = NULL, updated_at = CURRENT_TIMESTAMP
-                WHERE game_code = ?
-            """, (game_code,))
-        else:
-            cursor.execute("""
-                UPDATE players
-                SET score = 0, updated_at = CURRENT_TIMESTAMP
-                WHERE game_code = ?
-            """, (game_code,))
+            if reset_teams:
+                cursor.execute("""
+                    UPDATE players
+                    SET score = 0, team = NULL, updated_at = CURRENT_TIMESTAMP
+                    WHERE game_code = ?
+                """, (game_code,))
+            else:
+                cursor.execute("""
+                    UPDATE players
+                    SET score = 0, updated_at = CURRENT_TIMESTAMP
+                    WHERE game_code = ?
+                """, (game_code,))
 
-        cursor.execute("DELETE FROM question_responses WHERE game_code = ?", (game_code,))
+            cursor.execute("DELETE FROM question_responses WHERE game_code = ?", (game_code,))
 
-        conn.commit()
-        conn.close()
+            conn.commit()
         return True
     except Exception as e:
         print(f"Error resetting game progress: {e}")
@@ -402,62 +707,208 @@ def reset_game_progress(game_code: str, reset_teams: bool = False) -> bool:
 def set_player_connected(session_id: str, connected: bool) -> bool:
     """Set player connection status."""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
+        with connection() as conn:
+            cursor = conn.cursor()
         
-        cursor.execute("""
-            UPDATE players 
-            SET connected = ?, updated_at = CURRENT_TIMESTAMP
-            WHERE session_id = ?
-        """, (connected, session_id))
+            cursor.execute("""
+                UPDATE players 
+                SET connected = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE session_id = ?
+            """, (connected, session_id))
         
-        conn.commit()
-        conn.close()
+            conn.commit()
         return True
     except Exception as e:
         print(f"Error setting player connected status: {e}")
         return False
 
 
+# Game snapshot and ownership operations (multi-worker mode)
+def save_game_snapshot(game_code: str, data: str) -> bool:
+    """Store the serialized in-memory state of a game."""
+    try:
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO game_snapshots (game_code, data) VALUES (?, ?)
+                ON CONFLICT(game_code) DO UPDATE SET
+                    data = excluded.data,
+                    updated_at = CURRENT_TIMESTAMP
+            """, (game_code, data))
+            conn.commit()
+        return True
+    except Exception as e:
+        print(f"Error saving game snapshot: {e}")
+        return False
+
+
+def get_game_snapshot(game_code: str) -> Optional[str]:
+    """Get the serialized state of a game, or None if there is none."""
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT data FROM game_snapshots WHERE game_code = ?", (game_code,))
+        row = cursor.fetchone()
+    return row["data"] if row else None
+
+
+def delete_game_snapshot(game_code: str) -> bool:
+    """Delete the snapshot and ownership record of a game."""
+    try:
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM game_snapshots WHERE game_code = ?", (game_code,))
+            cursor.execute("DELETE FROM game_owners WHERE game_code = ?", (game_code,))
+            conn.commit()
+        return True
+    except Exception as e:
+        print(f"Error deleting game snapshot: {e}")
+        return False
+
+
+def claim_game_owner(game_code: str, owner: str, ttl: float) -> Optional[str]:
+    """Take or renew ownership of a game.
+    
+    Succeeds if the game has no owner, its lease expired or it is already
+    owned by `owner`. Returns the owner after the attempt.
+    """
+    now = time.time()
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO game_owners (game_code, owner, expires_at) VALUES (?, ?, ?)
+            ON CONFLICT(game_code) DO UPDATE SET
+                owner = excluded.owner,
+                expires_at = excluded.expires_at
+            WHERE game_owners.owner = excluded.owner OR game_owners.expires_at < ?
+        """, (game_code, owner, now + ttl, now))
+        conn.commit()
+        cursor.execute("SELECT owner FROM game_owners WHERE game_code = ?", (game_code,))
+        row = cursor.fetchone()
+    return row["owner"] if row else None
+
+
+def get_game_owner(game_code: str) -> Optional[str]:
+    """Get the worker currently owning a game, or None if the lease expired."""
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT owner FROM game_owners WHERE game_code = ? AND expires_at >= ?",
+            (game_code, time.time())
+        )
+        row = cursor.fetchone()
+    return row["owner"] if row else None
+
+
+def release_game_owner(game_code: str, owner: str) -> bool:
+    """Give up ownership of a game if it is held by `owner`."""
+    try:
+        with connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "DELETE FROM game_owners WHERE game_code = ? AND owner = ?",
+                (game_code, owner)
+            )
+            conn.commit()
+        return True
+    except Exception as e:
+        print(f"Error releasing game owner: {e}")
+        return False
+
+
 # Question response operations
 def record_answer(game_code: str, player_name: str, question_index: int,
                   answer_index: int, is_correct: bool, time_taken_ms: int,
                   points_awarded: int) -> bool:
     """Record a player's answer to a question."""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
+        with connection() as conn:
+            cursor = conn.cursor()
         
-        cursor.execute("""
-            INSERT INTO question_responses 
-            (game_code, player_name, question_index, answer_index, is_correct, time_taken_ms, points_awarded)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (game_code, player_name, question_index, answer_index, is_correct, time_taken_ms, points_awarded))
+            cursor.execute("""
+                INSERT INTO question_responses 
+                (game_code, player_name, question_index, answer_index, is_correct, time_taken_ms, points_awarded)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (game_code, player_name, question_index, answer_index, is_correct, time_taken_ms, points_awarded))
         
-        conn.commit()
-        conn.close()
+            conn.commit()
         return True
     except Exception as e:
         print(f"Error recording answer: {e}")
         return False
 
 
+# Statements that can be buffered and written in batches (see write_behind)
+BATCH_STATEMENTS = {
+    "record_answer": """
+        INSERT INTO question_responses 
+        (game_code, player_name, question_index, answer_index, is_correct, time_taken_ms, points_awarded)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """,
+    "update_player_score": """
+        UPDATE players 
+        SET score = ?, updated_at = CURRENT_TIMESTAMP
+        WHERE game_code = ? AND name = ?
+    """,
+    "remove_player": """
+        DELETE FROM players
+        WHERE game_code = ? AND name = ?
+    """,
+}
+
+
+def apply_batch(operations: List[tuple]) -> int:
+    """Apply buffered (kind, params) operations in order; returns how many could not be written.
+
+    Consecutive operations of the same kind are written with executemany in
+    a single transaction. If that transaction fails, it is rolled back and
+    the operations are applied one by one, so a bad row only loses itself.
+    """
+    try:
+        with connection() as conn:
+            cursor = conn.cursor()
+            
+            run_start = 0
+            for i in range(1, len(operations) + 1):
+                if i == len(operations) or operations[i][0] != operations[run_start][0]:
+                    kind = operations[run_start][0]
+                    cursor.executemany(
+                        BATCH_STATEMENTS[kind],
+                        [params for _, params in operations[run_start:i]]
+                    )
+                    run_start = i
+            
+            conn.commit()
+        return 0
+    except Exception as e:
+        print(f"Error applying batch of {len(operations)} operations, writing them one by one: {e}")
+    
+    failed = 0
+    for kind, params in operations:
+        try:
+            with connection() as conn:
+                conn.execute(BATCH_STATEMENTS[kind], params)
+                conn.commit()
+        except Exception as e:
+            failed += 1
+            print(f"Error applying {kind} {params!r}: {e}")
+    return failed
+
+
 def get_game_statistics(game_code: str) -> Dict[str, Any]:
     """Get statistics for a completed game."""
-    conn = get_connection()
-    cursor = conn.cursor()
+    with connection() as conn:
+        cursor = conn.cursor()
     
-    # Get total questions answered
-    cursor.execute("""
-        SELECT COUNT(*) as total_responses,
-               AVG(time_taken_ms) as avg_time,
-               SUM(CASE WHEN is_correct THEN 1 ELSE 0 END) as correct_answers
-        FROM question_responses
-        WHERE game_code = ?
-    """, (game_code,))
+        # Get total questions answered
+        cursor.execute("""
+            SELECT COUNT(*) as total_responses,
+                   AVG(time_taken_ms) as avg_time,
+                   SUM(CASE WHEN is_correct THEN 1 ELSE 0 END) as correct_answers
+            FROM question_responses
+            WHERE game_code = ?
+        """, (game_code,))
     
-    stats = cursor.fetchone()
-    conn.close()
+        stats = cursor.fetchone()
     
     return {
         "total_responses": stats["total_responses"],
@@ -468,21 +919,57 @@ def get_game_statistics(game_code: str) -> Dict[str, Any]:
 
 
 # Cleanup operations
-def cleanup_old_games(hours: int = 24) -> int:
-    """Delete games older than specified hours."""
+def delete_stale_games(hours: int = 24, limit: int = 100) -> int:
+    """Delete up to `limit` games not updated for `hours`, with their players and answers.
+    
+    Each call is one short transaction, so a large backlog can be deleted
+    over several calls without holding the write lock for long.
+    """
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            DELETE FROM games 
-            WHERE datetime(updated_at) < datetime('now', '-' || ? || ' hours')
-        """, (hours,))
-        
-        deleted = cursor.rowcount
-        conn.commit()
-        conn.close()
+        with connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                SELECT game_code FROM games
+                WHERE datetime(updated_at) < datetime('now', '-' || ? || ' hours')
+                LIMIT ?
+            """, (hours, limit))
+            codes = [(row["game_code"],) for row in cursor.fetchall()]
+            if not codes:
+                return 0
+            
+            # Foreign keys are not enforced, so dependent rows are deleted explicitly
+            cursor.executemany("DELETE FROM question_responses WHERE game_code = ?", codes)
+            cursor.executemany("DELETE FROM players WHERE game_code = ?", codes)
+            cursor.executemany("DELETE FROM game_snapshots WHERE game_code = ?", codes)
+            cursor.executemany("DELETE FROM games WHERE game_code = ?", codes)
+            conn.commit()
+        return len(codes)
+    except Exception as e:
+        print(f"Error deleting stale games: {e}")
+        return 0
+
+
+def delete_stale_leftovers(hours: int = 24) -> int:
+    """Delete old snapshots, expired ownership leases and quizzes no game references."""
+    try:
+        with connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                DELETE FROM game_snapshots 
+                WHERE datetime(updated_at) < datetime('now', '-' || ? || ' hours')
+            """, (hours,))
+            deleted = cursor.rowcount
+            cursor.execute("DELETE FROM game_owners WHERE expires_at < ?", (time.time(),))
+            deleted += cursor.rowcount
+            cursor.execute("""
+                DELETE FROM quizzes
+                WHERE quiz_hash NOT IN (SELECT quiz_hash FROM games WHERE quiz_hash IS NOT NULL)
+            """)
+            deleted += cursor.rowcount
+            conn.commit()
         return deleted
     except Exception as e:
-        print(f"Error cleaning up old games: {e}")
+        print(f"Error deleting stale leftovers: {e}")
         return 0
@@ -0,0 +1,410 @@
+"""
+Game state model for QuizKnaller
+Typed, slotted containers for the in-memory state of games, players and answers
+"""
+
+import time as _time
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from database import name_key
+from host_updates import HostUpdates
+from leaderboard import Leaderboard
+from roster import RosterFeed
+
+DEFAULT_INACTIVITY_THRESHOLD = 3  # default number of questions without answer to be considered inactive
+SNAPSHOT_EVERY = 2000  # journal records before the journal is compacted into a snapshot
+# GameState fields mirrored in the games table (see GameState.db_changes)
+DB_FIELDS = ("host_sid", "current_question", "state", "team_mode", "teams", "top_n_players")
+
+# Per-question entries in PlayerState.answers
+NOT_ANSWERED = -1
+INVALID_ANSWER = -2  # submitted, but not a valid answer index
+
+
+def _answer_log() -> array:
+    return array("b")
+
+
+def answer_code(answer: Any) -> int:
+    """Answer index as stored in answer arrays (INVALID_ANSWER unless 0-3)."""
+    valid = isinstance(answer, int) and not isinstance(answer, bool) and 0 <= answer < 4
+    return answer if valid else INVALID_ANSWER
+
+
+@dataclass(slots=True)
+class AnswerRecord:
+    """A player's answer to the current question."""
+    answer: int  # answer index, INVALID_ANSWER if the client sent something else
+    time: float  # seconds since the answers were shown
+
+
+class AnswerSheet:
+    """Answers to the current question in parallel compact arrays.
+
+    One row per answer in arrival order, so scoring can run over the
+    answer and time columns in one pass. A removed player's row is kept
+    (with sid None) to avoid shifting the arrays.
+    """
+
+    __slots__ = ("sids", "answers", "times", "_rows")
+
+    def __init__(self):
+        self.sids: list[Optional[str]] = []
+        self.answers = array("b")
+        self.times = array("d")
+        self._rows: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, sid: str) -> bool:
+        return sid in self._rows
+
+    def __getitem__(self, sid: str) -> AnswerRecord:
+        row = self._rows[sid]
+        return AnswerRecord(self.answers[row], self.times[row])
+
+    def add(self, sid: str, answer: int, time: float):
+        self._rows[sid] = len(self.sids)
+        self.sids.append(sid)
+        self.answers.append(answer)
+        self.times.append(time)
+
+    def move(self, old_sid: str, new_sid: str):
+        row = self._rows.pop(old_sid, None)
+        if row is not None:
+            self._rows[new_sid] = row
+            self.sids[row] = new_sid
+
+    def remove(self, sid: str):
+        row = self._rows.pop(sid, None)
+        if row is not None:
+            self.sids[row] = None
+            self.answers[row] = NOT_ANSWERED
+
+    def items(self):
+        for sid, row in self._rows.items():
+            yield sid, AnswerRecord(self.answers[row], self.times[row])
+
+
+@dataclass(slots=True)
+class PlayerState:
+    """A player in a game."""
+    name: str
+    score: int = 0
+    streak: int = 0
+    team: Optional[str] = None
+    disconnected: bool = False
+    # Answer index per question (NOT_ANSWERED / INVALID_ANSWER otherwise)
+    answers: array = field(default_factory=_answer_log)
+    last_answered: int = -1  # index of the last question the player answered
+
+    def record_answer(self, question_index: int, answer: Any):
+        """Remember the answer given to a question."""
+        log = self.answers
+        if len(log) <= question_index:
+            log.extend([NOT_ANSWERED] * (question_index + 1 - len(log)))
+        log[question_index] = answer_code(answer)
+        self.last_answered = max(self.last_answered, question_index)
+
+    def has_answered(self, question_index: int) -> bool:
+        """Check whether the player answered a question."""
+        return question_index < len(self.answers) and self.answers[question_index] != NOT_ANSWERED
+
+    def is_inactive(self, question_index: int, threshold: int) -> bool:
+        """Check whether the player answered none of the last `threshold` questions up to question_index."""
+        return question_index - self.last_answered >= threshold
+
+    def reset_progress(self, reset_team: bool):
+        """Clear score, streak and answers (e.g. for a new quiz)."""
+        self.score = 0
+        self.streak = 0
+        self.answers = _answer_log()
+        self.last_answered = -1
+        if reset_team:
+            self.team = None
+
+    def to_public(self) -> dict:
+        """Player entry as sent in player lists."""
+        return {"name": self.name, "score": self.score, "team": self.team}
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "score": self.score,
+            "streak": self.streak,
+            "team": self.team,
+            "disconnected": self.disconnected,
+            "answers": self.answers.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PlayerState":
+        answers = array("b", data.get("answers", []))
+        answered = [i for i, answer in enumerate(answers) if answer != NOT_ANSWERED]
+        return cls(
+            name=data["name"],
+            score=data.get("score", 0),
+            streak=data.get("streak", 0),
+            team=data.get("team"),
+            disconnected=data.get("disconnected", False),
+            answers=answers,
+            last_answered=answered[-1] if answered else -1,
+        )
+
+
+@dataclass(slots=True)
+class GameState:
+    """An active game: quiz, players, progress and settings."""
+    host_sid: str
+    quiz: dict
+    players: dict[str, PlayerState] = field(default_factory=dict)
+    current_question: int = -1
+    state: str = "lobby"  # lobby, starting, reading, question, results, ended
+    answers: AnswerSheet = field(default_factory=AnswerSheet)
+    question_start_time: Optional[float] = None
+    opened_at: Optional[float] = None  # wall clock time the current question opened
+    team_mode: bool = False
+    teams: list[str] = field(default_factory=list)
+    top_n_players: int = 3
+    auto_remove_inactive: bool = False
+    inactivity_threshold: int = DEFAULT_INACTIVITY_THRESHOLD
+    host_disconnected: bool = False
+    name_index: dict[str, str] = field(default_factory=dict)  # casefolded player name -> sid
+    leaderboard: Leaderboard = field(default_factory=Leaderboard)
+    roster: RosterFeed = field(default_factory=RosterFeed)  # player list changes not yet sent to the host
+    host_updates: HostUpdates = field(default_factory=HostUpdates)  # progress not yet sent to the host
+    journal: Any = None  # journal.GameJournal recording changes, if journaling is on
+    db_synced: dict[str, Any] = field(default_factory=dict)  # DB_FIELDS values last written to the games row
+    last_activity: float = field(default_factory=_time.monotonic)  # monotonic time of the last change
+
+    def __post_init__(self):
+        for sid, player in self.players.items():
+            if sid not in self.leaderboard:
+                self.leaderboard.add(sid, player.score, player.team)
+
+    # Quiz access
+    @property
+    def question_count(self) -> int:
+        return len(self.quiz["questions"])
+
+    @property
+    def question(self) -> dict:
+        """The current question."""
+        return self.quiz["questions"][self.current_question]
+
+    @property
+    def is_last_question(self) -> bool:
+        return self.current_question >= self.question_count - 1
+
+    # Database sync
+    def db_changes(self) -> dict[str, Any]:
+        """DB_FIELDS whose values differ from what was last written to the games row."""
+        synced = self.db_synced
+        changes = {}
+        for name in DB_FIELDS:
+            value = getattr(self, name)
+            if name not in synced or synced[name] != value:
+                changes[name] = list(value) if name == "teams" else value
+        return changes
+
+    def mark_db_synced(self, changes: Optional[dict[str, Any]] = None):
+        """Record values as written to the games row (all current values if changes is None)."""
+        self.db_synced.update(self.db_changes() if changes is None else changes)
+
+    def touch(self):
+        """Mark the game as active now (see reaper.py)."""
+        self.last_activity = _time.monotonic()
+
+    # Journal
+    def _log(self, kind: str, *args):
+        # Every recorded change counts as activity
+        self.last_activity = _time.monotonic()
+        journal = self.journal
+        if journal is not None:
+            journal.append(kind, *args)
+            if journal.records >= SNAPSHOT_EVERY:
+                self.checkpoint()
+
+    def checkpoint(self):
+        """Write a snapshot to the journal, e.g. after changing settings directly."""
+        if self.journal is not None:
+            self.journal.snapshot(self.to_dict())
+
+    # State transitions
+    def start(self):
+        self.state = "starting"
+        self._log("start")
+
+    def advance_question(self) -> bool:
+        """Move to the next question; returns False when the quiz is over."""
+        self.current_question += 1
+        self.answers = AnswerSheet()
+        self._log("advance")
+        return self.current_question < self.question_count
+
+    def begin_reading(self):
+        self.state = "reading"
+        self._log("reading")
+
+    def open_question(self, now: float, opened_at: Optional[float] = None):
+        self.state = "question"
+        self.question_start_time = now
+        self.opened_at = _time.time() if opened_at is None else opened_at
+        self._log("open", self.opened_at)
+
+    def close_question(self):
+        self.state = "results"
+        self._log("close")
+
+    def end(self):
+        self.state = "ended"
+        self._log("end")
+
+    def switch_quiz(self, quiz: dict):
+        """Load a new quiz, keeping players (and their teams in team mode)."""
+        self.quiz = quiz
+        self.current_question = -1
+        self.state = "lobby"
+        self.answers = AnswerSheet()
+        self.question_start_time = None
+        for sid, player in self.players.items():
+            player.reset_progress(reset_team=not self.team_mode)
+            self.leaderboard.update(sid, 0)
+            self.leaderboard.set_group(sid, player.team)
+        self.checkpoint()
+
+    # Players
+    def find_player(self, name: str) -> Optional[str]:
+        """Find a player's sid by name (case-insensitive)."""
+        return self.name_index.get(name_key(name))
+
+    def add_player(self, sid: str, name: str) -> PlayerState:
+        player = PlayerState(name=name)
+        self.players[sid] = player
+        self.name_index[name_key(name)] = sid
+        self.leaderboard.add(sid)
+        self.roster.added(name)
+        self._log("join", sid, name)
+        return player
+
+    def move_player(self, old_sid: str, new_sid: str) -> PlayerState:
+        """Transfer a player (and a pending answer) to a new socket."""
+        player = self.players.pop(old_sid)
+        self.players[new_sid] = player
+        self.name_index[name_key(player.name)] = new_sid
+        self.leaderboard.move(old_sid, new_sid)
+        self.answers.move(old_sid, new_sid)
+        self._log("move", old_sid, new_sid)
+        return player
+
+    def remove_player(self, sid: str) -> Optional[PlayerState]:
+        player = self.players.pop(sid, None)
+        if player is not None:
+            key = name_key(player.name)
+            if self.name_index.get(key) == sid:
+                del self.name_index[key]
+            self.leaderboard.remove(sid)
+            self.roster.removed(player.name)
+            self._log("leave", sid)
+        self.answers.remove(sid)
+        return player
+
+    def record_answer(self, sid: str, answer: Any, time: float):
+        code = answer_code(answer)
+        self.answers.add(sid, code, time)
+        self.players[sid].record_answer(self.current_question, answer)
+        self._log("answer", sid, code, time)
+
+    def set_score(self, sid: str, score: int):
+        self.players[sid].score = score
+        self.leaderboard.update(sid, score)
+        self._log("score", sid, score)
+
+    def award(self, sid: str, points: int) -> int:
+        """Add points to a player's score; returns the new total."""
+        player = self.players[sid]
+        player.score += points
+        self.leaderboard.update(sid, player.score)
+        self._log("score", sid, player.score)
+        return player.score
+
+    def set_streak(self, sid: str, streak: int):
+        player = self.players[sid]
+        if player.streak != streak:
+            player.streak = streak
+            self._log("streak", sid, streak)
+
+    def set_team(self, sid: str, team: Optional[str]):
+        player = self.players[sid]
+        player.team = team
+        self.leaderboard.set_group(sid, team)
+        self.roster.updated(player.name, team)
+        self._log("team", sid, team)
+
+    def player_list(self) -> list[dict]:
+        return [p.to_public() for p in self.players.values()]
+
+    def ranked_player_list(self) -> list[dict]:
+        """Player entries from the highest score down."""
+        return [self.players[sid].to_public() for sid in self.leaderboard]
+
+    def team_standings(self) -> list[dict]:
+        """Team scores from the sum of each team's top N players, best team first."""
+        standings = []
+        for team in self.teams:
+            top_players = [
+                {"name": self.players[sid].name, "score": self.players[sid].score}
+                for sid in self.leaderboard.group_top(team, self.top_n_players)
+            ]
+            standings.append({
+                "team": team,
+                "score": sum(p["score"] for p in top_players),
+                "player_count": self.leaderboard.group_size(team),
+                "top_players": top_players,
+            })
+        standings.sort(key=lambda x: x["score"], reverse=True)
+        return standings
+
+    # Serialization
+    def to_dict(self) -> dict:
+        return {
+            "host_sid": self.host_sid,
+            "quiz": self.quiz,
+            "players": {sid: p.to_dict() for sid, p in self.players.items()},
+            "current_question": self.current_question,
+            "state": self.state,
+            "opened_at": self.opened_at,
+            "answers": {sid: [a.answer, a.time] for sid, a in self.answers.items()},
+            "team_mode": self.team_mode,
+            "teams": list(self.teams),
+            "top_n_players": self.top_n_players,
+            "auto_remove_inactive": self.auto_remove_inactive,
+            "inactivity_threshold": self.inactivity_threshold,
+            "host_disconnected": self.host_disconnected,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "GameState":
+        players = {sid: PlayerState.from_dict(p) for sid, p in data.get("players", {}).items()}
+        answers = AnswerSheet()
+        for sid, (answer, time) in data.get("answers", {}).items():
+            answers.add(sid, answer_code(answer), time)
+        return cls(
+            host_sid=data["host_sid"],
+            quiz=data["quiz"],
+            players=players,
+            current_question=data.get("current_question", -1),
+            state=data.get("state", "lobby"),
+            opened_at=data.get("opened_at"),
+            answers=answers,
+            team_mode=data.get("team_mode", False),
+            teams=data.get("teams") or [],
+            top_n_players=data.get("top_n_players", 3),
+            auto_remove_inactive=data.get("auto_remove_inactive", False),
+            inactivity_threshold=data.get("inactivity_threshold", DEFAULT_INACTIVITY_THRESHOLD),
+            host_disconnected=data.get("host_disconnected", False),
+            name_index={name_key(p.name): sid for sid, p in players.items()},
+        )
@@ -0,0 +1,176 @@
+"""
+Game state stores for QuizKnaller
+Where game snapshots and worker ownership live: in process, in SQLite or in Redis
+"""
+
+import json
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import async_db as adb
+
+try:
+    from redis import asyncio as aioredis
+except ImportError:  # Redis is only needed for redis:// URLs
+    aioredis = None
+
+
+class GameStore(ABC):
+    """Shared storage for serialized games (GameState.to_dict) and their owners.
+
+    Every game is owned by one worker at a time, which holds it in memory
+    and handles all of its events. Ownership is a lease that the owner
+    renews; when a worker dies its leases expire and another worker can
+    claim the game and continue from the last snapshot.
+    """
+
+    @abstractmethod
+    async def load(self, game_code: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def save(self, game_code: str, data: dict):
+        ...
+
+    @abstractmethod
+    async def delete(self, game_code: str):
+        ...
+
+    @abstractmethod
+    async def claim(self, game_code: str, owner: str, ttl: float) -> Optional[str]:
+        """Take or renew the lease on a game; returns the owner after the attempt."""
+
+    @abstractmethod
+    async def owner(self, game_code: str) -> Optional[str]:
+        """The worker holding a valid lease on a game, if any."""
+
+    @abstractmethod
+    async def release(self, game_code: str, owner: str):
+        ...
+
+    async def close(self):
+        pass
+
+
+class MemoryGameStore(GameStore):
+    """Store inside the current process (single worker, the default)."""
+
+    def __init__(self):
+        self._snapshots: dict[str, dict] = {}
+        self._owners: dict[str, tuple[str, float]] = {}
+
+    async def load(self, game_code: str) -> Optional[dict]:
+        return self._snapshots.get(game_code)
+
+    async def save(self, game_code: str, data: dict):
+        self._snapshots[game_code] = data
+
+    async def delete(self, game_code: str):
+        self._snapshots.pop(game_code, None)
+        self._owners.pop(game_code, None)
+
+    async def claim(self, game_code: str, owner: str, ttl: float) -> Optional[str]:
+        now = time.time()
+        current = self._owners.get(game_code)
+        if current is None or current[0] == owner or current[1] < now:
+            self._owners[game_code] = (owner, now + ttl)
+            return owner
+        return current[0]
+
+    async def owner(self, game_code: str) -> Optional[str]:
+        current = self._owners.get(game_code)
+        if current is None or current[1] < time.time():
+            return None
+        return current[0]
+
+    async def release(self, game_code: str, owner: str):
+        if self._owners.get(game_code, (None,))[0] == owner:
+            del self._owners[game_code]
+
+
+class SQLiteGameStore(GameStore):
+    """Store in the QuizKnaller database, shared by workers on one machine."""
+
+    async def load(self, game_code: str) -> Optional[dict]:
+        data = await adb.get_game_snapshot(game_code)
+        return json.loads(data) if data else None
+
+    async def save(self, game_code: str, data: dict):
+        await adb.save_game_snapshot(game_code, json.dumps(data))
+
+    async def delete(self, game_code: str):
+        await adb.delete_game_snapshot(game_code)
+
+    async def claim(self, game_code: str, owner: str, ttl: float) -> Optional[str]:
+        return await adb.claim_game_owner(game_code, owner, ttl)
+
+    async def owner(self, game_code: str) -> Optional[str]:
+        return await adb.get_game_owner(game_code)
+
+    async def release(self, game_code: str, owner: str):
+        await adb.release_game_owner(game_code, owner)
+
+
+class RedisGameStore(GameStore):
+    """Store in Redis (or a compatible server), shared by workers on several machines."""
+
+    # Renew or take over a lease atomically: KEYS[1] = lease, ARGV = owner, ttl in ms
+    _CLAIM_SCRIPT = """
+        local current = redis.call('GET', KEYS[1])
+        if not current or current == ARGV[1] then
+            redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+            return ARGV[1]
+        end
+        return current
+    """
+    _RELEASE_SCRIPT = """
+        if redis.call('GET', KEYS[1]) == ARGV[1] then
+            return redis.call('DEL', KEYS[1])
+        end
+        return 0
+    """
+
+    def __init__(self, url: str, prefix: str = "quizknaller"):
+        if aioredis is None:
+            raise RuntimeError("The redis package is required for a redis:// game store")
+        self.redis = aioredis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self._claim = self.redis.register_script(self._CLAIM_SCRIPT)
+        self._release = self.redis.register_script(self._RELEASE_SCRIPT)
+
+    def _key(self, kind: str, game_code: str) -> str:
+        return f"{self.prefix}:{kind}:{game_code}"
+
+    async def load(self, game_code: str) -> Optional[dict]:
+        data = await self.redis.get(self._key("game", game_code))
+        return json.loads(data) if data else None
+
+    async def save(self, game_code: str, data: dict):
+        await self.redis.set(self._key("game", game_code), json.dumps(data))
+
+    async def delete(self, game_code: str):
+        await self.redis.delete(self._key("game", game_code), self._key("owner", game_code))
+
+    async def claim(self, game_code: str, owner: str, ttl: float) -> Optional[str]:
+        return await self._claim(keys=[self._key("owner", game_code)], args=[owner, int(ttl * 1000)])
+
+    async def owner(self, game_code: str) -> Optional[str]:
+        return await self.redis.get(self._key("owner", game_code))
+
+    async def release(self, game_code: str, owner: str):
+        await self._release(keys=[self._key("owner", game_code)], args=[owner])
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+def create_game_store(url: str) -> GameStore:
+    """Create a game store from a URL: memory, sqlite or redis://..."""
+    if not url or url == "memory":
+        return MemoryGameStore()
+    if url == "sqlite":
+        return SQLiteGameStore()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisGameStore(url)
+    raise ValueError(f"Unsupported game store: {url}")
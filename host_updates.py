@@ -0,0 +1,41 @@
+"""
+Host updates for QuizKnaller
+Progress notices for the host screen, merged until the next update tick
+"""
+
+
+class HostUpdates:
+    """What changed for the host of one game since the last tick.
+
+    Answer progress is only a flag (the counts are read from the game when
+    the tick fires), and connection notices keep the latest state per
+    player, so a short drop-out and reconnect within a tick cancel out.
+    """
+
+    __slots__ = ("answers_changed", "_connections")
+
+    def __init__(self):
+        self.answers_changed = False
+        self._connections: dict[str, bool] = {}  # player name -> connected
+
+    def answer_received(self):
+        self.answers_changed = True
+
+    def connection_changed(self, name: str, connected: bool):
+        if self._connections.get(name) is (not connected):
+            # Back to the state the host last saw
+            del self._connections[name]
+        else:
+            self._connections[name] = connected
+
+    def take_connections(self) -> dict[str, list[str]]:
+        """Disconnected and reconnected player names since the last call."""
+        notice = {
+            "disconnected": [name for name, connected in self._connections.items() if not connected],
+            "reconnected": [name for name, connected in self._connections.items() if connected],
+        }
+        self._connections.clear()
+        return notice
+
+    def __bool__(self) -> bool:
+        return self.answers_changed or bool(self._connections)
@@ -0,0 +1,230 @@
+"""
+Game journal for QuizKnaller
+Append-only log of each game's changes on top of a compact snapshot, replayed after a restart
+"""
+
+import asyncio
+import marshal
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from game_state import GameState
+
+# Set QUIZKNALLER_JOURNAL=0 to turn journaling off
+enabled = os.environ.get("QUIZKNALLER_JOURNAL", "1").lower() not in ("0", "false", "no", "off")
+
+JOURNAL_DIR = Path(os.environ.get("QUIZKNALLER_JOURNAL_DIR", Path(__file__).parent / "journal"))
+FORMAT_VERSION = 1
+
+_LENGTH = struct.Struct("<I")
+
+# Single thread, so journal writes and snapshots happen in the order they were queued
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="journal")
+
+# Record kinds, stored as small integers
+KINDS = {
+    "snapshot": 0,
+    "join": 1,
+    "leave": 2,
+    "move": 3,
+    "team": 4,
+    "answer": 5,
+    "score": 6,
+    "streak": 7,
+    "start": 8,
+    "advance": 9,
+    "reading": 10,
+    "open": 11,
+    "close": 12,
+    "end": 13,
+}
+KIND_NAMES = {code: name for name, code in KINDS.items()}
+
+
+class GameJournal:
+    """Journal file of one game: a snapshot record followed by change records.
+
+    Records are marshalled tuples with a length prefix. They are collected
+    during a loop tick and handed to the journal writer thread in one
+    write, so the event loop never touches the disk; snapshots are
+    marshalled and swapped in on the same thread, in order with the
+    records. A torn record at the end (crash in the middle of a write) is
+    ignored when reading.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.records = 0  # appended since the last snapshot
+        self._pending: list[bytes] = []
+        self._flush_scheduled = False
+        self._file = None  # only used on the writer thread
+
+    def append(self, kind: str, *args):
+        data = marshal.dumps((KINDS[kind], *args))
+        self._pending.append(_LENGTH.pack(len(data)) + data)
+        self.records += 1
+        if not self._flush_scheduled:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.flush()
+            else:
+                self._flush_scheduled = True
+                loop.call_soon(self.flush)
+
+    def flush(self):
+        """Hand the records appended so far to the writer thread."""
+        self._flush_scheduled = False
+        if self._pending:
+            data = b"".join(self._pending)
+            self._pending = []
+            _writer.submit(self._write, data)
+
+    def snapshot(self, state: dict):
+        """Replace the journal with a single snapshot of the game."""
+        # Records not handed to the writer yet are part of the state
+        self._pending = []
+        self.records = 0
+        _writer.submit(self._write_snapshot, state)
+
+    def close(self):
+        self.flush()
+        _writer.submit(self._close_file)
+
+    def delete(self):
+        self._pending = []
+        _writer.submit(self._delete_file)
+
+    # Writer thread
+    def _write(self, data: bytes):
+        try:
+            if self._file is None:
+                self._file = open(self.path, "ab", buffering=0)
+            self._file.write(data)
+        except OSError as e:
+            print(f"Could not write journal {self.path.name}: {e}")
+
+    def _write_snapshot(self, state: dict):
+        data = marshal.dumps((KINDS["snapshot"], FORMAT_VERSION, state))
+        tmp_path = self.path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(_LENGTH.pack(len(data)) + data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Could not write journal snapshot {self.path.name}: {e}")
+        # Later records go to the new file
+        self._close_file()
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _delete_file(self):
+        self._close_file()
+        self.path.unlink(missing_ok=True)
+
+
+def sync():
+    """Block until every queued journal write is on disk (in the OS, not fsynced)."""
+    _writer.submit(lambda: None).result()
+
+
+async def drain():
+    """Wait until every queued journal write is done, e.g. on shutdown."""
+    await asyncio.wrap_future(_writer.submit(lambda: None))
+
+
+def journal_path(game_code: str) -> Path:
+    return JOURNAL_DIR / f"{game_code}.journal"
+
+
+def attach(game_code: str, game: GameState):
+    """Start journaling a game, beginning with a snapshot of its current state."""
+    if not enabled:
+        return
+    JOURNAL_DIR.mkdir(parents=True, exist_ok=True)
+    game.journal = GameJournal(journal_path(game_code))
+    game.checkpoint()
+
+
+def read_records(path: Path) -> Iterator[tuple]:
+    data = path.read_bytes()
+    offset = 0
+    while offset + _LENGTH.size <= len(data):
+        (length,) = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size
+        if offset + length > len(data):
+            break  # torn write at the end
+        yield marshal.loads(data[offset:offset + length])
+        offset += length
+
+
+def _apply(game: GameState, kind: str, args: tuple):
+    if kind == "join":
+        game.add_player(*args)
+    elif kind == "leave":
+        game.remove_player(*args)
+    elif kind == "move":
+        game.move_player(*args)
+    elif kind == "team":
+        game.set_team(*args)
+    elif kind == "answer":
+        game.record_answer(*args)
+    elif kind == "score":
+        game.set_score(*args)
+    elif kind == "streak":
+        game.set_streak(*args)
+    elif kind == "start":
+        game.start()
+    elif kind == "advance":
+        game.advance_question()
+    elif kind == "reading":
+        game.begin_reading()
+    elif kind == "open":
+        game.open_question(0.0, opened_at=args[0])
+    elif kind == "close":
+        game.close_question()
+    elif kind == "end":
+        game.end()
+
+
+def load_game(path: Path) -> Optional[GameState]:
+    """Rebuild a game from its journal: the snapshot plus every change after it."""
+    records = read_records(path)
+    first = next(records, None)
+    if first is None or first[0] != KINDS["snapshot"] or first[1] != FORMAT_VERSION:
+        return None
+    game = GameState.from_dict(first[2])
+    for record in records:
+        _apply(game, KIND_NAMES[record[0]], record[1:])
+    return game
+
+
+def recover(owns_code: Callable[[str], bool] = lambda code: True) -> list[tuple[str, GameState]]:
+    """Load every journaled game (of this worker) and keep journaling it."""
+    if not enabled or not JOURNAL_DIR.is_dir():
+        return []
+    recovered = []
+    for path in sorted(JOURNAL_DIR.glob("*.journal")):
+        game_code = path.stem
+        if not owns_code(game_code):
+            continue
+        try:
+            game = load_game(path)
+        except (OSError, ValueError, EOFError, TypeError, KeyError, IndexError) as e:
+            print(f"Could not recover game {game_code} from its journal: {e!r}")
+            game = None
+        if game is None:
+            continue
+        # Every socket of the previous process is gone
+        for player in game.players.values():
+            player.disconnected = True
+        game.host_disconnected = True
+        attach(game_code, game)
+        recovered.append((game_code, game))
+    return recovered
@@ -0,0 +1,181 @@
+"""
+Leaderboard for QuizKnaller
+Players kept ordered by score so ranks and top lists need no sorting after each question
+"""
+
+from bisect import bisect_left, insort
+from itertools import count
+from typing import Iterator, Optional
+
+BUCKET_SIZE = 64  # entries per bucket before it is split
+
+
+class SortedKeys:
+    """Sorted list of unique keys stored in buckets of bounded size.
+
+    Insert and delete bisect into the right bucket and only shift that
+    bucket, so updates stay cheap for thousands of players while iteration
+    in order is a plain walk over the buckets.
+    """
+
+    def __init__(self):
+        self._buckets: list[list] = []
+        self._maxes: list = []  # last key of each bucket
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator:
+        for bucket in self._buckets:
+            yield from bucket
+
+    def add(self, key):
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+        else:
+            i = bisect_left(self._maxes, key)
+            if i == len(self._maxes):
+                i -= 1
+                self._buckets[i].append(key)
+                self._maxes[i] = key
+            else:
+                insort(self._buckets[i], key)
+            bucket = self._buckets[i]
+            if len(bucket) > 2 * BUCKET_SIZE:
+                self._buckets.insert(i + 1, bucket[BUCKET_SIZE:])
+                del bucket[BUCKET_SIZE:]
+                self._maxes.insert(i, bucket[-1])
+        self._len += 1
+
+    def remove(self, key):
+        i = bisect_left(self._maxes, key)
+        bucket = self._buckets[i]
+        del bucket[bisect_left(bucket, key)]
+        if bucket:
+            self._maxes[i] = bucket[-1]
+        else:
+            del self._buckets[i]
+            del self._maxes[i]
+        self._len -= 1
+
+    def index(self, key) -> int:
+        """Number of keys smaller than key."""
+        i = bisect_left(self._maxes, key)
+        before = sum(len(b) for b in self._buckets[:i])
+        if i == len(self._buckets):
+            return before
+        return before + bisect_left(self._buckets[i], key)
+
+    def first(self, n: int) -> list:
+        result = []
+        for bucket in self._buckets:
+            if len(result) >= n:
+                break
+            result.extend(bucket[:n - len(result)])
+        return result
+
+
+class Leaderboard:
+    """Players of a game ordered by score, ties in join order.
+
+    Entries are (-score, join order, sid) keys; a score change moves one
+    key. Each team (group) keeps its own ordering for team top-N scoring.
+    """
+
+    def __init__(self):
+        self._keys = SortedKeys()
+        self._entries: dict[str, tuple] = {}  # sid -> key
+        self._groups: dict[str, Optional[str]] = {}  # sid -> team
+        self._group_keys: dict[str, SortedKeys] = {}
+        self._order = count()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, sid: str) -> bool:
+        return sid in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        """Sids from the highest score down."""
+        for key in self._keys:
+            yield key[2]
+
+    def _insert(self, key: tuple, group: Optional[str]):
+        self._keys.add(key)
+        if group is not None:
+            self._group_keys.setdefault(group, SortedKeys()).add(key)
+
+    def _delete(self, key: tuple, group: Optional[str]):
+        self._keys.remove(key)
+        if group is not None:
+            self._group_keys[group].remove(key)
+
+    def add(self, sid: str, score: int = 0, group: Optional[str] = None):
+        key = (-score, next(self._order), sid)
+        self._entries[sid] = key
+        self._groups[sid] = group
+        self._insert(key, group)
+
+    def remove(self, sid: str):
+        key = self._entries.pop(sid, None)
+        if key is not None:
+            self._delete(key, self._groups.pop(sid))
+
+    def move(self, old_sid: str, new_sid: str):
+        """Re-key a player who reconnected with a new sid, keeping their place."""
+        old_key = self._entries.pop(old_sid)
+        group = self._groups.pop(old_sid)
+        self._delete(old_key, group)
+        key = (old_key[0], old_key[1], new_sid)
+        self._entries[new_sid] = key
+        self._groups[new_sid] = group
+        self._insert(key, group)
+
+    def update(self, sid: str, score: int):
+        old_key = self._entries[sid]
+        if old_key[0] == -score:
+            return
+        group = self._groups[sid]
+        self._delete(old_key, group)
+        key = (-score, old_key[1], sid)
+        self._entries[sid] = key
+        self._insert(key, group)
+
+    def set_group(self, sid: str, group: Optional[str]):
+        key = self._entries[sid]
+        old_group = self._groups[sid]
+        if old_group == group:
+            return
+        if old_group is not None:
+            self._group_keys[old_group].remove(key)
+        if group is not None:
+            self._group_keys.setdefault(group, SortedKeys()).add(key)
+        self._groups[sid] = group
+
+    def rank(self, sid: str) -> int:
+        """1-based rank; players with the same score share a rank (1, 1, 3, ...)."""
+        score_key = self._entries[sid][0]
+        return self._keys.index((score_key, -1)) + 1
+
+    def ranked(self) -> Iterator[tuple[int, str]]:
+        """(rank, sid) pairs from the highest score down."""
+        rank = 0
+        previous_score = None
+        for position, key in enumerate(self._keys, 1):
+            if key[0] != previous_score:
+                rank = position
+                previous_score = key[0]
+            yield rank, key[2]
+
+    def top(self, n: int) -> list[str]:
+        return [key[2] for key in self._keys.first(n)]
+
+    def group_top(self, group: str, n: int) -> list[str]:
+        keys = self._group_keys.get(group)
+        return [key[2] for key in keys.first(n)] if keys else []
+
+    def group_size(self, group: str) -> int:
+        keys = self._group_keys.get(group)
+        return len(keys) if keys else 0
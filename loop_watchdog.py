@@ -0,0 +1,194 @@
+"""
+Event loop watchdog for QuizKnaller
+Detects stalls of the asyncio loop and samples the blocking stack into flamegraph input
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+import metrics
+
+# Opt-in: QUIZKNALLER_WATCHDOG=1 starts the watchdog with the server
+enabled = os.environ.get("QUIZKNALLER_WATCHDOG", "").lower() in ("1", "true", "yes", "on")
+
+STALL_THRESHOLD = float(os.environ.get("QUIZKNALLER_WATCHDOG_THRESHOLD", "0.1"))  # seconds of lag that count as a stall
+PROFILE_DIR = Path(os.environ.get("QUIZKNALLER_WATCHDOG_DIR", Path(__file__).parent / "profiles"))
+HEARTBEAT_INTERVAL = 0.02  # seconds between heartbeats of the event loop
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples while the loop is stalled
+DUMP_INTERVAL = 60.0  # seconds between writes of the collapsed-stack file
+TOP_HANDLERS = 5  # handlers listed in the summary
+
+PROJECT_DIR = str(Path(__file__).parent.resolve())
+# Decorator layers that are never the handler to blame
+WRAPPER_MODULES = {"metrics.py", "loop_watchdog.py", "async_db.py"}
+WRAPPER_FUNCTIONS = {"routed"}
+
+stalls_total = metrics.counter(
+    "quizknaller_loop_stalls_total", "Event loop stalls longer than the watchdog threshold", ("handler",))
+stall_seconds = metrics.counter(
+    "quizknaller_loop_stall_seconds_total", "Time the event loop spent stalled", ("handler",))
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})"
+
+
+def _collapse(frame) -> Optional[tuple[str, str]]:
+    """Collapsed stack (root first, ';'-separated) and a label for the blocking handler.
+
+    The handler is the outermost project function running inside the event
+    loop's callback, so that a handler calling into database.py is reported
+    as the handler, with the innermost project function as the blocking call.
+    None if the loop is not running a callback (e.g. waiting in select).
+    """
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    start = None
+    for i, f in enumerate(frames):
+        if f.f_code.co_name == "_run" and f.f_code.co_filename.endswith(os.path.join("asyncio", "events.py")):
+            start = i + 1
+    if start is None:
+        return None
+    project = [
+        f for f in frames[start:]
+        if f.f_code.co_filename.startswith(PROJECT_DIR)
+        and Path(f.f_code.co_filename).name not in WRAPPER_MODULES
+        and f.f_code.co_name not in WRAPPER_FUNCTIONS
+    ]
+    if project:
+        handler = project[0].f_code.co_name
+        if project[-1] is not project[0]:
+            handler += f" -> {_frame_label(project[-1])}"
+    else:
+        handler = _frame_label(frames[-1])
+    # Line numbers stay out of the stack key so samples of one function merge
+    stack = ";".join(f"{f.f_code.co_name} ({Path(f.f_code.co_filename).name})" for f in frames)
+    return stack, handler
+
+
+class LoopWatchdog:
+    """Watches an event loop from a helper thread.
+
+    The loop bumps a heartbeat every HEARTBEAT_INTERVAL. When the thread sees
+    no heartbeat for longer than the threshold, the loop is blocked by
+    synchronous code, so it samples the loop thread's stack until the loop
+    comes back. Samples are accumulated as collapsed stacks ("a;b;c count"),
+    the input format of flamegraph.pl, inferno and speedscope.
+    """
+
+    def __init__(self, threshold: float = STALL_THRESHOLD, profile_dir: Path = PROFILE_DIR):
+        self.threshold = threshold
+        self.profile_dir = Path(profile_dir)
+        self.samples: Counter[str] = Counter()
+        self.handler_seconds: Counter[str] = Counter()
+        self.handler_stalls: Counter[str] = Counter()
+        self._beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_dump = time.monotonic()
+
+    def start(self):
+        """Start watching the running event loop."""
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        print(f"Loop watchdog on: stalls over {self.threshold * 1000:.0f}ms are profiled to {self.profile_dir}")
+
+    async def _heartbeat(self):
+        while True:
+            self._beat = time.monotonic()
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+    def _watch(self):
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            if time.monotonic() - self._beat > HEARTBEAT_INTERVAL + self.threshold:
+                self._profile_stall()
+            if time.monotonic() - self._last_dump > DUMP_INTERVAL:
+                self.dump()
+
+    def _sample(self) -> Optional[tuple[str, str]]:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        return _collapse(frame) if frame is not None else None
+
+    def _profile_stall(self):
+        beat = self._beat
+        handlers: Counter[str] = Counter()
+        while self._beat == beat and not self._stop.is_set():
+            sample = self._sample()
+            if sample is not None:
+                stack, handler = sample
+                self.samples[stack] += 1
+                handlers[handler] += 1
+            time.sleep(SAMPLE_INTERVAL)
+        if not handlers:
+            return
+        # The stall started when the heartbeat was due, not when it was noticed
+        duration = time.monotonic() - beat - HEARTBEAT_INTERVAL
+        handler = handlers.most_common(1)[0][0]
+        self.handler_seconds[handler] += duration
+        self.handler_stalls[handler] += 1
+        stalls_total.inc(handler)
+        stall_seconds.inc(handler, amount=duration)
+        print(f"Event loop blocked for {duration * 1000:.0f}ms in {handler}")
+
+    def summary(self) -> str:
+        if not self.handler_stalls:
+            return "Loop watchdog: no stalls"
+        lines = ["Loop watchdog: top blocking handlers"]
+        for handler, seconds in self.handler_seconds.most_common(TOP_HANDLERS):
+            lines.append(f"  {handler}: {self.handler_stalls[handler]} stalls, {seconds * 1000:.0f}ms total")
+        return "\n".join(lines)
+
+    def dump(self) -> Optional[Path]:
+        """Write the collapsed stacks sampled so far (overwrites the previous dump)."""
+        self._last_dump = time.monotonic()
+        if not self.samples:
+            return None
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        path = self.profile_dir / f"loop-stalls-{os.getpid()}.folded"
+        lines = [f"{stack} {count}" for stack, count in list(self.samples.items())]
+        path.write_text("\n".join(lines) + "\n")
+        print(self.summary())
+        return path
+
+    def stop(self) -> Optional[Path]:
+        self._stop.set()
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+        if self._thread is not None:
+            self._thread.join()
+        return self.dump()
+
+
+watchdog: Optional[LoopWatchdog] = None
+
+
+def start():
+    """Start the watchdog on the running loop if QUIZKNALLER_WATCHDOG is set."""
+    global watchdog
+    if enabled and watchdog is None:
+        watchdog = LoopWatchdog()
+        watchdog.start()
+
+
+def stop():
+    global watchdog
+    if watchdog is not None:
+        path = watchdog.stop()
+        if path:
+            print(f"Loop stall profile written to {path}")
+        watchdog = None
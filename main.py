@@ -15,21 +15,39 @@ def _should_keep_path(p: str) -> bool:
 sys.path = [p for p in sys.path if _should_keep_path(p)]
 
 import asyncio
+import hashlib
 import io
 import json
+import os
+import time
 import uuid
+from array import array
 from pathlib import Path
+from typing import Optional
 
 import qrcode
 import socketio
 from fastapi import FastAPI, Request
-from fastapi.responses import FileResponse, HTMLResponse, StreamingResponse
+from fastapi.responses import FileResponse, HTMLResponse, Response
 from fastapi.staticfiles import StaticFiles
 
+import async_db as adb
+import cluster
 import database as db
+import journal
+import loop_watchdog
+import reaper
+import metrics
+import results_engine
+import scoring
+from game_state import DEFAULT_INACTIVITY_THRESHOLD, GameState, answer_code
+from lru import LRUCache
+from quiz_catalog import QuizCatalog
+from scheduler import TimerWheel
+import write_behind
 
 # Create Socket.IO server
-sio = socketio.AsyncServer(async_mode="asgi", cors_allowed_origins="*")
+sio = socketio.AsyncServer(async_mode="asgi", cors_allowed_origins="*", client_manager=cluster.client_manager())
 app = FastAPI(title="QuizKnaller", description="Wissen macht BUMM! 💥")
 socket_app = socketio.ASGIApp(sio, other_asgi_app=app)
 
@@ -37,29 +55,57 @@ socket_app = socketio.ASGIApp(sio, other_asgi_app=app)
 db.init_db()
 
 # In-memory cache for active games (with database persistence)
-games: dict[str, dict] = {}
+games: dict[str, GameState] = {}
 
 # Track pending host disconnection cleanup tasks
 host_disconnect_tasks: dict[str, asyncio.Task] = {}
 
+# Phase deadlines of all games (starting, reading, question), keyed by game code
+game_timers = TimerWheel()
+
+# With a shared game store, its snapshots take over crash recovery (see cluster.py)
+if cluster.enabled:
+    journal.enabled = False
+
+# Index of Socket.IO sessions: sid -> (game_code, "host" | "player")
+sessions: dict[str, tuple[str, str]] = {}
+
+# Sockets connected here whose game is owned by another worker: sid -> game_code
+remote_sessions: dict[str, str] = {}
+
+# Handlers of game events, by event name (see game_event)
+game_event_handlers: dict = {}
+
 # Configuration
 HOST_RECONNECT_GRACE_PERIOD = 60  # seconds to wait before ending game after host disconnect
 READING_SPEED_WPM = 150  # words per minute for reading phase (lower = more time)
 MIN_READING_TIME = 2  # minimum seconds for reading phase
 MAX_READING_TIME = 8  # maximum seconds for reading phase
-DEFAULT_INACTIVITY_THRESHOLD = 3  # default number of questions without answer to be considered inactive
 MIN_TIME_LIMIT = 5  # minimum time limit for questions in seconds
 MAX_TIME_LIMIT = 120  # maximum time limit for questions in seconds
+START_COUNTDOWN = 3  # seconds between game start and the first question
+QUESTION_TIME_GRACE = 1.0  # extra seconds before the server closes a question, for answers still in flight
+# Seconds between batched updates to the host (answer counts, player list, connection notices)
+HOST_UPDATE_INTERVAL = float(os.environ.get("QUIZKNALLER_HOST_UPDATE_INTERVAL", "0.1"))
+DB_SYNC_INTERVAL = 1.0  # seconds a game's progress may wait before its database row is updated
+QR_CACHE_SIZE = 256  # number of rendered QR code PNGs kept in memory
+QR_CACHE_MAX_AGE = 86400  # seconds browsers may cache a QR code
 
 # Load quiz data
 QUIZ_FILE = Path(__file__).parent / "quizzes.json"
+quiz_catalog = QuizCatalog(QUIZ_FILE)
 
 
 def load_quizzes() -> list[dict]:
-    if QUIZ_FILE.exists():
-        with open(QUIZ_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+    return quiz_catalog.quizzes()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match request header against an ETag."""
+    if not if_none_match:
+        return False
+    candidates = [c.strip().removeprefix("W/") for c in if_none_match.split(",")]
+    return etag in candidates or "*" in candidates
 
 
 def calculate_reading_time(text: str) -> float:
@@ -76,6 +122,177 @@ def generate_game_code() -> str:
     return str(uuid.uuid4())[:6].upper()
 
 
+async def new_game_code() -> str:
+    """Generate a game code that is not in use, owned by this worker."""
+    while True:
+        game_code = generate_game_code()
+        if game_code in games or not cluster.owns_code(game_code):
+            continue
+        if not cluster.enabled or await cluster.claim(game_code):
+            return game_code
+
+
+def track_session(sid: str, game_code: str, role: str):
+    """Record which game (and in which role) a socket belongs to."""
+    sessions[sid] = (game_code, role)
+
+
+def untrack_session(sid: str, game_code: Optional[str] = None):
+    """Forget a socket, optionally only if it is indexed for the given game."""
+    if game_code is None or sessions.get(sid, (None,))[0] == game_code:
+        sessions.pop(sid, None)
+
+
+def unload_game(game_code: str):
+    """Drop a game from memory together with its sessions, timers and cached assets."""
+    game_timers.cancel(game_code)
+    game_timers.cancel((game_code, "host"))
+    game = games.pop(game_code, None)
+    if game is not None:
+        if (game_code, "sync") in game_timers:
+            write_game_changes(game_code, game)
+        if game.journal is not None:
+            game.journal.close()
+        untrack_session(game.host_sid, game_code)
+        for player_sid in game.players:
+            untrack_session(player_sid, game_code)
+    qr_cache.remove_where(lambda key: key[1] == game_code)
+
+
+def remove_game(game_code: str):
+    """Drop a game that is over, including its journal or shared snapshot in multi-worker mode."""
+    game = games.get(game_code)
+    unload_game(game_code)
+    if game is not None and game.journal is not None:
+        game.journal.delete()
+    if cluster.enabled:
+        cluster.spawn(cluster.store.delete(game_code))
+
+
+def players_room(game_code: str) -> str:
+    """Socket.IO room with all players of a game (the game room also contains the host)."""
+    return f"{game_code}:players"
+
+
+async def join_game_rooms(sid: str, game_code: str):
+    """Add a player's socket to the game room and the players-only room."""
+    await sio.enter_room(sid, game_code)
+    await sio.enter_room(sid, players_room(game_code))
+
+
+async def leave_game_rooms(sid: str, game_code: str):
+    """Remove a player's socket from the game room and the players-only room."""
+    await sio.leave_room(sid, game_code)
+    await sio.leave_room(sid, players_room(game_code))
+
+
+@metrics.timed("your_result", metrics.emit_seconds)
+async def send_encoded(packets: list[tuple[str, str]]):
+    """Send pre-encoded Socket.IO packets (see results_engine.encode_event) concurrently."""
+    sends = []
+    for sid, encoded in packets:
+        eio_sid = sio.manager.eio_sid_from_sid(sid, "/")
+        if eio_sid is not None:
+            sends.append(sio.eio.send(eio_sid, encoded))
+        elif cluster.enabled:
+            # Socket on another worker: go through the message queue
+            event, data = json.loads(encoded[1:])
+            sends.append(sio.emit(event, data, to=sid))
+    await asyncio.gather(*sends, return_exceptions=True)
+
+
+def schedule_host_update(game_code: str):
+    """Send the host the game's pending changes with the next update tick."""
+    key = (game_code, "host")
+    if key not in game_timers:
+        game_timers.schedule(key, HOST_UPDATE_INTERVAL, send_host_updates, game_code)
+
+
+async def send_host_updates(game_code: str):
+    """Send the host everything that changed since the last tick, one event of each kind."""
+    game = games.get(game_code)
+    if game is None:
+        return
+    
+    roster = game.roster.flush()
+    if roster is not None:
+        roster["count"] = len(game.players)
+        await sio.emit("roster_update", roster, to=game.host_sid)
+    
+    updates = game.host_updates
+    if not updates:
+        return
+    if updates.answers_changed:
+        updates.answers_changed = False
+        await sio.emit("answer_update", {
+            "answered": len(game.answers),
+            "total": len(game.players)
+        }, to=game.host_sid)
+    connections = updates.take_connections()
+    if connections["disconnected"] or connections["reconnected"]:
+        await sio.emit("player_connection_update", connections, to=game.host_sid)
+
+
+async def flush_host_updates(game_code: str):
+    """Send pending host updates now, e.g. so the final answer count arrives before the results."""
+    game_timers.cancel((game_code, "host"))
+    await send_host_updates(game_code)
+
+
+async def route_game_event(event: str, sid: str, data) -> bool:
+    """Make sure the game of an event is owned by this worker, or forward the event.
+    
+    Returns True if the event should be handled here.
+    """
+    game_code = str(data.get("code") or "").upper() if isinstance(data, dict) else ""
+    if not game_code or game_code in games:
+        return True
+    
+    owner = await cluster.store.owner(game_code)
+    if owner is None and await cluster.claim(game_code):
+        # Nobody owns the game (new worker or its owner died): continue from the snapshot
+        snapshot = await cluster.store.load(game_code)
+        if snapshot is not None and game_code not in games:
+            resume_game(game_code, GameState.from_dict(snapshot))
+        elif snapshot is None:
+            await cluster.store.release(game_code, cluster.WORKER_ID)
+        return True
+    owner = owner or await cluster.store.owner(game_code)
+    if owner is None or owner == cluster.WORKER_ID:
+        return True
+    
+    remote_sessions[sid] = game_code
+    await cluster.forward(owner, event, sid, data)
+    return False
+
+
+def game_event(handler):
+    """Register a Socket.IO handler for an event of a game (identified by data["code"]).
+    
+    In multi-worker mode the event is handled by the worker owning the game.
+    """
+    game_event_handlers[handler.__name__] = handler
+    if not cluster.enabled:
+        return sio.on(handler.__name__)(handler)
+    
+    async def routed(sid, data):
+        if await route_game_event(handler.__name__, sid, data):
+            return await handler(sid, data)
+    
+    sio.on(handler.__name__, routed)
+    return handler
+
+
+async def dispatch_forwarded_event(event: str, sid: str, data):
+    """Handle an event that another worker forwarded to the owner of its game."""
+    if event == "disconnect":
+        await disconnect(sid)
+        return
+    handler = game_event_handlers.get(event)
+    if handler is not None:
+        await handler(sid, data)
+
+
 # Serve static files
 static_path = Path(__file__).parent / "static"
 app.mount("/static", StaticFiles(directory=static_path), name="static")
@@ -99,14 +316,12 @@ async def creator():
     return FileResponse(static_path / "creator.html")
 
 
-@app.get("/api/qrcode")
-async def get_qrcode(request: Request, code: str):
-    """Generate a QR code for the game join URL."""
-    # Get the base URL from the request
-    base_url = f"{request.url.scheme}://{request.headers.get('host', 'localhost:8080')}"
-    join_url = f"{base_url}/?code={code}"
-    
-    # Generate QR code
+# Rendered QR codes: (base URL, game code) -> (PNG bytes, ETag)
+qr_cache = LRUCache(QR_CACHE_SIZE)
+
+
+def render_qrcode(join_url: str) -> bytes:
+    """Render a join URL as a PNG QR code."""
     qr = qrcode.QRCode(version=1, box_size=10, border=2)
     qr.add_data(join_url)
     qr.make(fit=True)
@@ -116,16 +331,46 @@ async def get_qrcode(request: Request, code: str):
     # Save to bytes buffer
     buf = io.BytesIO()
     img.save(buf, format="PNG")
-    buf.seek(0)
+    return buf.getvalue()
+
+
+@app.get("/api/qrcode")
+async def get_qrcode(request: Request, code: str):
+    """Generate a QR code for the game join URL."""
+    # Get the base URL from the request
+    base_url = f"{request.url.scheme}://{request.headers.get('host', 'localhost:8080')}"
+    cache_key = (base_url, code)
+    
+    cached = qr_cache.get(cache_key)
+    if cached is None:
+        # Render in a worker thread so Socket.IO traffic keeps flowing
+        png = await asyncio.to_thread(render_qrcode, f"{base_url}/?code={code}")
+        cached = (png, f'"{hashlib.sha1(png).hexdigest()}"')
+        qr_cache.put(cache_key, cached)
+    png, etag = cached
     
-    return StreamingResponse(buf, media_type="image/png")
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={QR_CACHE_MAX_AGE}"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=png, media_type="image/png", headers=headers)
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics (disabled with QUIZKNALLER_METRICS=0)."""
+    if not metrics.enabled:
+        return Response(status_code=404)
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 @app.get("/api/quizzes")
-async def get_quizzes():
+async def get_quizzes(request: Request):
     """Get available quizzes."""
-    quizzes = load_quizzes()
-    return [{"id": i, "title": q["title"], "questionCount": len(q["questions"])} for i, q in enumerate(quizzes)]
+    body, etag = quiz_catalog.summary()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 # Socket.IO events
@@ -134,72 +379,109 @@ async def connect(sid, environ):
     print(f"Client connected: {sid}")
 
 
-def sync_game_to_db(game_code: str):
-    """Sync in-memory game state to database."""
+def sync_game_to_db(game_code: str, force: bool = False):
+    """Sync in-memory game state to database.
+    
+    Only fields that changed since the last write are updated. Writes are
+    coalesced per game for DB_SYNC_INTERVAL seconds; force writes right
+    away, for transitions a restart must not miss (start and end of a game).
+    """
     if game_code not in games:
         return
     
     game = games[game_code]
-    db.update_game(
-        game_code,
-        host_sid=game["host_sid"],
-        current_question=game["current_question"],
-        state=game["state"],
-        team_mode=game["team_mode"],
-        teams=game["teams"],
-        top_n_players=game["top_n_players"]
-    )
+    if cluster.enabled:
+        cluster.save_game(game_code, game)
+    key = (game_code, "sync")
+    if force:
+        write_game_changes(game_code, game)
+    elif key not in game_timers:
+        game_timers.schedule(key, DB_SYNC_INTERVAL, flush_game_sync, game_code)
+
 
+async def flush_game_sync(game_code: str):
+    game = games.get(game_code)
+    if game is not None:
+        write_game_changes(game_code, game)
 
-def load_game_from_db(game_code: str) -> bool:
+
+def write_game_changes(game_code: str, game: GameState, **columns):
+    """Write the game's changed fields (plus any extra columns) to its row, if anything changed."""
+    game_timers.cancel((game_code, "sync"))
+    changes = game.db_changes()
+    game.mark_db_synced(changes)
+    if changes or columns:
+        adb.submit(db.update_game, game_code, **changes, **columns)
+
+
+async def load_game_from_db(game_code: str) -> bool:
     """Load game from database into memory."""
-    game_data = db.get_game(game_code)
+    game_data = await adb.get_game(game_code)
     if not game_data:
         return False
     
     # Load players
-    players_data = db.get_players(game_code)
-    players = {}
+    players_data = await adb.get_players(game_code)
+    
+    # Another handler may have loaded the game while we were waiting
+    if game_code in games:
+        return True
+    game = GameState(
+        host_sid=game_data["host_sid"],
+        quiz=game_data["quiz"],
+        current_question=game_data["current_question"],
+        state=game_data["state"],
+        team_mode=game_data["team_mode"],
+        teams=game_data["teams"],
+        top_n_players=game_data["top_n_players"],
+    )
+    game.mark_db_synced()
     for p in players_data:
-        players[p["session_id"]] = {
-            "name": p["name"],
-            "score": p["score"],
-            "team": p["team"],
-            "streak": 0,  # Reset streak on load
-        }
+        # Streak and answers are not persisted and start over on load
+        game.add_player(p["session_id"], p["name"])
+        game.set_score(p["session_id"], p["score"])
+        game.set_team(p["session_id"], p["team"])
+    resume_game(game_code, game)
+    return True
+
+
+def resume_game(game_code: str, game: GameState):
+    """Put a game restored from storage back into play."""
+    games[game_code] = game
+    if game.journal is None:
+        journal.attach(game_code, game)
     
-    games[game_code] = {
-        "host_sid": game_data["host_sid"],
-        "quiz": game_data["quiz"],
-        "players": players,
-        "current_question": game_data["current_question"],
-        "state": game_data["state"],
-        "answers": {},
-        "question_start_time": None,
-        "team_mode": game_data["team_mode"],
-        "teams": game_data["teams"],
-        "top_n_players": game_data["top_n_players"],
-        "auto_remove_inactive": False,  # Default to disabled on load
-        "inactivity_threshold": DEFAULT_INACTIVITY_THRESHOLD,
-        "answer_history": {},  # Track which questions each player answered
-    }
+    track_session(game.host_sid, game_code, "host")
+    for player_sid in game.players:
+        track_session(player_sid, game_code, "player")
     
-    return True
+    if game.state == "question" and game.opened_at is not None:
+        # Continue the open question with the time it has left
+        elapsed = max(0.0, time.time() - game.opened_at)
+        game.question_start_time = asyncio.get_event_loop().time() - elapsed
+        remaining = game.question.get("time_limit", 20) + QUESTION_TIME_GRACE - elapsed
+        game_timers.schedule(game_code, max(0.0, remaining), show_results, game_code)
+    elif game.state in ("reading", "question"):
+        # Reading deadlines are not persisted: show the answers right away
+        game.begin_reading()
+        game_timers.schedule(game_code, 0, open_question, game_code)
+    elif game.state == "starting":
+        game_timers.schedule(game_code, START_COUNTDOWN, next_question, game_code)
 
 
-@sio.event
+@game_event
 async def reconnect_host(sid, data):
     """Host reconnects to their game."""
     game_code = data.get("code")
     
     # Try to load from database if not in memory
     if game_code not in games:
-        if not load_game_from_db(game_code):
+        if not await load_game_from_db(game_code):
             await sio.emit("reconnect_failed", {"message": "Spiel nicht gefunden"}, to=sid)
             return
     
     game = games[game_code]
-    old_host_sid = game["host_sid"]
+    old_host_sid = game.host_sid
     
     # Cancel any pending cleanup task
     if game_code in host_disconnect_tasks:
@@ -208,11 +490,14 @@ async def reconnect_host(sid, data):
         del host_disconnect_tasks[game_code]
     
     # Clear disconnected flag
-    game["host_disconnected"] = False
+    game.host_disconnected = False
+    game.touch()
     
     # Update host SID
-    game["host_sid"] = sid
-    db.update_game(game_code, host_sid=sid)
+    game.host_sid = sid
+    untrack_session(old_host_sid, game_code)
+    track_session(sid, game_code, "host")
+    sync_game_to_db(game_code)
     await sio.enter_room(sid, game_code)
     
     # Notify players that host is back
@@ -223,16 +508,17 @@ async def reconnect_host(sid, data):
     # Send current game state to host
     await sio.emit("reconnected_host", {
         "code": game_code,
-        "quiz_title": game["quiz"]["title"],
-        "state": game["state"],
-        "current_question": game["current_question"],
-        "players": [{"name": p["name"], "score": p["score"], "team": p["team"]} for p in game["players"].values()],
-        "team_mode": game["team_mode"],
-        "teams": game["teams"],
+        "quiz_title": game.quiz["title"],
+        "state": game.state,
+        "current_question": game.current_question,
+        "players": game.player_list(),
+        "roster_version": game.roster.snapshot_version(),
+        "team_mode": game.team_mode,
+        "teams": game.teams,
     }, to=sid)
 
 
-@sio.event
+@game_event
 async def reconnect_player(sid, data):
     """Player reconnects to their game."""
     game_code = data.get("code")
@@ -240,47 +526,44 @@ async def reconnect_player(sid, data):
     
     # Try to load from database if not in memory
     if game_code not in games:
-        if not load_game_from_db(game_code):
+        if not await load_game_from_db(game_code):
             await sio.emit("reconnect_failed", {"message": "Spiel nicht gefunden"}, to=sid)
             return
     
     game = games[game_code]
     
     # Find player by name
-    old_sid = None
-    for player_sid, player in game["players"].items():
-        if player["name"].lower() == player_name.lower():
-            old_sid = player_sid
-            break
+    old_sid = game.find_player(player_name or "")
     
     if old_sid is None:
         await sio.emit("reconnect_failed", {"message": "Spieler nicht gefunden"}, to=sid)
         return
     
-    # Transfer player data to new SID
-    player_data = game["players"][old_sid]
-    del game["players"][old_sid]
-    game["players"][sid] = player_data
+    # Transfer player data (and a pending answer) to new SID
+    player_data = game.move_player(old_sid, sid)
+    untrack_session(old_sid, game_code)
+    track_session(sid, game_code, "player")
     
-    # Update database
-    db.update_player_session(game_code, player_name, sid)
+    if player_data.disconnected:
+        player_data.disconnected = False
+        game.host_updates.connection_changed(player_data.name, True)
+        schedule_host_update(game_code)
     
-    # Transfer answer if exists
-    if old_sid in game["answers"]:
-        game["answers"][sid] = game["answers"][old_sid]
-        del game["answers"][old_sid]
+    # Update database
+    adb.submit(db.update_player_session, game_code, player_name, sid)
     
-    await sio.enter_room(sid, game_code)
+    await leave_game_rooms(old_sid, game_code)
+    await join_game_rooms(sid, game_code)
     
     # Send current game state
     await sio.emit("reconnected_player", {
         "code": game_code,
-        "quiz_title": game["quiz"]["title"],
-        "state": game["state"],
-        "score": player_data["score"],
-        "team": player_data["team"],
-        "team_mode": game["team_mode"],
-        "teams": game["teams"],
+        "quiz_title": game.quiz["title"],
+        "state": game.state,
+        "score": player_data.score,
+        "team": player_data.team,
+        "team_mode": game.team_mode,
+        "teams": game.teams,
     }, to=sid)
 
 
@@ -288,110 +571,104 @@ async def reconnect_player(sid, data):
 async def disconnect(sid):
     print(f"Client disconnected: {sid}")
     # Mark player as disconnected in database
-    db.set_player_connected(sid, False)
+    adb.submit(db.set_player_connected, sid, False)
+    
+    # Find which game this socket belonged to and notify the host
+    session = sessions.get(sid)
+    if session is None:
+        game_code = remote_sessions.pop(sid, None)
+        if game_code is not None:
+            # The game lives on another worker
+            owner = await cluster.store.owner(game_code)
+            if owner is not None and owner != cluster.WORKER_ID:
+                await cluster.forward(owner, "disconnect", sid, {"code": game_code})
+        return
+    game_code, role = session
+    game = games.get(game_code)
+    if game is None:
+        untrack_session(sid)
+        return
     
-    # Find which game this player was in and notify the host
-    for game_code, game in list(games.items()):
-        if sid in game["players"]:
-            player_name = game["players"][sid]["name"]
-            
-            # Only remove player if game is in lobby state
-            # During active game, keep player data for reconnection
-            if game["state"] == "lobby":
-                # Remove player from game in lobby
-                del game["players"][sid]
-                
-                # Notify host and remaining players about the disconnection
-                player_list = [{"name": p["name"], "score": p["score"], "team": p["team"]} for p in game["players"].values()]
-                await sio.emit("player_left", {
-                    "name": player_name,
-                    "players": player_list
-                }, room=game_code)
-            else:
-                # Game is active - mark player as disconnected but keep their data
-                game["players"][sid]["disconnected"] = True
-                print(f"Player {player_name} disconnected during active game {game_code}, keeping data for reconnection")
-                
-                # Notify host about temporary disconnection
-                await sio.emit("player_disconnected", {
-                    "name": player_name,
-                    "message": f"{player_name} hat die Verbindung verloren"
-                }, room=game_code)
-            break
-        elif sid == game["host_sid"]:
-            # Host disconnected - start grace period for reconnection
-            print(f"Host disconnected from game {game_code}, starting {HOST_RECONNECT_GRACE_PERIOD}s grace period")
-            
-            # Mark host as disconnected (but don't delete game)
-            game["host_disconnected"] = True
-            
-            # Notify players that host is temporarily disconnected
-            await sio.emit("host_disconnected", {
-                "message": "Der Host hat die Verbindung verloren. Warte auf Wiederverbindung...",
-                "grace_period": HOST_RECONNECT_GRACE_PERIOD
-            }, room=game_code)
-            
-            # Cancel any existing cleanup task for this game
-            if game_code in host_disconnect_tasks:
-                host_disconnect_tasks[game_code].cancel()
+    if role == "player" and sid in game.players:
+        player_name = game.players[sid].name
+        
+        # Only remove player if game is in lobby state
+        # During active game, keep player data for reconnection
+        if game.state == "lobby":
+            # Remove player from game in lobby
+            game.remove_player(sid)
+            untrack_session(sid, game_code)
             
-            # Start cleanup task with grace period
-            async def cleanup_after_grace_period(code: str):
-                try:
-                    await asyncio.sleep(HOST_RECONNECT_GRACE_PERIOD)
-                    # Check if host is still disconnected
-                    if code in games and games[code].get("host_disconnected", False):
-                        print(f"Host did not reconnect to game {code}, ending game")
-                        await sio.emit("game_ended", {
-                            "reason": "Der Host hat das Spiel verlassen."
-                        }, room=code)
-                        await asyncio.sleep(0.5)
-                        if code in games:
-                            del games[code]
-                    # Clean up task reference
-                    if code in host_disconnect_tasks:
-                        del host_disconnect_tasks[code]
-                except asyncio.CancelledError:
-                    # Task was cancelled because host reconnected
-                    pass
+            # Notify host about the disconnection
+            schedule_host_update(game_code)
+        else:
+            # Game is active - mark player as disconnected but keep their data
+            game.players[sid].disconnected = True
+            print(f"Player {player_name} disconnected during active game {game_code}, keeping data for reconnection")
             
-            host_disconnect_tasks[game_code] = asyncio.create_task(
-                cleanup_after_grace_period(game_code)
-            )
-            break
+            # Notify host about temporary disconnection
+            game.host_updates.connection_changed(player_name, False)
+            schedule_host_update(game_code)
+    elif role == "host" and sid == game.host_sid:
+        # Host disconnected - start grace period for reconnection
+        print(f"Host disconnected from game {game_code}, starting {HOST_RECONNECT_GRACE_PERIOD}s grace period")
+        
+        # Mark host as disconnected (but don't delete game)
+        game.host_disconnected = True
+        
+        # Notify players that host is temporarily disconnected
+        await sio.emit("host_disconnected", {
+            "message": "Der Host hat die Verbindung verloren. Warte auf Wiederverbindung...",
+            "grace_period": HOST_RECONNECT_GRACE_PERIOD
+        }, room=game_code)
+        
+        # Cancel any existing cleanup task for this game
+        if game_code in host_disconnect_tasks:
+            host_disconnect_tasks[game_code].cancel()
+        
+        # Start cleanup task with grace period
+        async def cleanup_after_grace_period(code: str):
+            try:
+                await asyncio.sleep(HOST_RECONNECT_GRACE_PERIOD)
+                # Check if host is still disconnected
+                if code in games and games[code].host_disconnected:
+                    print(f"Host did not reconnect to game {code}, ending game")
+                    await sio.emit("game_ended", {
+                        "reason": "Der Host hat das Spiel verlassen."
+                    }, room=code)
+                    await asyncio.sleep(0.5)
+                    remove_game(code)
+                # Clean up task reference
+                if code in host_disconnect_tasks:
+                    del host_disconnect_tasks[code]
+            except asyncio.CancelledError:
+                # Task was cancelled because host reconnected
+                pass
+        
+        host_disconnect_tasks[game_code] = asyncio.create_task(
+            cleanup_after_grace_period(game_code)
+        )
 
 
 @sio.event
 async def create_game(sid, data):
     """Host creates a new game."""
     quiz_id = data.get("quiz_id", 0)
-    quizzes = load_quizzes()
+    quiz = quiz_catalog.get(quiz_id)
     
-    if quiz_id >= len(quizzes):
+    if quiz is None:
         await sio.emit("error", {"message": "Quiz nicht gefunden"}, to=sid)
         return
     
-    game_code = generate_game_code()
-    quiz = quizzes[quiz_id]
+    game_code = await new_game_code()
     
     # Create in database
-    db.create_game(game_code, sid, quiz["title"], quiz)
-    
-    games[game_code] = {
-        "host_sid": sid,
-        "quiz": quiz,
-        "players": {},
-        "current_question": -1,
-        "state": "lobby",  # lobby, question, results, leaderboard, ended
-        "answers": {},
-        "question_start_time": None,
-        "team_mode": False,
-        "teams": [],
-        "top_n_players": 3,
-        "auto_remove_inactive": False,
-        "inactivity_threshold": DEFAULT_INACTIVITY_THRESHOLD,
-        "answer_history": {},  # Track which questions each player answered
-    }
+    adb.submit(db.create_game, game_code, sid, quiz["title"], quiz)
+    
+    games[game_code] = GameState(host_sid=sid, quiz=quiz)
+    games[game_code].mark_db_synced()
+    journal.attach(game_code, games[game_code])
+    track_session(sid, game_code, "host")
     
     await sio.enter_room(sid, game_code)
     await sio.emit("game_created", {
@@ -433,26 +710,15 @@ async def create_custom_game(sid, data):
             await sio.emit("error", {"message": f"Ungültiges Fragen-Format bei Frage {i + 1}"}, to=sid)
             return
     
-    game_code = generate_game_code()
+    game_code = await new_game_code()
     
     # Create in database
-    db.create_game(game_code, sid, quiz["title"], quiz)
-    
-    games[game_code] = {
-        "host_sid": sid,
-        "quiz": quiz,
-        "players": {},
-        "current_question": -1,
-        "state": "lobby",
-        "answers": {},
-        "question_start_time": None,
-        "team_mode": False,
-        "teams": [],
-        "top_n_players": 3,
-        "auto_remove_inactive": False,
-        "inactivity_threshold": DEFAULT_INACTIVITY_THRESHOLD,
-        "answer_history": {},
-    }
+    adb.submit(db.create_game, game_code, sid, quiz["title"], quiz)
+    
+    games[game_code] = GameState(host_sid=sid, quiz=quiz)
+    games[game_code].mark_db_synced()
+    journal.attach(game_code, games[game_code])
+    track_session(sid, game_code, "host")
     
     await sio.enter_room(sid, game_code)
     await sio.emit("game_created", {
@@ -465,76 +731,61 @@ async def create_custom_game(sid, data):
 def apply_quiz_switch(game_code: str, quiz: dict) -> list[dict]:
     """Apply quiz switch while keeping the same game session and players."""
     game = games[game_code]
+    game_timers.cancel(game_code)
+    game.switch_quiz(quiz)
 
-    game["quiz"] = quiz
-    game["current_question"] = -1
-    game["state"] = "lobby"
-    game["answers"] = {}
-    game["question_start_time"] = None
-    game["answer_history"] = {}
+    # Buffered answers and scores of the old quiz must not land on top of the reset.
+    # Discard them first: every adb.submit flushes the buffer (write barrier).
+    write_behind.discard_progress(game_code)
+    write_game_changes(game_code, game, quiz_name=quiz["title"], quiz=quiz)
+    adb.submit(db.reset_game_progress, game_code, reset_teams=not game.team_mode)
 
-    for player in game["players"].values():
-        player["score"] = 0
-        player["streak"] = 0
-        if not game["team_mode"]:
-            player["team"] = None
+    return game.player_list()
 
-    db.update_game(
-        game_code,
-        quiz_name=quiz["title"],
-        quiz=quiz,
-        current_question=-1,
-        state="lobby",
-    )
-    db.reset_game_progress(game_code, reset_teams=not game["team_mode"])
-
-    return [{"name": p["name"], "score": p["score"], "team": p["team"]} for p in game["players"].values()]
 
-
-@sio.event
+@game_event
 async def switch_game_quiz(sid, data):
     """Host switches the quiz within an existing game session."""
     game_code = data.get("code")
     quiz_id = data.get("quiz_id", 0)
-    quizzes = load_quizzes()
+    quiz = quiz_catalog.get(quiz_id)
 
     if game_code not in games:
         await sio.emit("error", {"message": "Spiel nicht gefunden"}, to=sid)
         return
 
-    if quiz_id >= len(quizzes):
+    if quiz is None:
         await sio.emit("error", {"message": "Quiz nicht gefunden"}, to=sid)
         return
 
     game = games[game_code]
-    if game["host_sid"] != sid:
+    if game.host_sid != sid:
         return
 
-    if game["state"] not in ("lobby", "ended"):
+    if game.state not in ("lobby", "ended"):
         await sio.emit("error", {"message": "Quizwechsel ist nur in der Lobby oder nach Spielende möglich"}, to=sid)
         return
 
-    quiz = quizzes[quiz_id]
-
     players = apply_quiz_switch(game_code, quiz)
     await sio.emit("game_quiz_switched", {
         "code": game_code,
         "quiz_title": quiz["title"],
         "question_count": len(quiz["questions"]),
         "players": players,
+        "roster_version": game.roster.snapshot_version(),
     }, to=sid)
 
-    for player_sid, player in game["players"].items():
+    for player_sid, player in game.players.items():
         await sio.emit("quiz_switched", {
             "code": game_code,
             "quiz_title": quiz["title"],
-            "team_mode": game["team_mode"],
-            "teams": game["teams"],
-            "team": player["team"],
+            "team_mode": game.team_mode,
+            "teams": game.teams,
+            "team": player.team,
         }, to=player_sid)
 
 
-@sio.event
+@game_event
 async def switch_custom_game_quiz(sid, data):
     """Host switches to a custom quiz within an existing game session."""
     game_code = data.get("code")
@@ -570,10 +821,10 @@ async def switch_custom_game_quiz(sid, data):
             return
 
     game = games[game_code]
-    if game["host_sid"] != sid:
+    if game.host_sid != sid:
         return
 
-    if game["state"] not in ("lobby", "ended"):
+    if game.state not in ("lobby", "ended"):
         await sio.emit("error", {"message": "Quizwechsel ist nur in der Lobby oder nach Spielende möglich"}, to=sid)
         return
 
@@ -583,19 +834,39 @@ async def switch_custom_game_quiz(sid, data):
         "quiz_title": quiz["title"],
         "question_count": len(quiz["questions"]),
         "players": players,
+        "roster_version": game.roster.snapshot_version(),
     }, to=sid)
 
-    for player_sid, player in game["players"].items():
+    for player_sid, player in game.players.items():
         await sio.emit("quiz_switched", {
             "code": game_code,
             "quiz_title": quiz["title"],
-            "team_mode": game["team_mode"],
-            "teams": game["teams"],
-            "team": player["team"],
+            "team_mode": game.team_mode,
+            "teams": game.teams,
+            "team": player.team,
         }, to=player_sid)
 
 
-@sio.event
+@game_event
+async def request_roster(sid, data):
+    """Host missed a roster update and asks for the full player list."""
+    game_code = data.get("code")
+    
+    if game_code not in games:
+        return
+    
+    game = games[game_code]
+    
+    if game.host_sid != sid:
+        return
+    
+    await sio.emit("roster_snapshot", {
+        "version": game.roster.snapshot_version(),
+        "players": game.player_list(),
+    }, to=sid)
+
+
+@game_event
 async def join_game(sid, data):
     """Player joins a game."""
     game_code = data.get("code", "").upper()
@@ -612,87 +883,72 @@ async def join_game(sid, data):
     game = games[game_code]
     
     # Check if player with same name already exists (potential reconnect)
-    existing_sid = None
-    for player_sid, player in game["players"].items():
-        if player["name"].lower() == player_name.lower():
-            existing_sid = player_sid
-            break
+    existing_sid = game.find_player(player_name)
     
     if existing_sid is not None:
         # Player with same name exists - treat as reconnection
-        # Transfer player data to new SID
-        player_data = game["players"][existing_sid]
-        del game["players"][existing_sid]
+        # Transfer player data (and a pending answer) to new SID
+        player_data = game.move_player(existing_sid, sid)
         
         # Clear disconnected flag if it was set
-        player_data["disconnected"] = False
+        player_data.disconnected = False
         
-        game["players"][sid] = player_data
+        untrack_session(existing_sid, game_code)
+        track_session(sid, game_code, "player")
         
         # Update database
-        db.update_player_session(game_code, player_name, sid)
-        
-        # Transfer answer if exists
-        if existing_sid in game["answers"]:
-            game["answers"][sid] = game["answers"][existing_sid]
-            del game["answers"][existing_sid]
+        adb.submit(db.update_player_session, game_code, player_name, sid)
         
-        await sio.enter_room(sid, game_code)
+        await leave_game_rooms(existing_sid, game_code)
+        await join_game_rooms(sid, game_code)
         
         # Notify host that player reconnected
-        await sio.emit("player_reconnected", {
-            "name": player_name,
-            "message": f"{player_name} ist wieder verbunden"
-        }, room=game_code)
+        game.host_updates.connection_changed(player_data.name, True)
+        schedule_host_update(game_code)
         
         # Send current game state (same as reconnect_player)
         await sio.emit("reconnected_player", {
             "code": game_code,
-            "quiz_title": game["quiz"]["title"],
-            "state": game["state"],
-            "score": player_data["score"],
-            "team": player_data["team"],
-            "team_mode": game["team_mode"],
-            "teams": game["teams"],
+            "quiz_title": game.quiz["title"],
+            "state": game.state,
+            "score": player_data.score,
+            "team": player_data.team,
+            "team_mode": game.team_mode,
+            "teams": game.teams,
         }, to=sid)
         
         print(f"Player {player_name} reconnected to game {game_code}")
         return
     
     # New player - only allow in lobby state
-    if game["state"] != "lobby":
+    if game.state != "lobby":
         await sio.emit("error", {"message": "Spiel hat bereits begonnen"}, to=sid)
         return
     
+    # Reserve the player in memory first so concurrent joins see the name
+    game.add_player(sid, player_name)
+    track_session(sid, game_code, "player")
+    
     # Add to database
-    if not db.add_player(game_code, sid, player_name):
+    if not await adb.add_player(game_code, sid, player_name):
+        game.remove_player(sid)
+        untrack_session(sid, game_code)
         await sio.emit("error", {"message": "Fehler beim Beitreten"}, to=sid)
         return
     
-    game["players"][sid] = {
-        "name": player_name,
-        "score": 0,
-        "streak": 0,
-        "team": None,
-    }
-    
-    await sio.enter_room(sid, game_code)
+    await join_game_rooms(sid, game_code)
     await sio.emit("joined_game", {
         "code": game_code,
-        "quiz_title": game["quiz"]["title"],
-        "team_mode": game["team_mode"],
-        "teams": game["teams"]
+        "quiz_title": game.quiz["title"],
+        "team_mode": game.team_mode,
+        "teams": game.teams
     }, to=sid)
     
     # Notify host
-    player_list = [{"name": p["name"], "score": p["score"], "team": p["team"]} for p in game["players"].values()]
-    await sio.emit("player_joined", {
-        "name": player_name,
-        "players": player_list
-    }, room=game_code)
+    schedule_host_update(game_code)
 
 
-@sio.event
+@game_event
 async def start_game(sid, data):
     """Host starts the game."""
     game_code = data.get("code")
@@ -702,38 +958,36 @@ async def start_game(sid, data):
     
     game = games[game_code]
     
-    if game["host_sid"] != sid:
+    if game.host_sid != sid:
         return
     
-    if len(game["players"]) < 1:
+    if len(game.players) < 1:
         await sio.emit("error", {"message": "Mindestens 1 Spieler benötigt"}, to=sid)
         return
     
-    game["state"] = "starting"
+    game.start()
     await sio.emit("game_starting", {}, room=game_code)
     
     # Short countdown before first question
-    sync_game_to_db(game_code)
-    await asyncio.sleep(3)
-    await next_question(game_code)
+    sync_game_to_db(game_code, force=True)
+    game_timers.schedule(game_code, START_COUNTDOWN, next_question, game_code)
 
 
+@metrics.timed("next_question")
 async def next_question(game_code: str):
     """Send the next question to all players."""
     if game_code not in games:
         return
     
     game = games[game_code]
-    game["current_question"] += 1
-    game["answers"] = {}
     
-    if game["current_question"] >= len(game["quiz"]["questions"]):
+    if not game.advance_question():
         # Game over
         await end_game(game_code)
         return
     
-    question = game["quiz"]["questions"][game["current_question"]]
-    game["state"] = "reading"  # New state for reading phase
+    question = game.question
+    game.begin_reading()  # New state for reading phase
     
     # Calculate reading time based on question length
     reading_time = calculate_reading_time(question["question"])
@@ -741,90 +995,82 @@ async def next_question(game_code: str):
     # Sync to database
     sync_game_to_db(game_code)
     
-    # Send reading phase to host (question only, no timer yet)
+    # Send reading phase to host and players (question only, no timer yet)
     await sio.emit("show_question_reading", {
-        "question_num": game["current_question"] + 1,
-        "total_questions": len(game["quiz"]["questions"]),
+        "question_num": game.current_question + 1,
+        "total_questions": game.question_count,
         "question": question["question"],
         "reading_time": reading_time,
-    }, to=game["host_sid"])
-    
-    # Send reading phase to players (question only)
-    for player_sid in game["players"]:
-        await sio.emit("show_question_reading", {
-            "question_num": game["current_question"] + 1,
-            "total_questions": len(game["quiz"]["questions"]),
-            "question": question["question"],
-            "reading_time": reading_time,
-        }, to=player_sid)
-    
-    # Wait for reading time, then show answers
-    await asyncio.sleep(reading_time)
+    }, room=game_code)
     
+    # Show answers once the reading time is over
+    game_timers.schedule(game_code, reading_time, open_question, game_code)
+
+
+@metrics.timed("open_question")
+async def open_question(game_code: str):
+    """Show the answers of the current question and start its timer."""
     # Check if game still exists and is still in reading state
-    if game_code not in games or games[game_code]["state"] != "reading":
+    if game_code not in games or games[game_code].state != "reading":
         return
     
-    game["state"] = "question"
-    game["question_start_time"] = asyncio.get_event_loop().time()
+    game = games[game_code]
+    question = game.question
+    time_limit = question.get("time_limit", 20)
+    game.open_question(asyncio.get_event_loop().time())
+    
+    # The server closes the question, independent of the host's clock
+    game_timers.schedule(game_code, time_limit + QUESTION_TIME_GRACE, show_results, game_code)
     
     # Send answers to host (with correct answer)
     await sio.emit("show_answers", {
         "answers": question["answers"],
         "correct_index": question["correct"],
-        "time_limit": question.get("time_limit", 20),
-    }, to=game["host_sid"])
+        "time_limit": time_limit,
+    }, to=game.host_sid)
     
     # Send answers to players (without correct answer)
-    for player_sid in game["players"]:
-        await sio.emit("show_answers", {
-            "answers": question["answers"],
-            "time_limit": question.get("time_limit", 20),
-        }, to=player_sid)
+    await sio.emit("show_answers", {
+        "answers": question["answers"],
+        "time_limit": time_limit,
+    }, room=players_room(game_code))
 
 
-@sio.event
+@game_event
 async def submit_answer(sid, data):
     """Player submits an answer."""
     game_code = data.get("code")
-    answer_index = data.get("answer")
+    # Anything but an answer index 0-3 is stored as INVALID_ANSWER
+    answer_index = answer_code(data.get("answer"))
     
     if game_code not in games:
         return
     
     game = games[game_code]
     
-    if sid not in game["players"]:
+    if sid not in game.players:
         return
     
-    if game["state"] != "question":
+    if game.state != "question":
         return
     
-    if sid in game["answers"]:
+    if sid in game.answers:
         return  # Already answered
     
     # Calculate response time
-    response_time = asyncio.get_event_loop().time() - game["question_start_time"]
-    question = game["quiz"]["questions"][game["current_question"]]
-    time_limit = question.get("time_limit", 20)
-    
-    game["answers"][sid] = {
-        "answer": answer_index,
-        "time": response_time,
-    }
+    response_time = asyncio.get_event_loop().time() - game.question_start_time
+    question = game.question
     
-    # Track answer history for inactive detection
-    if sid not in game["answer_history"]:
-        game["answer_history"][sid] = []
-    game["answer_history"][sid].append(game["current_question"])
+    # Also tracks the answer history for inactive detection
+    game.record_answer(sid, answer_index, response_time)
     
     # Record answer in database
-    player = game["players"][sid]
+    player = game.players[sid]
     is_correct = answer_index == question["correct"]
-    db.record_answer(
+    await write_behind.record_answer(
         game_code,
-        player["name"],
-        game["current_question"],
+        player.name,
+        game.current_question,
         answer_index,
         is_correct,
         int(response_time * 1000),  # Convert to milliseconds
@@ -833,18 +1079,16 @@ async def submit_answer(sid, data):
     
     await sio.emit("answer_received", {}, to=sid)
     
-    # Notify host of answer count
-    await sio.emit("answer_update", {
-        "answered": len(game["answers"]),
-        "total": len(game["players"])
-    }, to=game["host_sid"])
+    # Notify host of answer count (batched per update tick)
+    game.host_updates.answer_received()
+    schedule_host_update(game_code)
     
     # If all players answered, show results
-    if len(game["answers"]) >= len(game["players"]):
+    if len(game.answers) >= len(game.players):
         await show_results(game_code)
 
 
-@sio.event
+@game_event
 async def autoplay_started(sid, data):
     """Host signals autoplay countdown has started - forward to players."""
     game_code = data.get("code")
@@ -856,17 +1100,17 @@ async def autoplay_started(sid, data):
     
     game = games[game_code]
     
-    if game["host_sid"] != sid:
+    if game.host_sid != sid:
         return
     
     # Send autoplay countdown to all players
-    for player_sid in game["players"]:
-        await sio.emit("autoplay_countdown", {"seconds": seconds, "is_last_question": is_last_question}, to=player_sid)
+    await sio.emit("autoplay_countdown", {"seconds": seconds, "is_last_question": is_last_question},
+                   room=players_room(game_code))
 
 
-@sio.event
+@game_event
 async def time_up(sid, data):
-    """Host signals time is up."""
+    """Host signals time is up (the server deadline closes the question anyway)."""
     game_code = data.get("code")
     
     if game_code not in games:
@@ -874,73 +1118,42 @@ async def time_up(sid, data):
     
     game = games[game_code]
     
-    if game["host_sid"] != sid:
+    if game.host_sid != sid:
         return
     
     await show_results(game_code)
 
 
-async def check_and_remove_inactive_players(game_code: str):
-    """Check for inactive players and remove them if auto-remove is enabled."""
-    if game_code not in games:
-        return
-    
-    game = games[game_code]
-    
-    # Only check if auto-remove is enabled
-    if not game.get("auto_remove_inactive", False):
-        return
-    
-    threshold = game.get("inactivity_threshold", DEFAULT_INACTIVITY_THRESHOLD)
-    current_question = game["current_question"]
-    
-    # Need at least threshold questions to detect inactivity
-    if current_question < threshold - 1:
+async def remove_inactive_players(game_code: str, inactive_sids: list[str]):
+    """Remove players that show_results found inactive (their DB rows are already queued for deletion)."""
+    game = games.get(game_code)
+    if game is None or not inactive_sids:
         return
     
     inactive_players = []
-    
-    for player_sid, player_data in list(game["players"].items()):
-        # Check answer history for this player
-        answer_history = game.get("answer_history", {}).get(player_sid, [])
+    for player_sid in inactive_sids:
+        # Remove from game (including answer history and current answer)
+        player = game.remove_player(player_sid)
+        if player is None:
+            continue
+        inactive_players.append({"sid": player_sid, "name": player.name})
+        untrack_session(player_sid, game_code)
         
-        # Check if player has answered any of the last N questions
-        recent_questions = list(range(max(0, current_question - threshold + 1), current_question + 1))
-        has_recent_answer = any(q in answer_history for q in recent_questions)
+        # Stop room broadcasts to the removed player
+        await leave_game_rooms(player_sid, game_code)
         
-        if not has_recent_answer:
-            inactive_players.append({
-                "sid": player_sid,
-                "name": player_data["name"]
-            })
+        print(f"Removed inactive player {player.name} from game {game_code}")
     
-    # Remove inactive players
     if inactive_players:
-        for player_info in inactive_players:
-            player_sid = player_info["sid"]
-            player_name = player_info["name"]
-            
-            # Remove from game
-            if player_sid in game["players"]:
-                del game["players"][player_sid]
-            
-            # Remove from answer history
-            if player_sid in game.get("answer_history", {}):
-                del game["answer_history"][player_sid]
-            
-            # Remove from current answers if present
-            if player_sid in game.get("answers", {}):
-                del game["answers"][player_sid]
-            
-            print(f"Removed inactive player {player_name} from game {game_code}")
-        
         # Notify host about removed players
+        schedule_host_update(game_code)
         await sio.emit("inactive_players_removed", {
             "players": [p["name"] for p in inactive_players],
             "count": len(inactive_players)
-        }, to=game["host_sid"])
+        }, to=game.host_sid)
 
 
+@metrics.timed("show_results")
 async def show_results(game_code: str):
     """Calculate and show results for the current question."""
     if game_code not in games:
@@ -948,103 +1161,93 @@ async def show_results(game_code: str):
     
     game = games[game_code]
     
-    if game["state"] != "question":
+    if game.state != "question":
         return
     
-    game["state"] = "results"
-    question = game["quiz"]["questions"][game["current_question"]]
+    game_timers.cancel(game_code)
+    game.close_question()
+    # No answers are accepted from here on: the host sees the final count before the results
+    await flush_host_updates(game_code)
+    question = game.question
     correct_index = question["correct"]
     time_limit = question.get("time_limit", 20)
     
-    results = []
-    answer_counts = [0, 0, 0, 0]
-    
-    for player_sid, answer_data in game["answers"].items():
-        player = game["players"][player_sid]
-        is_correct = answer_data["answer"] == correct_index
-        
-        if answer_data["answer"] is not None and answer_data["answer"] < 4:
-            answer_counts[answer_data["answer"]] += 1
-        
-        if is_correct:
-            # Score based on speed (max 1000, min 500)
-            time_bonus = max(0, 1 - (answer_data["time"] / time_limit))
-            score = int(500 + (500 * time_bonus))
-            player["streak"] += 1
-            # Streak bonus
-            if player["streak"] > 1:
-                score += min(player["streak"] * 50, 200)
-            player["score"] += score
+    # Score every answer in one pass over the answer sheet's arrays
+    sheet = game.answers
+    streaks = array("i", [game.players[sid].streak if sid else 0 for sid in sheet.sids])
+    scores = scoring.score_answers(sheet.answers, sheet.times, streaks, correct_index, time_limit)
+    answer_counts = scores.answer_counts
+    
+    results = {}
+    for row, player_sid in enumerate(sheet.sids):
+        if player_sid is None:
+            continue  # removed while the question was open
+        player = game.players[player_sid]
+        game.set_streak(player_sid, scores.streaks[row])
+        score = scores.points[row]
+        if scores.correct[row]:
+            game.award(player_sid, score)
             
             # Update database
-            db.update_player_score(game_code, player["name"], player["score"])
-            
-            results.append({
-                "sid": player_sid,
-                "name": player["name"],
-                "correct": True,
-                "score_gained": score,
-                "total_score": player["score"],
-                "streak": player["streak"],
-            })
-        else:
-            player["streak"] = 0
-            results.append({
-                "sid": player_sid,
-                "name": player["name"],
-                "correct": False,
-                "score_gained": 0,
-                "total_score": player["score"],
-                "streak": 0,
-            })
-    
-    # Players who didn't answer
-    for player_sid in game["players"]:
-        if player_sid not in game["answers"]:
-            player = game["players"][player_sid]
-            player["streak"] = 0
-            results.append({
+            await write_behind.update_player_score(game_code, player.name, player.score)
+        
+        results[player_sid] = {
+            "sid": player_sid,
+            "name": player.name,
+            "correct": scores.correct[row],
+            "score_gained": score,
+            "total_score": player.score,
+            "streak": player.streak,
+        }
+    
+    # Players who didn't answer, and whether they have been inactive for too long
+    inactive_sids = []
+    for player_sid, player in game.players.items():
+        if player_sid not in game.answers:
+            game.set_streak(player_sid, 0)
+            results[player_sid] = {
                 "sid": player_sid,
-                "name": player["name"],
+                "name": player.name,
                 "correct": False,
                 "score_gained": 0,
-                "total_score": player["score"],
+                "total_score": player.score,
                 "streak": 0,
-            })
+            }
+            if game.auto_remove_inactive and player.is_inactive(game.current_question, game.inactivity_threshold):
+                inactive_sids.append(player_sid)
+    for player_sid in inactive_sids:
+        await write_behind.remove_player(game_code, game.players[player_sid].name)
+    
+    # Persist this question's answers, scores and removals in one transaction
+    write_behind.flush_nowait()
     
-    # Sort by score
-    results.sort(key=lambda x: x["total_score"], reverse=True)
+    # Rank in leaderboard order (kept sorted as points are awarded)
+    results = results_engine.rank_results(results, game.leaderboard)
     
     # Check if this is the last question
-    is_last_question = game["current_question"] >= len(game["quiz"]["questions"]) - 1
+    is_last_question = game.is_last_question
+    
+    # Build and encode all player packets before sending anything
+    correct_answer = question["answers"][correct_index]
+    player_packets = results_engine.player_packets(results, correct_answer, is_last_question)
     
     # Send results to host
     await sio.emit("show_results", {
         "correct_index": correct_index,
-        "correct_answer": question["answers"][correct_index],
+        "correct_answer": correct_answer,
         "answer_counts": answer_counts,
-        "results": [{"name": r["name"], "correct": r["correct"], "score_gained": r["score_gained"], "total_score": r["total_score"]} for r in results],
+        "results": results_engine.host_results(results),
         "is_last_question": is_last_question,
-    }, to=game["host_sid"])
+    }, to=game.host_sid)
     
-    # Send individual results to players
-    for result in results:
-        await sio.emit("your_result", {
-            "correct": result["correct"],
-            "correct_answer": question["answers"][correct_index],
-            "score_gained": result["score_gained"],
-            "total_score": result["total_score"],
-            "streak": result["streak"],
-            "rank": results.index(result) + 1,
-            "total_players": len(results),
-            "is_last_question": is_last_question,
-        }, to=result["sid"])
+    # Send individual results to players concurrently
+    await send_encoded(player_packets)
     
-    # Check and remove inactive players if enabled
-    await check_and_remove_inactive_players(game_code)
+    # Remove inactive players (after they got this question's result)
+    await remove_inactive_players(game_code, inactive_sids)
 
 
-@sio.event
+@game_event
 async def configure_teams(sid, data):
     """Host configures team mode."""
     game_code = data.get("code")
@@ -1057,18 +1260,19 @@ async def configure_teams(sid, data):
     
     game = games[game_code]
     
-    if game["host_sid"] != sid:
+    if game.host_sid != sid:
         return
     
-    if game["state"] != "lobby":
+    if game.state != "lobby":
         return
     
-    game["team_mode"] = team_mode
-    game["teams"] = teams
-    game["top_n_players"] = top_n_players
+    game.team_mode = team_mode
+    game.teams = teams
+    game.top_n_players = top_n_players
+    game.checkpoint()
     
     # Update database
-    db.update_game(game_code, team_mode=team_mode, teams=teams, top_n_players=top_n_players)
+    sync_game_to_db(game_code)
     
     # Notify all players about team mode update
     await sio.emit("team_config_updated", {
@@ -1077,7 +1281,7 @@ async def configure_teams(sid, data):
     }, room=game_code)
 
 
-@sio.event
+@game_event
 async def configure_auto_remove(sid, data):
     """Host configures auto-remove inactive users settings."""
     game_code = data.get("code")
@@ -1089,10 +1293,10 @@ async def configure_auto_remove(sid, data):
     
     game = games[game_code]
     
-    if game["host_sid"] != sid:
+    if game.host_sid != sid:
         return
     
-    if game["state"] != "lobby":
+    if game.state != "lobby":
         return
     
     # Validate threshold
@@ -1101,14 +1305,15 @@ async def configure_auto_remove(sid, data):
     elif inactivity_threshold > 10:
         inactivity_threshold = 10
     
-    game["auto_remove_inactive"] = auto_remove_inactive
-    game["inactivity_threshold"] = inactivity_threshold
+    game.auto_remove_inactive = auto_remove_inactive
+    game.inactivity_threshold = inactivity_threshold
+    game.checkpoint()
     
     print(f"Auto-remove inactive configured for game {game_code}: enabled={auto_remove_inactive}, threshold={inactivity_threshold}")
 
 
 
-@sio.event
+@game_event
 async def select_team(sid, data):
     """Player selects their team."""
     game_code = data.get("code")
@@ -1119,32 +1324,29 @@ async def select_team(sid, data):
     
     game = games[game_code]
     
-    if sid not in game["players"]:
+    if sid not in game.players:
         return
     
-    if game["state"] != "lobby":
+    if game.state != "lobby":
         return
     
-    if not game["team_mode"]:
+    if not game.team_mode:
         return
     
-    if team not in game["teams"]:
+    if team not in game.teams:
         await sio.emit("error", {"message": "Ungültiges Team"}, to=sid)
         return
     
-    game["players"][sid]["team"] = team
+    game.set_team(sid, team)
     
     # Update database
-    db.update_player_team(game_code, game["players"][sid]["name"], team)
+    adb.submit(db.update_player_team, game_code, game.players[sid].name, team)
     
-    # Notify host and all players
-    player_list = [{"name": p["name"], "score": p["score"], "team": p["team"]} for p in game["players"].values()]
-    await sio.emit("player_updated", {
-        "players": player_list
-    }, room=game_code)
+    # Notify host
+    schedule_host_update(game_code)
 
 
-@sio.event
+@game_event
 async def next_question_request(sid, data):
     """Host requests next question."""
     game_code = data.get("code")
@@ -1154,13 +1356,13 @@ async def next_question_request(sid, data):
     
     game = games[game_code]
     
-    if game["host_sid"] != sid:
+    if game.host_sid != sid:
         return
     
     await next_question(game_code)
 
 
-@sio.event
+@game_event
 async def end_game_request(sid, data):
     """Host requests to end the game early."""
     game_code = data.get("code")
@@ -1170,7 +1372,7 @@ async def end_game_request(sid, data):
     
     game = games[game_code]
     
-    if game["host_sid"] != sid:
+    if game.host_sid != sid:
         return
     
     # Notify all players that the game has ended
@@ -1180,69 +1382,95 @@ async def end_game_request(sid, data):
     await asyncio.sleep(0.5)
     
     # Clean up the game
-    if game_code in games:
-        del games[game_code]
+    remove_game(game_code)
 
 
+@metrics.timed("end_game")
 async def end_game(game_code: str):
     """End the game and show final leaderboard."""
     if game_code not in games:
         return
     
     game = games[game_code]
-    game["state"] = "ended"
+    game_timers.cancel(game_code)
+    game.end()
     
     # Final leaderboard
-    leaderboard = [
-        {"name": p["name"], "score": p["score"], "team": p["team"]}
-        for p in game["players"].values()
-    ]
-    leaderboard.sort(key=lambda x: x["score"], reverse=True)
-    
-    # Calculate team leaderboard if team mode is enabled
-    team_leaderboard = []
-    if game["team_mode"]:
-        team_scores = {}
-        for team in game["teams"]:
-            # Get all players in this team
-            team_players = [
-                {"name": p["name"], "score": p["score"]}
-                for p in game["players"].values()
-                if p["team"] == team
-            ]
-            # Sort by score and take top N players
-            team_players.sort(key=lambda x: x["score"], reverse=True)
-            top_players = team_players[:game["top_n_players"]]
-            # Sum scores of top players
-            team_total = sum(p["score"] for p in top_players)
-            team_scores[team] = {
-                "team": team,
-                "score": team_total,
-                "player_count": len(team_players),
-                "top_players": top_players
-            }
-        
-        team_leaderboard = list(team_scores.values())
-        team_leaderboard.sort(key=lambda x: x["score"], reverse=True)
+    leaderboard = game.ranked_player_list()
+    
+    # Team leaderboard from each team's top N players
+    team_leaderboard = game.team_standings() if game.team_mode else []
     
     await sio.emit("game_ended", {
         "leaderboard": leaderboard,
-        "team_mode": game["team_mode"],
+        "team_mode": game.team_mode,
         "team_leaderboard": team_leaderboard,
-        "top_n_players": game["top_n_players"]
+        "top_n_players": game.top_n_players
     }, room=game_code)
     
     # Update final state in database
-    db.update_game(game_code, state="ended")
+    sync_game_to_db(game_code, force=True)
+
+
+async def evict_game(game_code: str, reason: str):
+    """Drop a game the reaper found finished or abandoned."""
+    if reason == "idle":
+        await sio.emit("game_ended", {
+            "reason": "Das Spiel wurde wegen Inaktivität beendet."
+        }, room=game_code)
+    task = host_disconnect_tasks.pop(game_code, None)
+    if task is not None:
+        task.cancel()
+    remove_game(game_code)
 
 
 # Startup cleanup
 @app.on_event("startup")
 async def startup_cleanup():
-    """Clean up old games on startup."""
-    deleted = db.cleanup_old_games(24)
-    if deleted > 0:
-        print(f"Cleaned up {deleted} old games")
+    """Recover journaled games and start the background tasks (the reaper cleans up old games)."""
+    recovered = journal.recover(cluster.owns_code)
+    for game_code, game in recovered:
+        resume_game(game_code, game)
+    if recovered:
+        print(f"Recovered {len(recovered)} games from their journals")
+    if cluster.enabled:
+        cluster.start(games, dispatch_forwarded_event, unload_game)
+    reaper.start(games, evict_game)
+    metrics.start_loop_monitor()
+    loop_watchdog.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_database():
+    """Finish queued database writes and close pooled connections."""
+    await reaper.stop()
+    if cluster.enabled:
+        await cluster.stop(games)
+    await game_timers.close()
+    for game_code, game in games.items():
+        write_game_changes(game_code, game)
+        if game.journal is not None:
+            game.journal.close()
+    await journal.drain()
+    loop_watchdog.stop()
+    await write_behind.close()
+    await adb.drain()
+    adb.shutdown()
+    db.close_pool()
+
+
+# Instrumentation (after all handlers are registered)
+metrics.instrument_socketio(sio)
+metrics.gauge("quizknaller_active_games", "Games in memory on this worker", lambda: len(games))
+metrics.gauge("quizknaller_active_players", "Players in games on this worker",
+              lambda: sum(len(game.players) for game in games.values()))
+metrics.gauge("quizknaller_sessions", "Sockets indexed to a game on this worker", lambda: len(sessions))
+metrics.gauge("quizknaller_pending_timers", "Scheduled game deadlines", lambda: len(game_timers))
+metrics.gauge("quizknaller_write_behind_pending", "Buffered database writes", lambda: len(write_behind.write_queue))
+metrics.gauge("quizknaller_db_pool_in_use", "Checked out database connections",
+              lambda: db.get_pool_stats()["in_use"])
+metrics.gauge("quizknaller_quiz_cache_entries", "Quizzes cached by content hash",
+              lambda: db.get_quiz_cache_stats()["size"])
 
 
 if __name__ == "__main__":
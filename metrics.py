@@ -0,0 +1,242 @@
+"""
+Metrics for QuizKnaller
+Counters, gauges and histograms rendered in the Prometheus text format at /metrics
+"""
+
+import asyncio
+import functools
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Optional
+
+# Set QUIZKNALLER_METRICS=0 to turn all instrumentation into no-ops
+enabled = os.environ.get("QUIZKNALLER_METRICS", "1").lower() not in ("0", "false", "no", "off")
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+LOOP_LAG_INTERVAL = 0.5  # seconds between event loop lag probes
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._lock = threading.Lock()  # database metrics are updated from worker threads
+
+    @abstractmethod
+    def samples(self) -> list[str]:
+        """Sample lines of this metric in the text exposition format."""
+
+    def render(self) -> str:
+        return "\n".join([f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *self.samples()])
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labelvalues, amount: float = 1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {v}" for k, v in values]
+
+
+class Gauge(Metric):
+    """Gauge that is either set explicitly or read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, callback: Optional[Callable[[], float]] = None):
+        super().__init__(name, help_text)
+        self.callback = callback
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def samples(self) -> list[str]:
+        value = self.callback() if self.callback else self.value
+        return [f"{self.name} {value}"]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = buckets
+        # labelvalues -> [count per bucket (+Inf last), sum]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labelvalues):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            series = [(k, list(counts), total) for k, (counts, total) in self._series.items()]
+        lines = []
+        for labelvalues, counts, total in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                labels = _format_labels((*self.labelnames, "le"), (*labelvalues, bound))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class _NoopMetric:
+    """Stand-in for every metric type when metrics are disabled."""
+
+    def inc(self, *args, **kwargs):
+        pass
+
+    def set(self, *args, **kwargs):
+        pass
+
+    def observe(self, *args, **kwargs):
+        pass
+
+
+_registry: list[Metric] = []
+
+
+def _register(metric: Metric):
+    if not enabled:
+        return _NoopMetric()
+    _registry.append(metric)
+    return metric
+
+
+def counter(name: str, help_text: str, labelnames: tuple = ()) -> Counter:
+    return _register(Counter(name, help_text, labelnames))
+
+
+def gauge(name: str, help_text: str, callback: Optional[Callable[[], float]] = None) -> Gauge:
+    return _register(Gauge(name, help_text, callback))
+
+
+def histogram(name: str, help_text: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+    return _register(Histogram(name, help_text, labelnames, buckets))
+
+
+def render() -> str:
+    """All registered metrics in the Prometheus text exposition format."""
+    return "\n".join(metric.render() for metric in _registry) + "\n"
+
+
+# Metrics shared by several modules
+handler_seconds = histogram(
+    "quizknaller_handler_seconds", "Duration of Socket.IO event handlers and game phases", ("handler",))
+handler_errors = counter(
+    "quizknaller_handler_errors_total", "Exceptions raised by handlers", ("handler",))
+emit_seconds = histogram(
+    "quizknaller_emit_seconds", "Duration of Socket.IO emits and fan-outs", ("event",))
+db_call_seconds = histogram(
+    "quizknaller_db_call_seconds", "Duration of database functions on the executor threads", ("function",))
+loop_lag_seconds = histogram(
+    "quizknaller_event_loop_lag_seconds", "Delay of the event loop behind a timed wakeup",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5))
+
+
+def timed(name: str, metric=handler_seconds) -> Callable:
+    """Decorator recording the duration of a coroutine function under a label."""
+    def decorator(func):
+        if not enabled:
+            return func
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                handler_errors.inc(name)
+                raise
+            finally:
+                metric.observe(time.perf_counter() - started, name)
+        return wrapper
+    return decorator
+
+
+def instrument_socketio(sio, namespace: str = "/"):
+    """Time every Socket.IO event handler registered so far on a server.
+
+    connect/disconnect are left alone: python-socketio probes their
+    signatures by calling them, which a generic wrapper would break.
+    """
+    if not enabled:
+        return
+    handlers = sio.handlers.get(namespace, {})
+    for event, handler in list(handlers.items()):
+        if event not in ("connect", "disconnect") and asyncio.iscoroutinefunction(handler):
+            handlers[event] = timed(event)(handler)
+
+    emit = sio.emit
+
+    @functools.wraps(emit)
+    async def timed_emit(event, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await emit(event, *args, **kwargs)
+        finally:
+            emit_seconds.observe(time.perf_counter() - started, event)
+
+    sio.emit = timed_emit
+
+
+def timed_call(func: Callable, *args, **kwargs):
+    """Call a blocking database function and record its duration."""
+    started = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        db_call_seconds.observe(time.perf_counter() - started, func.__name__)
+
+
+async def _monitor_loop_lag(interval: float):
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        loop_lag_seconds.observe(max(0.0, loop.time() - expected))
+
+
+_loop_monitor: Optional[asyncio.Task] = None
+
+
+def start_loop_monitor(interval: float = LOOP_LAG_INTERVAL):
+    """Start measuring how late the event loop wakes up from a fixed sleep."""
+    global _loop_monitor
+    if enabled and _loop_monitor is None:
+        _loop_monitor = asyncio.create_task(_monitor_loop_lag(interval))
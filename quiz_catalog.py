@@ -0,0 +1,68 @@
+"""
+Quiz catalog for QuizKnaller
+Keeps the parsed quizzes.json in memory and reloads it when the file changes
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Optional
+
+
+class QuizCatalog:
+    """Parsed quiz file plus the precomputed /api/quizzes response.
+
+    Every access stats the file; it is only re-read and re-parsed when its
+    modification time or size changed since the last load.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._signature: Optional[tuple[int, int]] = None
+        self._quizzes: list[dict] = []
+        self._summary_json = b"[]"
+        self._etag = '"empty"'
+        self.reloads = 0
+
+    def _file_signature(self) -> Optional[tuple[int, int]]:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _refresh(self):
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+        if signature is None:
+            self._quizzes = []
+            content = b"[]"
+        else:
+            content = self.path.read_bytes()
+            self._quizzes = json.loads(content)
+        summary = [
+            {"id": i, "title": q["title"], "questionCount": len(q["questions"])}
+            for i, q in enumerate(self._quizzes)
+        ]
+        self._summary_json = json.dumps(summary, ensure_ascii=False).encode("utf-8")
+        self._etag = f'"{hashlib.sha1(content).hexdigest()}"'
+        self._signature = signature
+        self.reloads += 1
+
+    def quizzes(self) -> list[dict]:
+        """All quizzes (shared objects, do not modify)."""
+        self._refresh()
+        return self._quizzes
+
+    def get(self, quiz_id: int) -> Optional[dict]:
+        """Get a quiz by its index, or None if it does not exist."""
+        quizzes = self.quizzes()
+        if 0 <= quiz_id < len(quizzes):
+            return quizzes[quiz_id]
+        return None
+
+    def summary(self) -> tuple[bytes, str]:
+        """Encoded /api/quizzes response body and its ETag."""
+        self._refresh()
+        return self._summary_json, self._etag
@@ -0,0 +1,93 @@
+"""
+Game reaper for QuizKnaller
+Periodically evicts finished and abandoned games from memory and deletes stale database rows
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+import async_db as adb
+import metrics
+
+REAPER_INTERVAL = float(os.environ.get("QUIZKNALLER_REAPER_INTERVAL", "60"))  # seconds between passes
+ENDED_GAME_TTL = float(os.environ.get("QUIZKNALLER_ENDED_GAME_TTL", "1800"))  # seconds an ended game stays loaded
+IDLE_GAME_TTL = float(os.environ.get("QUIZKNALLER_IDLE_GAME_TTL", "14400"))  # seconds without changes until a game counts as abandoned
+DB_RETENTION_HOURS = 24  # hours after their last update that games are deleted from the database
+DELETE_BATCH_SIZE = 100  # games deleted per database transaction
+BATCH_PAUSE = 0.05  # seconds between delete batches, so game writes are not held up
+
+evicted_total = metrics.counter(
+    "quizknaller_reaper_evicted_games_total", "Games evicted from memory by the reaper", ("reason",))
+deleted_total = metrics.counter(
+    "quizknaller_reaper_deleted_games_total", "Stale games deleted from the database by the reaper")
+leftovers_total = metrics.counter(
+    "quizknaller_reaper_deleted_leftovers_total", "Stale snapshots, leases and quizzes deleted by the reaper")
+passes_total = metrics.counter("quizknaller_reaper_passes_total", "Completed reaper passes")
+
+_task: Optional[asyncio.Task] = None
+
+
+def expired_games(games: dict, now: float) -> list[tuple[str, str]]:
+    """Codes of games due for eviction, with the reason ("ended" or "idle")."""
+    expired = []
+    for game_code, game in games.items():
+        idle_for = now - game.last_activity
+        if game.state == "ended":
+            if idle_for >= ENDED_GAME_TTL:
+                expired.append((game_code, "ended"))
+        elif idle_for >= IDLE_GAME_TTL:
+            expired.append((game_code, "idle"))
+    return expired
+
+
+async def reap(games: dict, evict: Callable[[str, str], Awaitable[Any]]) -> dict:
+    """Run one pass: evict expired games, then delete stale rows batch by batch."""
+    evicted = {"ended": 0, "idle": 0}
+    for game_code, reason in expired_games(games, time.monotonic()):
+        if game_code in games:
+            await evict(game_code, reason)
+            evicted_total.inc(reason)
+            evicted[reason] += 1
+
+    deleted = 0
+    while True:
+        batch = await adb.delete_stale_games(DB_RETENTION_HOURS, DELETE_BATCH_SIZE)
+        deleted += batch
+        if batch < DELETE_BATCH_SIZE:
+            break
+        await asyncio.sleep(BATCH_PAUSE)
+    deleted_total.inc(amount=deleted)
+    leftovers = await adb.delete_stale_leftovers(DB_RETENTION_HOURS)
+    leftovers_total.inc(amount=leftovers)
+    passes_total.inc()
+
+    if evicted["ended"] or evicted["idle"] or deleted:
+        print(f"Reaper: evicted {evicted['ended']} ended and {evicted['idle']} idle games, "
+              f"deleted {deleted} stale games from the database")
+    return {"evicted": evicted, "deleted_games": deleted, "deleted_leftovers": leftovers}
+
+
+async def _run(games: dict, evict: Callable[[str, str], Awaitable[Any]]):
+    while True:
+        try:
+            await reap(games, evict)
+        except Exception as e:
+            print(f"Error in game reaper: {e!r}")
+        await asyncio.sleep(REAPER_INTERVAL)
+
+
+def start(games: dict, evict: Callable[[str, str], Awaitable[Any]]):
+    """Start reaping the given games now and then every REAPER_INTERVAL seconds."""
+    global _task
+    if _task is None or _task.done():
+        _task = asyncio.create_task(_run(games, evict))
+
+
+async def stop():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        await asyncio.gather(_task, return_exceptions=True)
+        _task = None
@@ -0,0 +1,55 @@
+"""
+Results engine for QuizKnaller
+Ranks players after a question and prepares the per-player result packets
+"""
+
+import json
+
+from socketio import packet
+
+from leaderboard import Leaderboard
+
+
+def rank_results(results: dict[str, dict], leaderboard: Leaderboard) -> list[dict]:
+    """Order results (by sid) like the game's leaderboard and assign ranks.
+
+    Players with the same total score share a rank (1, 1, 3, ...) and
+    ties keep their join order. The leaderboard is already sorted, so
+    this is a single pass without a sort.
+    """
+    ranked = []
+    for rank, sid in leaderboard.ranked():
+        result = results[sid]
+        result["rank"] = rank
+        ranked.append(result)
+    return ranked
+
+
+def host_results(results: list[dict]) -> list[dict]:
+    """Build the result list shown on the host screen."""
+    return [{
+        "name": r["name"],
+        "correct": r["correct"],
+        "score_gained": r["score_gained"],
+        "total_score": r["total_score"],
+    } for r in results]
+
+
+def encode_event(event: str, data: dict) -> str:
+    """Encode a Socket.IO event packet for the default namespace."""
+    return str(packet.EVENT) + json.dumps([event, data], separators=(",", ":"))
+
+
+def player_packets(results: list[dict], correct_answer: str, is_last_question: bool) -> list[tuple[str, str]]:
+    """Build and encode all (sid, your_result packet) pairs for ranked results."""
+    total_players = len(results)
+    return [(r["sid"], encode_event("your_result", {
+        "correct": r["correct"],
+        "correct_answer": correct_answer,
+        "score_gained": r["score_gained"],
+        "total_score": r["total_score"],
+        "streak": r["streak"],
+        "rank": r["rank"],
+        "total_players": total_players,
+        "is_last_question": is_last_question,
+    })) for r in results]
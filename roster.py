@@ -0,0 +1,58 @@
+"""
+Roster updates for QuizKnaller
+Versioned add/remove/update deltas of a game's player list, batched for the host
+"""
+
+from typing import Optional
+
+
+class RosterFeed:
+    """Pending player list changes of one game and the version the host has.
+
+    Every flushed batch gets the next version number. The host applies a
+    batch only if its `base` equals the version it holds and otherwise
+    asks for a snapshot, so a lost or reordered batch is never applied on
+    top of the wrong list. Changes to the same player within one batch
+    are merged, e.g. a join followed by a leave sends nothing.
+    """
+
+    __slots__ = ("version", "_pending")
+
+    def __init__(self):
+        self.version = 0
+        self._pending: dict[str, dict] = {}  # player name -> change, in order of first change
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def added(self, name: str, team: Optional[str] = None):
+        previous = self._pending.get(name)
+        # Leaving and coming back within one batch is just an update for the host
+        op = "update" if previous is not None and previous["op"] == "remove" else "add"
+        self._pending[name] = {"op": op, "name": name, "team": team}
+
+    def removed(self, name: str):
+        previous = self._pending.pop(name, None)
+        if previous is None or previous["op"] != "add":
+            self._pending[name] = {"op": "remove", "name": name}
+
+    def updated(self, name: str, team: Optional[str]):
+        previous = self._pending.get(name)
+        op = previous["op"] if previous is not None and previous["op"] == "add" else "update"
+        self._pending[name] = {"op": op, "name": name, "team": team}
+
+    def flush(self) -> Optional[dict]:
+        """The pending changes as the next versioned batch, or None if nothing changed."""
+        if not self._pending:
+            return None
+        changes = list(self._pending.values())
+        self._pending.clear()
+        self.version += 1
+        return {"version": self.version, "base": self.version - 1, "changes": changes}
+
+    def snapshot_version(self) -> int:
+        """Version of a full player list sent now (pending changes are included in it)."""
+        if self._pending:
+            self._pending.clear()
+            self.version += 1
+        return self.version
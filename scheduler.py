@@ -0,0 +1,140 @@
+"""
+Timer wheel for QuizKnaller
+Schedules game deadlines (reading time, question time limit) for all games on one task
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+DEFAULT_TICK = 0.05  # seconds per wheel slot
+DEFAULT_SLOTS = 512  # slots per wheel revolution (25.6s at the default tick)
+
+
+@dataclass(slots=True)
+class _Timer:
+    key: Hashable
+    slot: int
+    rounds: int  # full wheel revolutions left before the timer is due
+    callback: Callable[..., Awaitable[Any]]
+    args: tuple
+
+
+class TimerWheel:
+    """Hashed timer wheel driving coroutine callbacks from a single task.
+
+    Timers are identified by a key; scheduling a key again replaces the
+    pending timer, so each game can hold one deadline keyed by its code.
+    Scheduling and cancelling are O(1), and only one task wakes up per tick
+    no matter how many timers are pending. Deadlines are rounded up to the
+    next tick.
+    """
+
+    def __init__(self, tick: float = DEFAULT_TICK, slots: int = DEFAULT_SLOTS):
+        self.tick = tick
+        self._slots: list[dict[Hashable, _Timer]] = [{} for _ in range(slots)]
+        self._timers: dict[Hashable, _Timer] = {}
+        self._cursor = 0  # index of the slot processed next
+        self._next_tick_at = 0.0  # loop time at which the cursor slot is due
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._running: set[asyncio.Task] = set()
+        self.fired = 0
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._timers
+
+    def schedule(self, key: Hashable, delay: float, callback: Callable[..., Awaitable[Any]], *args):
+        """Run callback(*args) after delay seconds, replacing any timer with the same key."""
+        self.cancel(key)
+        self._ensure_running()
+        loop = asyncio.get_running_loop()
+        if not self._timers:
+            # The wheel was idle, its clock restarts now
+            self._next_tick_at = max(self._next_tick_at, loop.time() + self.tick)
+        # Ticks from the cursor slot (due at _next_tick_at) until the deadline
+        ticks = max(0, int(-(-(loop.time() + delay - self._next_tick_at) // self.tick)))
+        slot = (self._cursor + ticks) % len(self._slots)
+        timer = _Timer(key, slot, ticks // len(self._slots), callback, args)
+        self._slots[slot][key] = timer
+        self._timers[key] = timer
+        self._wakeup.set()
+
+    def cancel(self, key: Hashable) -> bool:
+        """Cancel a pending timer; returns False if there was none."""
+        timer = self._timers.pop(key, None)
+        if timer is None:
+            return False
+        del self._slots[timer.slot][key]
+        return True
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._next_tick_at = loop.time() + self.tick
+            self._task = loop.create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._timers:
+                # Idle: sleep until something is scheduled
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                # Restart the clock so idle time does not count as elapsed ticks
+                self._next_tick_at = max(self._next_tick_at, loop.time() + self.tick)
+                continue
+            delay = self._next_tick_at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._advance()
+
+    def _advance(self):
+        """Process the slot under the cursor and move on by one tick."""
+        bucket = self._slots[self._cursor]
+        due = []
+        for key, timer in list(bucket.items()):
+            if timer.rounds > 0:
+                timer.rounds -= 1
+            else:
+                del bucket[key]
+                del self._timers[key]
+                due.append(timer)
+        self._cursor = (self._cursor + 1) % len(self._slots)
+        self._next_tick_at += self.tick
+        for timer in due:
+            self._fire(timer)
+
+    def _fire(self, timer: _Timer):
+        self.fired += 1
+        task = asyncio.create_task(timer.callback(*timer.args))
+        self._running.add(task)
+        task.add_done_callback(self._on_done)
+
+    def _on_done(self, task: asyncio.Task):
+        self._running.discard(task)
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None:
+            print(f"Error in scheduled callback: {exc!r}")
+
+    async def close(self):
+        """Drop all pending timers and stop the wheel."""
+        for bucket in self._slots:
+            bucket.clear()
+        self._timers.clear()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {"pending": len(self._timers), "running": len(self._running), "fired": self.fired}
@@ -0,0 +1,85 @@
+"""
+Scoring for QuizKnaller
+Scores all answers to a question in one pass over compact arrays (numpy when installed)
+"""
+
+from array import array
+from dataclasses import dataclass
+from typing import Optional
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, scoring falls back to plain Python
+    np = None
+
+BASE_POINTS = 500  # points for a correct answer at the time limit
+SPEED_POINTS = 500  # extra points for an instant correct answer
+STREAK_POINTS = 50  # bonus per answer in a streak of two or more
+MAX_STREAK_BONUS = 200
+VECTORIZE_MIN_ANSWERS = 64  # below this the numpy call overhead outweighs the gain
+
+
+@dataclass(slots=True)
+class QuestionScores:
+    """Scores per answer row, aligned with the input arrays."""
+    correct: list[bool]
+    points: list[int]
+    streaks: list[int]  # streak after this question
+    answer_counts: list[int]  # answers per option (valid indexes 0-3 only)
+
+
+def score_answers(answers: array, times: array, streaks: array, correct_index: int,
+                  time_limit: float, vectorize: Optional[bool] = None) -> QuestionScores:
+    """Score one question.
+
+    answers holds answer indexes (negative for none/invalid), times the
+    response times in seconds and streaks each player's streak before the
+    question. A correct answer earns 500 + 500 * max(0, 1 - time / limit)
+    points, truncated, plus 50 per streak answer (max 200) once the streak
+    reaches two; a wrong or missing answer resets the streak.
+    """
+    if vectorize is None:
+        vectorize = np is not None and len(answers) >= VECTORIZE_MIN_ANSWERS
+    if vectorize:
+        return _score_numpy(answers, times, streaks, correct_index, time_limit)
+    return _score_python(answers, times, streaks, correct_index, time_limit)
+
+
+def _score_python(answers, times, streaks, correct_index, time_limit) -> QuestionScores:
+    correct = []
+    points = []
+    new_streaks = []
+    answer_counts = [0, 0, 0, 0]
+    for answer, time, streak in zip(answers, times, streaks):
+        if answer >= 0:
+            answer_counts[answer] += 1
+        if answer == correct_index:
+            time_bonus = max(0, 1 - (time / time_limit))
+            score = int(BASE_POINTS + (SPEED_POINTS * time_bonus))
+            streak += 1
+            if streak > 1:
+                score += min(streak * STREAK_POINTS, MAX_STREAK_BONUS)
+            correct.append(True)
+            points.append(score)
+            new_streaks.append(streak)
+        else:
+            correct.append(False)
+            points.append(0)
+            new_streaks.append(0)
+    return QuestionScores(correct, points, new_streaks, answer_counts)
+
+
+def _score_numpy(answers, times, streaks, correct_index, time_limit) -> QuestionScores:
+    answers = np.asarray(answers, dtype=np.int64)
+    times = np.asarray(times, dtype=np.float64)
+    streaks = np.asarray(streaks, dtype=np.int64)
+
+    correct = answers == correct_index
+    time_bonus = np.maximum(0.0, 1.0 - times / time_limit)
+    # astype truncates toward zero like int(); same float64 operations, same results
+    base = (BASE_POINTS + SPEED_POINTS * time_bonus).astype(np.int64)
+    new_streaks = np.where(correct, streaks + 1, 0)
+    bonus = np.where(new_streaks > 1, np.minimum(new_streaks * STREAK_POINTS, MAX_STREAK_BONUS), 0)
+    points = np.where(correct, base + bonus, 0)
+    answer_counts = np.bincount(answers[answers >= 0], minlength=4)[:4]
+    return QuestionScores(correct.tolist(), points.tolist(), new_streaks.tolist(), answer_counts.tolist())
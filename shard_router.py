@@ -0,0 +1,225 @@
+"""
+Sharded deployment for QuizKnaller
+Front router and launcher: each game code is served by one fixed worker process
+
+Usage: python shard_router.py --workers 4 --port 8080
+
+Worker i listens on 127.0.0.1:(base port + i) and owns every game code with
+shard_for(code) == i, keeping those games in local memory. The router sends
+Socket.IO and /api/qrcode requests to the owner of the `code` query
+parameter (clients without a code yet send a random `shard` key instead);
+all other requests are spread round-robin.
+
+If a worker crashes it is restarted on the same port with the same shard
+index, so the code -> worker mapping never changes. While it restarts the
+router holds new connections for up to CONNECT_RETRY_TIMEOUT seconds, and
+hosts and players reconnecting afterwards reload their game from the
+database (load_game_from_db). The worker count must stay the same while
+games are running.
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from cluster import shard_for
+
+MAX_HEADER_SIZE = 65536  # bytes allowed for a request head
+CONNECT_RETRY_TIMEOUT = 10.0  # seconds to wait for a (re)starting worker
+RESTART_BACKOFF_MAX = 10.0  # maximum seconds between restarts of a crashing worker
+STABLE_UPTIME = 30.0  # seconds after which a worker counts as started successfully
+PIPE_CHUNK_SIZE = 65536
+
+# Requests that belong to a game and must reach its owner
+SHARDED_PATHS = ("/socket.io/", "/api/qrcode")
+
+
+class ShardRouter:
+    """TCP front router forwarding each HTTP/WebSocket connection to one worker.
+
+    Only the request head is parsed; the rest of the connection is piped
+    through unchanged, so WebSocket upgrades work as well as long-polling.
+    Plain HTTP requests get `Connection: close` so a keep-alive connection
+    never carries requests for games on different workers.
+    """
+
+    def __init__(self, worker_ports: list[int], worker_host: str = "127.0.0.1"):
+        self.worker_ports = worker_ports
+        self.worker_host = worker_host
+        self._round_robin = itertools.cycle(range(len(worker_ports)))
+        self.connections = 0
+
+    def pick_worker(self, target: str, client_ip: str) -> int:
+        """Choose the worker index for a request target (path and query)."""
+        parts = urlsplit(target)
+        if not parts.path.startswith(SHARDED_PATHS):
+            return next(self._round_robin)
+        params = parse_qs(parts.query)
+        key = params.get("code", [""])[0].strip().upper()
+        # Without a game code, keep a client on one worker (long-polling needs that)
+        key = key or params.get("shard", [""])[0] or client_ip
+        return shard_for(key, len(self.worker_ports))
+
+    @staticmethod
+    def _rewrite_head(lines: list[str], client_ip: str) -> bytes:
+        headers = lines[1:]
+        upgrade = any(
+            h.lower().startswith("upgrade:") and "websocket" in h.lower() for h in headers
+        )
+        if not upgrade:
+            headers = [
+                h for h in headers
+                if not h.lower().startswith(("connection:", "keep-alive:"))
+            ]
+            headers.append("Connection: close")
+        headers.append(f"X-Forwarded-For: {client_ip}")
+        return ("\r\n".join([lines[0], *headers]) + "\r\n\r\n").encode("latin-1")
+
+    async def _connect(self, index: int):
+        deadline = time.monotonic() + CONNECT_RETRY_TIMEOUT
+        while True:
+            try:
+                return await asyncio.open_connection(self.worker_host, self.worker_ports[index])
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise
+                await asyncio.sleep(0.2)
+
+    @staticmethod
+    async def _pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while data := await reader.read(PIPE_CHUNK_SIZE):
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        client_ip = (writer.get_extra_info("peername") or ("unknown",))[0]
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        lines = head.decode("latin-1").split("\r\n")[:-2]
+        try:
+            target = lines[0].split(" ")[1]
+        except IndexError:
+            writer.close()
+            return
+
+        index = self.pick_worker(target, client_ip)
+        try:
+            upstream_reader, upstream_writer = await self._connect(index)
+        except OSError:
+            print(f"Worker {index} unavailable")
+            writer.write(b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            writer.close()
+            return
+
+        upstream_writer.write(self._rewrite_head(lines, client_ip))
+        await asyncio.gather(
+            self._pipe(reader, upstream_writer),
+            self._pipe(upstream_reader, writer),
+        )
+
+
+class WorkerProcess:
+    """One uvicorn worker serving a shard, restarted when it exits."""
+
+    def __init__(self, index: int, port: int, count: int):
+        self.index = index
+        self.port = port
+        self.count = count
+        self.process = None
+        self.started_at = 0.0
+        self.failures = 0
+        self.restart_at = 0.0
+
+    def start(self):
+        env = dict(os.environ)
+        env["QUIZKNALLER_SHARD_INDEX"] = str(self.index)
+        env["QUIZKNALLER_SHARD_COUNT"] = str(self.count)
+        env["QUIZKNALLER_WORKER_ID"] = f"shard-{self.index}"
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:socket_app",
+             "--host", "127.0.0.1", "--port", str(self.port)],
+            cwd=Path(__file__).parent,
+            env=env,
+        )
+        self.started_at = time.monotonic()
+        print(f"Started worker {self.index} on port {self.port} (pid {self.process.pid})")
+
+    def check(self):
+        """Restart the worker if it exited, backing off if it keeps crashing."""
+        if self.process is None or self.process.poll() is None:
+            return
+        now = time.monotonic()
+        if self.restart_at == 0.0:
+            uptime = now - self.started_at
+            self.failures = 0 if uptime > STABLE_UPTIME else self.failures + 1
+            delay = min(RESTART_BACKOFF_MAX, 0.5 * (2 ** self.failures)) if self.failures else 0.0
+            print(f"Worker {self.index} exited with code {self.process.returncode}, restarting in {delay:.1f}s")
+            self.restart_at = now + delay
+        if now >= self.restart_at:
+            self.restart_at = 0.0
+            self.start()
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+
+
+async def run(workers: int, host: str, port: int, base_port: int):
+    processes = [WorkerProcess(i, base_port + i, workers) for i in range(workers)]
+    for worker in processes:
+        worker.start()
+
+    router = ShardRouter([worker.port for worker in processes])
+    server = await asyncio.start_server(router.handle, host, port, limit=MAX_HEADER_SIZE)
+    print(f"Shard router on http://{host}:{port} -> {workers} workers on ports {base_port}-{base_port + workers - 1}")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        while not stop.is_set():
+            for worker in processes:
+                worker.check()
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=1.0)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        server.close()
+        for worker in processes:
+            worker.stop()
+        for worker in processes:
+            if worker.process is not None:
+                worker.process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run QuizKnaller as sharded worker processes behind a router")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="number of worker processes")
+    parser.add_argument("--host", default="0.0.0.0", help="address of the router")
+    parser.add_argument("--port", type=int, default=8080, help="port of the router")
+    parser.add_argument("--base-port", type=int, default=8100, help="port of the first worker")
+    args = parser.parse_args()
+    asyncio.run(run(args.workers, args.host, args.port, args.base_port))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,11 @@
 // QuizKnaller - Host Client
-const socket = io();
+// Routing keys for a sharded server: the game code, or a random key until a game exists
+const socket = io({
+    query: {
+        code: localStorage.getItem('hostGameCode') || '',
+        shard: Math.random().toString(36).slice(2),
+    },
+});
 
 // Configuration
 const AUTOPLAY_COUNTDOWN_SECONDS = 10;
@@ -324,6 +330,7 @@ window.addEventListener('load', () => {
 // Reconnection handlers
 socket.on('reconnected_host', (data) => {
     gameCode = data.code;
+    socket.io.opts.query.code = data.code;
     
     // Update localStorage
     localStorage.setItem('hostGameCode', data.code);
@@ -338,7 +345,7 @@ socket.on('reconnected_host', (data) => {
     elements.qrCode.src = `/api/qrcode?code=${data.code}`;
     
     // Restore players using helper function
-    updatePlayerDisplay(data.players);
+    applyRosterSnapshot(data.players, data.roster_version);
     
     // Restore to appropriate screen based on state
     if (data.state === 'lobby') {
@@ -591,6 +598,7 @@ elements.newGameBtn.addEventListener('click', () => {
 // Socket Events
 socket.on('game_created', (data) => {
     gameCode = data.code;
+    socket.io.opts.query.code = data.code;
     // Save to localStorage for reconnection
     localStorage.setItem('hostGameCode', data.code);
     localStorage.setItem('hostQuizTitle', data.quiz_title);
@@ -599,9 +607,7 @@ socket.on('game_created', (data) => {
     elements.joinUrl.textContent = window.location.host;
     elements.gameCodeDisplay.textContent = data.code;
     elements.qrCode.src = `/api/qrcode?code=${data.code}`;
-    elements.playersGrid.innerHTML = '';
-    elements.playerCount.textContent = '0';
-    elements.startGameBtn.disabled = true;
+    applyRosterSnapshot([], 0);
     
     // Update header game codes
     updateHeaderGameCodes(data.code);
@@ -619,7 +625,7 @@ socket.on('game_quiz_switched', (data) => {
     elements.gameCodeDisplay.textContent = data.code;
     elements.qrCode.src = `/api/qrcode?code=${data.code}`;
     updateHeaderGameCodes(data.code);
-    updatePlayerDisplay(data.players || []);
+    applyRosterSnapshot(data.players || [], data.roster_version);
 
     showScreen('lobby');
 });
@@ -689,16 +695,41 @@ function updatePlayerDisplay(players) {
     elements.startGameBtn.disabled = totalPlayers < 1;
 }
 
-socket.on('player_joined', (data) => {
-    updatePlayerDisplay(data.players);
-});
+// Player list: the server sends versioned batches of changes, and a full
+// snapshot when this copy may be out of date
+let roster = new Map();
+let rosterVersion = 0;
+let rosterRequested = false;
+
+function applyRosterSnapshot(players, version) {
+    roster = new Map(players.map(player => [player.name, player]));
+    rosterVersion = version || 0;
+    rosterRequested = false;
+    updatePlayerDisplay([...roster.values()]);
+}
 
-socket.on('player_left', (data) => {
-    updatePlayerDisplay(data.players);
+socket.on('roster_update', (data) => {
+    if (data.base !== rosterVersion) {
+        // Missed an update: ask for the full list once
+        if (!rosterRequested) {
+            rosterRequested = true;
+            socket.emit('request_roster', { code: gameCode });
+        }
+        return;
+    }
+    data.changes.forEach(change => {
+        if (change.op === 'remove') {
+            roster.delete(change.name);
+        } else {
+            roster.set(change.name, { name: change.name, team: change.team });
+        }
+    });
+    rosterVersion = data.version;
+    updatePlayerDisplay([...roster.values()]);
 });
 
-socket.on('player_updated', (data) => {
-    updatePlayerDisplay(data.players);
+socket.on('roster_snapshot', (data) => {
+    applyRosterSnapshot(data.players, data.version);
 });
 
 socket.on('game_starting', () => {
@@ -1065,6 +1096,16 @@ socket.on('error', (data) => {
     alert(data.message);
 });
 
+socket.on('player_connection_update', (data) => {
+    // Batched per update tick; logged only, like inactive player removals
+    if (data.disconnected.length > 0) {
+        console.log(`Verbindung verloren: ${data.disconnected.join(', ')}`);
+    }
+    if (data.reconnected.length > 0) {
+        console.log(`Wieder verbunden: ${data.reconnected.join(', ')}`);
+    }
+});
+
 socket.on('inactive_players_removed', (data) => {
     const playerNames = data.players.join(', ');
     const message = `${data.count} inaktive Spieler entfernt: ${playerNames}`;
@@ -1,5 +1,8 @@
 // QuizKnaller - Player Client
-const socket = io();
+// The game code is sent when connecting, so a sharded server can route to the worker hosting the game
+const initialGameCode = (new URLSearchParams(window.location.search).get('code') ||
+    localStorage.getItem('playerGameCode') || '').toUpperCase();
+const socket = io({ query: { code: initialGameCode } });
 
 // Configuration
 const AUTOPLAY_COUNTDOWN_SECONDS = 10;
@@ -80,9 +83,17 @@ elements.joinBtn.addEventListener('click', () => {
         return;
     }
     
+    useGameCode(code);
     socket.emit('join_game', { code, name });
 });
 
+// Reconnect with the new game code if it differs from the one used to connect
+function useGameCode(code) {
+    if (socket.io.opts.query.code === code) return;
+    socket.io.opts.query.code = code;
+    socket.disconnect().connect();
+}
+
 // Allow Enter key to submit
 elements.gameCodeInput.addEventListener('keypress', (e) => {
     if (e.key === 'Enter') elements.playerNameInput.focus();
@@ -0,0 +1,65 @@
+"""
+Shared test setup for QuizKnaller
+Points the database and the game journal at a temporary directory before main is imported
+"""
+
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest  # noqa: E402
+
+import database as db  # noqa: E402
+import journal  # noqa: E402
+
+# main runs db.init_db() on import, so this has to happen before any test module imports it
+_tmp_dir = Path(tempfile.mkdtemp(prefix="quizknaller-tests-"))
+db.DB_PATH = _tmp_dir / "quizknaller.db"
+journal.JOURNAL_DIR = _tmp_dir / "journal"
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """Fresh database, journal directory and in-memory state, with emits discarded.
+
+    Returns a function that runs an async scenario on a fresh event loop
+    and shuts down the loop-bound helpers afterwards.
+    """
+    import async_db as adb
+    import main
+    import write_behind
+
+    db.close_pool()
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "quizknaller.db")
+    monkeypatch.setattr(journal, "JOURNAL_DIR", tmp_path / "journal")
+    db.init_db()
+
+    async def emit(*args, **kwargs):
+        pass
+
+    async def room_op(sid, room, namespace=None):
+        pass
+
+    monkeypatch.setattr(main.sio, "emit", emit)
+    monkeypatch.setattr(main.sio, "enter_room", room_op)
+    monkeypatch.setattr(main.sio, "leave_room", room_op)
+    main.games.clear()
+    main.sessions.clear()
+
+    def run(scenario):
+        async def wrapper():
+            try:
+                await scenario()
+            finally:
+                await main.game_timers.close()
+                await write_behind.close()
+                await adb.drain()
+        asyncio.run(wrapper())
+
+    yield run
+    main.games.clear()
+    main.sessions.clear()
+    db.close_pool()
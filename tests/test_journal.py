@@ -0,0 +1,118 @@
+"""
+Tests for the game journal
+Replays journals written through GameState and compares them with the live game
+"""
+
+import asyncio
+import json
+
+import pytest
+
+import game_state
+import journal
+from game_state import GameState
+
+
+@pytest.fixture(autouse=True)
+def journal_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal, "JOURNAL_DIR", tmp_path)
+    monkeypatch.setattr(journal, "enabled", True)
+
+
+@pytest.fixture
+def quiz():
+    return {
+        "title": "Test",
+        "questions": [
+            {"question": f"Q{i}", "answers": ["a", "b", "c", "d"], "correct": i % 4, "time_limit": 20}
+            for i in range(3)
+        ],
+    }
+
+
+def state(game: GameState) -> dict:
+    return json.loads(json.dumps(game.to_dict()))
+
+
+def play_question(game: GameState):
+    for i in range(5):
+        game.add_player(f"s{i}", f"P{i}")
+    game.set_team("s1", "A")
+    game.start()
+    game.advance_question()
+    game.begin_reading()
+    game.open_question(1.0)
+    game.record_answer("s0", 1, 2.5)
+    game.record_answer("s2", "x", 3.0)
+    game.move_player("s3", "s3b")
+    game.record_answer("s3b", 2, 4.0)
+    game.remove_player("s4")
+    game.set_score("s0", 900)
+    game.set_streak("s0", 1)
+
+
+def test_replay_matches_game(quiz):
+    game = GameState(host_sid="h", quiz=quiz)
+    journal.attach("ABC123", game)
+    play_question(game)
+    journal.sync()
+
+    restored = journal.load_game(journal.journal_path("ABC123"))
+    assert state(restored) == state(game)
+
+
+def test_records_are_written_once_per_loop_tick(quiz, monkeypatch):
+    writes = []
+
+    async def scenario():
+        game = GameState(host_sid="h", quiz=quiz)
+        journal.attach("ABC123", game)
+        original = game.journal._write
+        monkeypatch.setattr(game.journal, "_write", lambda data: (writes.append(data), original(data)))
+        play_question(game)
+        assert writes == []  # nothing is written on the loop before the tick ends
+        await asyncio.sleep(0)
+        await journal.drain()
+        return game
+
+    game = asyncio.run(scenario())
+    assert len(writes) == 1
+    assert state(journal.load_game(journal.journal_path("ABC123"))) == state(game)
+
+
+def test_torn_record_at_the_end_is_ignored(quiz):
+    game = GameState(host_sid="h", quiz=quiz)
+    journal.attach("ABC123", game)
+    play_question(game)
+    journal.sync()
+    path = journal.journal_path("ABC123")
+    with open(path, "ab") as f:
+        f.write(b"\x50\x00\x00\x00abc")
+
+    assert state(journal.load_game(path)) == state(game)
+
+
+def test_compaction_and_recover(quiz, monkeypatch):
+    monkeypatch.setattr(game_state, "SNAPSHOT_EVERY", 10)
+    game = GameState(host_sid="h", quiz=quiz)
+    journal.attach("ABC123", game)
+    play_question(game)
+    for _ in range(30):
+        game.award("s0", 1)
+    assert game.journal.records < 10
+    journal.sync()
+
+    (code, restored), = journal.recover()
+    assert code == "ABC123"
+    assert restored.players["s0"].score == game.players["s0"].score
+    assert all(player.disconnected for player in restored.players.values())
+    assert restored.host_disconnected
+
+
+def test_delete_removes_file(quiz):
+    game = GameState(host_sid="h", quiz=quiz)
+    journal.attach("ABC123", game)
+    play_question(game)
+    game.journal.delete()
+    journal.sync()
+    assert not journal.journal_path("ABC123").exists()
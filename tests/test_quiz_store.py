@@ -0,0 +1,100 @@
+"""
+Tests for the content-addressed quiz storage
+Quizzes are stored once per hash, and every loaded game gets its own copy
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+import database as db
+
+
+@pytest.fixture(autouse=True)
+def database(tmp_path, monkeypatch):
+    db.close_pool()
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "quizknaller.db")
+    db.quiz_cache.clear()
+    db.init_db()
+    yield
+    db.close_pool()
+    db.quiz_cache.clear()
+
+
+@pytest.fixture
+def quiz():
+    return {
+        "title": "Test",
+        "questions": [{"question": "Q", "answers": ["a", "b", "c", "d"], "correct": 1, "time_limit": 20}],
+    }
+
+
+def count_quizzes() -> int:
+    with sqlite3.connect(db.DB_PATH) as conn:
+        return conn.execute("SELECT COUNT(*) FROM quizzes").fetchone()[0]
+
+
+def test_identical_quizzes_are_stored_once(quiz):
+    for i in range(5):
+        assert db.create_game(f"G{i}", "host", quiz["title"], dict(quiz))
+    assert count_quizzes() == 1
+    assert db.get_game("G3")["quiz"] == quiz
+
+
+@pytest.mark.parametrize("cached", [True, False])
+def test_loaded_quizzes_are_independent_copies(quiz, cached):
+    db.create_game("G1", "host", quiz["title"], quiz)
+    db.create_game("G2", "host", quiz["title"], quiz)
+    if not cached:
+        db.quiz_cache.clear()
+
+    first = db.get_game("G1")["quiz"]
+    first["questions"][0]["correct"] = 3
+    first["title"] = "Changed"
+
+    second = db.get_game("G2")["quiz"]
+    assert second == quiz
+    assert second is not quiz
+
+
+def test_caller_changes_after_create_do_not_reach_the_cache(quiz):
+    db.create_game("G1", "host", quiz["title"], quiz)
+    quiz["questions"].append({"question": "late"})
+    assert len(db.get_game("G1")["quiz"]["questions"]) == 1
+
+
+def test_quiz_switch_updates_the_hash(quiz):
+    other = dict(quiz, title="Other")
+    db.create_game("G1", "host", quiz["title"], quiz)
+    db.update_game("G1", quiz_name=other["title"], quiz=other)
+    assert db.get_game("G1")["quiz"] == other
+    assert count_quizzes() == 2
+
+
+def test_inline_quiz_data_is_migrated(quiz, tmp_path, monkeypatch):
+    legacy_path = tmp_path / "legacy.db"
+    with sqlite3.connect(legacy_path) as conn:
+        conn.execute("""
+            CREATE TABLE games (
+                game_code TEXT PRIMARY KEY, host_sid TEXT, quiz_name TEXT NOT NULL,
+                quiz_data TEXT NOT NULL, current_question_index INTEGER DEFAULT -1,
+                state TEXT DEFAULT 'lobby', team_mode BOOLEAN DEFAULT 0, teams TEXT,
+                top_n_players INTEGER DEFAULT 3,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        for code in ("OLD1", "OLD2"):
+            conn.execute(
+                "INSERT INTO games (game_code, host_sid, quiz_name, quiz_data) VALUES (?, 'host', 'Test', ?)",
+                (code, json.dumps(quiz))
+            )
+    db.close_pool()
+    monkeypatch.setattr(db, "DB_PATH", legacy_path)
+    db.init_db()
+
+    assert db.get_game("OLD1")["quiz"] == quiz
+    assert count_quizzes() == 1
+    with sqlite3.connect(legacy_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM games WHERE quiz_data != ''").fetchone()[0] == 0
@@ -0,0 +1,102 @@
+"""
+Golden tests for the scoring engine
+Compares scoring.score_answers (Python and numpy backends) with the original per-player formula
+"""
+
+import random
+from array import array
+
+import pytest
+
+import scoring
+from game_state import answer_code
+
+BACKENDS = [False, pytest.param(True, marks=pytest.mark.skipif(scoring.np is None, reason="numpy not installed"))]
+
+
+def legacy_scores(answers: dict, streaks: dict, correct_index: int, time_limit: float):
+    """The per-player loop show_results used before the scoring engine.
+
+    Answer counts only include valid indexes 0-3, as scoring documents
+    (the original loop miscounted negative answers and failed on others).
+    Floats and booleans are left out: the original crashed on 1.0 and
+    scored True as answer 1, while they are invalid answers now.
+    """
+    results = {}
+    answer_counts = [0, 0, 0, 0]
+    for player_sid, (answer, answer_time) in answers.items():
+        is_correct = answer == correct_index
+        if isinstance(answer, int) and not isinstance(answer, bool) and 0 <= answer < 4:
+            answer_counts[answer] += 1
+        if is_correct:
+            time_bonus = max(0, 1 - (answer_time / time_limit))
+            score = int(500 + (500 * time_bonus))
+            streaks[player_sid] += 1
+            if streaks[player_sid] > 1:
+                score += min(streaks[player_sid] * 50, 200)
+            results[player_sid] = (True, score, streaks[player_sid])
+        else:
+            streaks[player_sid] = 0
+            results[player_sid] = (False, 0, 0)
+    return results, answer_counts
+
+
+def random_question(rng: random.Random, count: int):
+    time_limit = rng.choice([10, 15, 20, 30, 7.5])
+    choices = [0, 1, 2, 3, 0, 1, 2, 3, None, -1, -3, 4, 7, 127, "2", [1]]
+    answers = {f"sid-{i}": (rng.choice(choices), rng.uniform(0, time_limit * 1.2)) for i in range(count)}
+    # Exact fractions of the limit hit the boundaries of the time bonus
+    for sid in rng.sample(list(answers), count // 10):
+        answers[sid] = (answers[sid][0], rng.choice([0.0, time_limit / 2, time_limit, time_limit * 2]))
+    streaks = {sid: rng.choice([0, 0, 1, 2, 3, 5, 9]) for sid in answers}
+    return answers, streaks, rng.randrange(4), time_limit
+
+
+def score_columns(answers: dict, streaks: dict, correct_index: int, time_limit: float, vectorize):
+    sids = list(answers)
+    scores = scoring.score_answers(
+        array("b", [answer_code(answers[sid][0]) for sid in sids]),
+        array("d", [answers[sid][1] for sid in sids]),
+        array("i", [streaks[sid] for sid in sids]),
+        correct_index, time_limit, vectorize=vectorize,
+    )
+    got = {sid: (scores.correct[i], scores.points[i], scores.streaks[i]) for i, sid in enumerate(sids)}
+    return got, scores.answer_counts
+
+
+def assert_matches_legacy(question, vectorize):
+    answers, streaks, correct_index, time_limit = question
+    expected = legacy_scores(answers, dict(streaks), correct_index, time_limit)
+    assert score_columns(answers, streaks, correct_index, time_limit, vectorize) == expected
+
+
+@pytest.mark.parametrize("vectorize", BACKENDS)
+def test_random_questions_match_legacy(vectorize):
+    rng = random.Random(1)
+    for _ in range(500):
+        assert_matches_legacy(random_question(rng, rng.randrange(1, 300)), vectorize)
+
+
+@pytest.mark.parametrize("vectorize", BACKENDS)
+def test_invalid_and_out_of_range_answers_score_nothing(vectorize):
+    answers = {"none": (None, 1.0), "negative": (-5, 1.0), "high": (9, 1.0), "text": ("1", 1.0),
+               "list": ([1], 1.0), "float": (1.0, 1.0), "bool": (True, 1.0), "valid": (1, 1.0)}
+    streaks = {sid: 3 for sid in answers}
+    got, counts = score_columns(answers, streaks, 1, 20, vectorize)
+    assert counts == [0, 1, 0, 0]
+    assert {sid for sid, (correct, _, _) in got.items() if correct} == {"valid"}
+    assert all(got[sid] == (False, 0, 0) for sid in answers if sid != "valid")
+
+
+@pytest.mark.parametrize("vectorize", BACKENDS)
+def test_empty_question(vectorize):
+    got, counts = score_columns({}, {}, 0, 20, vectorize)
+    assert got == {} and counts == [0, 0, 0, 0]
+
+
+def test_falls_back_to_python_without_numpy(monkeypatch):
+    monkeypatch.setattr(scoring, "np", None)
+    rng = random.Random(2)
+    # Above VECTORIZE_MIN_ANSWERS, where numpy would be chosen if it were installed
+    question = random_question(rng, scoring.VECTORIZE_MIN_ANSWERS * 4)
+    assert_matches_legacy(question, None)
@@ -0,0 +1,149 @@
+"""
+Tests for the Socket.IO session index (main.sessions)
+Drives the game handlers and checks after each step that the index matches the games
+"""
+
+import main
+
+
+def expected_sessions() -> dict[str, tuple[str, str]]:
+    expected = {}
+    for game_code, game in main.games.items():
+        expected[game.host_sid] = (game_code, "host")
+        for player_sid in game.players:
+            expected[player_sid] = (game_code, "player")
+    return expected
+
+
+def assert_consistent():
+    assert main.sessions == expected_sessions()
+
+
+async def create_game(host_sid: str) -> str:
+    before = set(main.games)
+    await main.create_game(host_sid, {"quiz_id": 0})
+    (game_code,) = set(main.games) - before
+    assert_consistent()
+    return game_code
+
+
+async def join(sid: str, game_code: str, name: str):
+    await main.join_game(sid, {"code": game_code, "name": name})
+    assert main.sessions[sid] == (game_code, "player")
+    assert_consistent()
+
+
+def test_create_and_join(server):
+    async def scenario():
+        game_code = await create_game("host")
+        await join("p1", game_code, "Anna")
+        await join("p2", game_code, "Ben")
+        assert set(main.sessions) == {"host", "p1", "p2"}
+
+    server(scenario)
+
+
+def test_lobby_disconnect_removes_player(server):
+    async def scenario():
+        game_code = await create_game("host")
+        await join("p1", game_code, "Anna")
+        await join("p2", game_code, "Ben")
+
+        await main.disconnect("p1")
+        assert "p1" not in main.sessions
+        assert_consistent()
+
+        # Unknown sockets are ignored
+        await main.disconnect("stranger")
+        assert_consistent()
+
+    server(scenario)
+
+
+def test_player_reconnect_moves_session(server):
+    async def scenario():
+        game_code = await create_game("host")
+        await join("p1", game_code, "Anna")
+        await join("p2", game_code, "Ben")
+        await main.start_game("host", {"code": game_code})
+        assert_consistent()
+
+        # Disconnecting during a game keeps the player (and its session until it reconnects)
+        await main.disconnect("p1")
+        assert_consistent()
+        assert "p1" in main.games[game_code].players
+
+        await main.reconnect_player("p1-new", {"code": game_code, "name": "anna"})
+        assert "p1" not in main.sessions
+        assert main.sessions["p1-new"] == (game_code, "player")
+        assert_consistent()
+
+    server(scenario)
+
+
+def test_host_reconnect_moves_session(server):
+    async def scenario():
+        game_code = await create_game("host")
+        await join("p1", game_code, "Anna")
+
+        await main.reconnect_host("host-new", {"code": game_code})
+        assert "host" not in main.sessions
+        assert main.sessions["host-new"] == (game_code, "host")
+        assert_consistent()
+
+    server(scenario)
+
+
+def test_host_of_two_games_keeps_newer_session(server):
+    async def scenario():
+        first = await create_game("host")
+        second = await create_game("host")
+        assert main.sessions["host"] == (second, "host")
+
+        # Unloading the old game must not unindex the socket hosting the new one
+        main.unload_game(first)
+        assert main.sessions["host"] == (second, "host")
+        assert_consistent()
+
+    server(scenario)
+
+
+def test_inactive_players_are_unindexed(server):
+    async def scenario():
+        game_code = await create_game("host")
+        await join("p1", game_code, "Anna")
+        await join("p2", game_code, "Ben")
+        await join("p3", game_code, "Carla")
+        game = main.games[game_code]
+        game.auto_remove_inactive = True
+        game.inactivity_threshold = 1
+
+        await main.start_game("host", {"code": game_code})
+        await main.next_question(game_code)
+        await main.open_question(game_code)
+        await main.submit_answer("p1", {"code": game_code, "answer": 0})
+        await main.show_results(game_code)
+
+        assert set(game.players) == {"p1"}
+        assert "p2" not in main.sessions and "p3" not in main.sessions
+        assert_consistent()
+
+    server(scenario)
+
+
+def test_remove_and_unload_game_clear_sessions(server):
+    async def scenario():
+        removed = await create_game("host-a")
+        await join("a1", removed, "Anna")
+        unloaded = await create_game("host-b")
+        await join("b1", unloaded, "Ben")
+        kept = await create_game("host-c")
+        await join("c1", kept, "Carla")
+
+        main.remove_game(removed)
+        assert_consistent()
+        main.unload_game(unloaded)
+        assert_consistent()
+        assert set(main.sessions) == {"host-c", "c1"}
+
+    server(scenario)
@@ -0,0 +1,88 @@
+"""
+Tests for write-behind persistence
+Buffered answers and scores: bad rows, answer encoding and quiz switches
+"""
+
+import sqlite3
+
+import async_db as adb
+import database as db
+import main
+import write_behind
+from game_state import INVALID_ANSWER
+
+
+def responses(game_code: str) -> list[tuple]:
+    with sqlite3.connect(db.DB_PATH) as conn:
+        return conn.execute(
+            "SELECT player_name, answer_index FROM question_responses WHERE game_code = ? ORDER BY player_name",
+            (game_code,)
+        ).fetchall()
+
+
+def scores(game_code: str) -> dict[str, int]:
+    return {p["name"]: p["score"] for p in db.get_players(game_code)}
+
+
+async def create_game(host_sid: str, *names: str) -> str:
+    before = set(main.games)
+    await main.create_game(host_sid, {"quiz_id": 0})
+    (game_code,) = set(main.games) - before
+    for i, name in enumerate(names):
+        await main.join_game(f"{host_sid}-p{i}", {"code": game_code, "name": name})
+    await adb.drain()
+    return game_code
+
+
+def test_bad_row_only_loses_itself(server):
+    async def scenario():
+        game_code = await create_game("host", "Alice", "Bob")
+        await write_behind.record_answer(game_code, "Bob", 0, None, False, 10, 0)
+        await write_behind.update_player_score(game_code, "Alice", 900)
+        dropped = write_behind.write_queue.dropped_operations
+        await write_behind.flush()
+
+        assert scores(game_code)["Alice"] == 900
+        assert write_behind.write_queue.dropped_operations == dropped + 1
+
+    server(scenario)
+
+
+def test_invalid_answers_are_encoded(server):
+    async def scenario():
+        game_code = await create_game("host", "Alice", "Bob", "Carla")
+        await main.start_game("host", {"code": game_code})
+        await main.next_question(game_code)
+        await main.open_question(game_code)
+        await main.submit_answer("host-p0", {"code": game_code, "answer": None})
+        await main.submit_answer("host-p1", {"code": game_code, "answer": [1]})
+        await main.submit_answer("host-p2", {"code": game_code, "answer": 2})
+        await write_behind.flush()
+        await adb.drain()
+
+        assert responses(game_code) == [("Alice", INVALID_ANSWER), ("Bob", INVALID_ANSWER), ("Carla", 2)]
+
+    server(scenario)
+
+
+def test_quiz_switch_drops_buffered_progress(server):
+    async def scenario():
+        game_code = await create_game("host", "Alice")
+        other_code = await create_game("other", "Otto")
+        await write_behind.record_answer(game_code, "Alice", 0, 1, True, 1500, 800)
+        await write_behind.update_player_score(game_code, "Alice", 800)
+        await write_behind.update_player_score(other_code, "Otto", 300)
+        flushed = write_behind.write_queue.flushed_operations
+
+        await main.switch_game_quiz("host", {"code": game_code, "quiz_id": 1})
+        await write_behind.flush()
+        await adb.drain()
+
+        # The stale answer and score were discarded, not written and then reset
+        assert write_behind.write_queue.flushed_operations == flushed + 1
+        assert responses(game_code) == []
+        assert scores(game_code) == {"Alice": 0}
+        # Other games keep their buffered writes
+        assert scores(other_code) == {"Otto": 300}
+
+    server(scenario)
@@ -0,0 +1,144 @@
+"""
+Write-behind persistence for QuizKnaller
+Buffers high-volume answer and score writes and flushes them in batches
+"""
+
+import asyncio
+from typing import Optional
+
+import async_db as adb
+import database as db
+
+MAX_PENDING = 5000  # buffered operations before producers have to wait
+FLUSH_INTERVAL = 1.0  # seconds between background flushes
+# Position of the game code in the params of each kind of operation
+GAME_CODE_PARAM = {"record_answer": 0, "update_player_score": 1, "remove_player": 0}
+
+
+class WriteBehindQueue:
+    """Bounded in-memory buffer of database mutations.
+
+    Operations are kept in submission order and written in a single
+    transaction per flush (see database.apply_batch). A flush hands the
+    batch to the async_db writer thread synchronously, so it is ordered
+    correctly relative to every write queued after it. Operations are
+    never re-queued: apply_batch falls back to writing a failed batch row
+    by row on the writer thread, so only the rows that fail themselves are
+    dropped and nothing is replayed after later writes.
+    """
+
+    def __init__(self, max_pending: int = MAX_PENDING, flush_interval: float = FLUSH_INTERVAL):
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self._buffer: list[tuple[str, tuple]] = []
+        self._inflight: Optional[asyncio.Future] = None
+        self._task: Optional[asyncio.Task] = None
+        self.flushed_batches = 0
+        self.flushed_operations = 0
+        self.dropped_operations = 0
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    async def put(self, kind: str, params: tuple):
+        """Buffer an operation, waiting for a flush if the buffer is full."""
+        self._ensure_running()
+        while len(self._buffer) >= self.max_pending:
+            await self.flush()
+        self._buffer.append((kind, params))
+
+    def flush_now(self) -> Optional[asyncio.Future]:
+        """Hand all buffered operations to the writer thread without waiting."""
+        if not self._buffer:
+            return self._inflight
+        batch, self._buffer = self._buffer, []
+        self._inflight = adb.run_write_nowait(db.apply_batch, batch)
+        self._inflight.add_done_callback(lambda f, b=batch: self._on_flushed(f, b))
+        return self._inflight
+
+    def _on_flushed(self, future: asyncio.Future, batch: list[tuple[str, tuple]]):
+        if self._inflight is future:
+            self._inflight = None
+        if future.cancelled() or future.exception() is not None:
+            print(f"Write-behind flush of {len(batch)} operations failed, dropping them")
+            self.dropped_operations += len(batch)
+            return
+        failed = future.result()
+        self.flushed_batches += 1
+        self.flushed_operations += len(batch) - failed
+        self.dropped_operations += failed
+
+    def discard(self, game_code: str, kinds: tuple[str, ...]) -> int:
+        """Drop buffered operations of the given kinds for a game; returns how many."""
+        kept = [
+            (kind, params) for kind, params in self._buffer
+            if kind not in kinds or params[GAME_CODE_PARAM[kind]] != game_code
+        ]
+        discarded = len(self._buffer) - len(kept)
+        self._buffer = kept
+        return discarded
+
+    async def flush(self):
+        """Flush buffered operations and wait until they are committed."""
+        future = self.flush_now()
+        if future is not None:
+            await asyncio.gather(future, return_exceptions=True)
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush_now()
+
+    async def close(self):
+        """Stop the background flusher and write out everything that is left."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+
+write_queue = WriteBehindQueue()
+# Buffered writes must reach SQLite before any direct write queued after them
+adb.add_write_barrier(write_queue.flush_now)
+
+
+async def record_answer(game_code: str, player_name: str, question_index: int,
+                        answer_index: int, is_correct: bool, time_taken_ms: int,
+                        points_awarded: int):
+    """Buffer a player's answer (see database.record_answer)."""
+    await write_queue.put("record_answer", (game_code, player_name, question_index, answer_index,
+                                            is_correct, time_taken_ms, points_awarded))
+
+
+async def update_player_score(game_code: str, name: str, score: int):
+    """Buffer a player's new total score (see database.update_player_score)."""
+    await write_queue.put("update_player_score", (score, game_code, name))
+
+
+async def remove_player(game_code: str, name: str):
+    """Buffer deleting a player's row; their recorded answers stay for statistics."""
+    await write_queue.put("remove_player", (game_code, name))
+
+
+def discard_progress(game_code: str):
+    """Drop a game's buffered answers and scores, e.g. before its progress is reset."""
+    write_queue.discard(game_code, ("record_answer", "update_player_score"))
+
+
+def flush_nowait():
+    """Start flushing all buffered writes, e.g. when a question has been scored."""
+    write_queue.flush_now()
+
+
+async def flush():
+    """Flush all buffered writes and wait until they are committed."""
+    await write_queue.flush()
+
+
+async def close():
+    """Flush remaining writes on shutdown."""
+    await write_queue.close()